@@ -0,0 +1,478 @@
+"""Team availability stored as fixed-granularity busy bitmaps per member and day."""
+
+import copy
+import itertools
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+
+DEFAULT_SLOT_MINUTES = 15
+MINUTES_PER_DAY = 24 * 60
+# Member rows per bitmap block. A day is stored as a list of blocks and versions
+# copy single blocks on write, so publishing a change copies BLOCK_ROWS rows
+# rather than the whole team's matrix for that day.
+BLOCK_ROWS = 64
+# Queries for up to this many members read their rows one at a time rather than grouping them by block.
+GATHER_BY_ROW = 32
+
+# One change to a member's busy time: busy=True marks [start, end) busy, False frees it.
+BusyChange = namedtuple("BusyChange", "member_id start end busy")
+
+# Versions are process-wide, so no two store versions share a number.
+_versions = itertools.count(1)
+
+
+class AvailabilityStore:
+    """
+    Busy time for every member, kept as one packed bitmap per member per day.
+
+    Each stored day is a list of (BLOCK_ROWS x bytes per day) uint8 blocks of
+    member rows in which a set bit marks a busy slot; a missing block is all free. Finding common free time is a bitwise OR over the
+    selected member rows followed by an inversion, so the cost per day depends on
+    the bitmap width rather than on how many meetings members have. Days that were
+    never written are treated as entirely free. Times are naive datetimes on the
+    store's clock.
+
+    Per-day rollups (free slot count and longest free run per member) and
+    per-week rollups over them are materialized on first use and dropped when a
+    day they cover is written, so range queries can skip days and weeks that
+    cannot hold the requested block without scanning their slots.
+
+    apply_changes returns a new version instead of writing in place. The new
+    version shares every block it does not change with the old one, so readers
+    holding the old version keep seeing consistent data. version
+    increases with every change and can be used for caching and ETags.
+    """
+
+    def __init__(self, slot_minutes: int = DEFAULT_SLOT_MINUTES):
+        if slot_minutes <= 0 or MINUTES_PER_DAY % slot_minutes:
+            raise ValueError(f"slot_minutes must evenly divide a day, got {slot_minutes}")
+        self.slot_minutes = slot_minutes
+        self.slots_per_day = MINUTES_PER_DAY // slot_minutes
+        self.bytes_per_day = (self.slots_per_day + 7) // 8
+        self._member_rows = {}
+        self._capacity = BLOCK_ROWS
+        self._days = {}
+        # Days whose block list, and (day, block index) pairs whose block, this
+        # version may write in place; the rest are shared with another version or
+        # read-only and are copied on first write.
+        self._owned_days = set()
+        self._owned_blocks = set()
+        self._rows_shared = False
+        # day -> (free slots, longest free run) and Monday -> the same over its week,
+        # each an array over member rows; never mutated, only replaced or dropped.
+        self._day_rollups = {}
+        self._week_rollups = {}
+        self._backing = None
+        self.version = next(_versions)
+
+    @classmethod
+    def from_day_matrices(cls, slot_minutes: int, member_ids, day_matrices: dict, backing=None):
+        """
+        Build a store over existing per-day matrices without copying them.
+
+        Each matrix must have one packed row per member, in member_ids order.
+        Matrices (e.g. read-only views of a memory-mapped snapshot) are split
+        into block views, and a block is copied the first time it is written.
+        backing is kept alive with the store.
+        """
+        store = cls(slot_minutes)
+        store._member_rows = {member_id: row for row, member_id in enumerate(member_ids)}
+        row_count = len(store._member_rows)
+        store._capacity = max(-(-row_count // BLOCK_ROWS), 1) * BLOCK_ROWS
+        for day, matrix in day_matrices.items():
+            if matrix.shape != (row_count, store.bytes_per_day):
+                raise ValueError(f"Bitmap matrix for {day} has shape {matrix.shape}")
+            if row_count:
+                store._days[day] = [matrix[first:first + BLOCK_ROWS] for first in range(0, row_count, BLOCK_ROWS)]
+        store._backing = backing
+        return store
+
+    @property
+    def members(self) -> list:
+        """Member ids in the order they were added."""
+        return list(self._member_rows)
+
+    def __contains__(self, member_id) -> bool:
+        return member_id in self._member_rows
+
+    def add_member(self, member_id: str) -> int:
+        """Register a member (idempotent) and return its bitmap row."""
+        row = self._member_rows.get(member_id)
+        if row is not None:
+            return row
+        row = len(self._member_rows)
+        if row >= self._capacity:
+            # Blocks for the new rows are created on first write; only the rollups,
+            # which have one entry per row of capacity, are rebuilt.
+            self._capacity += BLOCK_ROWS
+            self._day_rollups = {}
+            self._week_rollups = {}
+        if self._rows_shared:
+            self._member_rows = dict(self._member_rows)
+            self._rows_shared = False
+        self._member_rows[member_id] = row
+        self.version = next(_versions)
+        return row
+
+    def member_row(self, member_id: str) -> int:
+        """Return a member's bitmap row; raises KeyError for unknown members."""
+        return self._row(member_id)
+
+    def mark_busy(self, member_id: str, start: datetime, end: datetime) -> None:
+        """Mark [start, end) busy for a member, widening to whole slots and splitting at midnight."""
+        if end <= start:
+            raise ValueError("Busy interval must end after it starts")
+        row = self.add_member(member_id)
+        for day, first_slot, last_slot in self._slot_ranges(start, end):
+            bitmap = self._writable_row(day, row)
+            for byte_index, mask in _slot_masks(first_slot, last_slot):
+                bitmap[byte_index] |= mask
+            self._drop_rollups(day)
+        self.version = next(_versions)
+
+    def mark_free(self, member_id: str, start: datetime, end: datetime) -> None:
+        """
+        Mark [start, end) free for a member, widening to whole slots like mark_busy.
+
+        Bitmaps do not record which meeting made a slot busy, so freeing a
+        cancelled meeting also frees any other meeting overlapping it; apply
+        those again (e.g. in the same apply_changes call) to keep them busy.
+        """
+        if end <= start:
+            raise ValueError("Free interval must end after it starts")
+        row = self._row(member_id)
+        for day, first_slot, last_slot in self._slot_ranges(start, end):
+            if self._stored_row(day, row) is None:
+                continue
+            bitmap = self._writable_row(day, row)
+            for byte_index, mask in _slot_masks(first_slot, last_slot):
+                bitmap[byte_index] &= ~mask & 0xFF
+            self._drop_rollups(day)
+        self.version = next(_versions)
+
+    def apply_changes(self, changes, members=()) -> "AvailabilityStore":
+        """
+        Return a new version of the store with changes applied, leaving this one unchanged.
+
+        changes is an iterable of BusyChange; frees are applied before busy
+        intervals so that re-sent meetings survive a cancellation overlapping
+        them. members are registered even if they have no changes. Only the
+        blocks of BLOCK_ROWS member rows that change are copied, so the cost
+        follows the size of the change rather than the number of stored days
+        and members.
+        """
+        changes = list(changes)
+        store = self._fork()
+        for member_id in members:
+            store.add_member(member_id)
+        for change in sorted(changes, key=lambda change: change.busy):
+            if change.busy:
+                store.mark_busy(change.member_id, change.start, change.end)
+            else:
+                store.mark_free(change.member_id, change.start, change.end)
+        store.version = next(_versions)
+        return store
+
+    def stored_days(self) -> list:
+        """Days with at least one written bitmap, in ascending order."""
+        return sorted(self._days)
+
+    def day_bitmaps(self, day: date):
+        """
+        Return the packed (members x bytes per day) bitmaps for a day, or None if never written.
+
+        A day held in a single block is returned as a view; otherwise the blocks
+        are gathered into a new array. Use member_bitmap to read one member.
+        """
+        if day not in self._days:
+            return None
+        return self._dense(day, len(self._member_rows))
+
+    def member_bitmap(self, member_id: str, day: date):
+        """Return a member's packed bitmap for a day, or None if that row was never written."""
+        return self._stored_row(day, self._row(member_id))
+
+    def busy_slots(self, member_id: str, day: date) -> np.ndarray:
+        """Return a member's busy slots for a day as a boolean array."""
+        bitmap = self.member_bitmap(member_id, day)
+        if bitmap is None:
+            return np.zeros(self.slots_per_day, dtype=bool)
+        return np.unpackbits(bitmap, count=self.slots_per_day).astype(bool)
+
+    def busy_matrix(self, member_ids, day: date) -> np.ndarray:
+        """Return a (members x slots) uint8 array with 1 where each member is busy on a day."""
+        rows = self._rows(member_ids)
+        return np.unpackbits(self._gather(day, rows), axis=1, count=self.slots_per_day)
+
+    def day_rollup(self, member_ids, day: date):
+        """Return (free slot counts, longest free runs in slots) arrays for members on a day."""
+        rows = self._rows(member_ids)
+        free_slots, longest_run = self._day_rollup(day)
+        return free_slots[rows], longest_run[rows]
+
+    def week_rollup(self, member_ids, day: date):
+        """Return (free slot counts, longest free runs in slots) arrays for members over the Monday-Sunday week of day."""
+        rows = self._rows(member_ids)
+        free_slots, longest_run = self._week_rollup(day - timedelta(days=day.weekday()))
+        return free_slots[rows], longest_run[rows]
+
+    def members_with_free_block(self, member_ids, start_date: date, end_date: date,
+                                duration_minutes: int) -> list:
+        """
+        Return the members with at least duration_minutes of continuous free time on some day.
+
+        Whole weeks inside the range are answered from week rollups, the days of
+        partial weeks from day rollups; no slots are scanned. end_date is inclusive.
+        """
+        member_ids = list(member_ids)
+        rows = self._rows(member_ids)
+        min_slots = -(-duration_minutes // self.slot_minutes)
+        found = np.zeros(len(rows), dtype=bool)
+        for first_day, last_day in _week_spans(start_date, end_date):
+            if (last_day - first_day).days == 6:
+                found |= self._week_rollup(first_day)[1][rows] >= min_slots
+            else:
+                for offset in range((last_day - first_day).days + 1):
+                    found |= self._day_rollup(first_day + timedelta(days=offset))[1][rows] >= min_slots
+            if found.all():
+                break
+        return [member_id for member_id, has_block in zip(member_ids, found) if has_block]
+
+    def candidate_days(self, member_ids, start_date: date, end_date: date, duration_minutes: int) -> np.ndarray:
+        """
+        Return a boolean array over the days of a range, False where no common free block can last duration_minutes.
+
+        A day qualifies only if every member's longest free run that day is long
+        enough; a week in which some member never has such a run is ruled out
+        with a single rollup lookup. True days may still lack a common block.
+        """
+        rows = self._rows(member_ids)
+        day_count = (end_date - start_date).days + 1
+        candidates = np.ones(max(day_count, 0), dtype=bool)
+        min_slots = -(-duration_minutes // self.slot_minutes)
+        if not len(rows) or min_slots <= 1:
+            return candidates
+        spans = list(_week_spans(start_date, end_date))
+        week_longest = np.stack([self._week_rollup(first_day - timedelta(days=first_day.weekday()))[1]
+                                 for first_day, _ in spans])
+        day_offsets = []
+        for (first_day, last_day), week_ok in zip(spans, week_longest[:, rows].min(axis=1) >= min_slots):
+            offset = (first_day - start_date).days
+            span = (last_day - first_day).days + 1
+            if week_ok:
+                day_offsets.extend(range(offset, offset + span))
+            else:
+                candidates[offset:offset + span] = False
+        if day_offsets:
+            longest = np.stack([self._day_rollup(start_date + timedelta(days=offset))[1] for offset in day_offsets])
+            candidates[day_offsets] = longest[:, rows].min(axis=1) >= min_slots
+        return candidates
+
+    def common_free_slots(self, member_ids, start_date: date, end_date: date) -> np.ndarray:
+        """
+        Return a (days x slots) boolean array of slots where every member is free.
+
+        Row i covers start_date + i days; end_date is inclusive.
+        """
+        day_count = (end_date - start_date).days + 1
+        if day_count <= 0:
+            raise ValueError("end_date must not be before start_date")
+        return self._common_free(self._rows(member_ids), start_date, range(day_count))
+
+    def common_free_windows(self, member_ids, start_date: date, end_date: date,
+                            min_duration_minutes: int = 0) -> list:
+        """
+        Return (start, end) datetimes of every window in which all members are free.
+
+        Windows are split at midnight and shorter ones than min_duration_minutes
+        are dropped; days that rollups show cannot hold such a window are not read.
+        """
+        day_count = (end_date - start_date).days + 1
+        if day_count <= 0:
+            raise ValueError("end_date must not be before start_date")
+        rows = self._rows(member_ids)
+        day_offsets = np.arange(day_count)
+        if min_duration_minutes > self.slot_minutes:
+            day_offsets = np.flatnonzero(self.candidate_days(member_ids, start_date, end_date, min_duration_minutes))
+            if not len(day_offsets):
+                return []
+        free = self._common_free(rows, start_date, day_offsets)
+        edges = np.diff(np.pad(free.astype(np.int8), ((0, 0), (1, 1))), axis=1)
+        start_days, start_slots = np.nonzero(edges == 1)
+        _, end_slots = np.nonzero(edges == -1)
+
+        min_slots = -(-min_duration_minutes // self.slot_minutes)
+        keep = (end_slots - start_slots) >= max(min_slots, 1)
+        slot_delta = timedelta(minutes=self.slot_minutes)
+        windows = []
+        for day_index, first_slot, last_slot in zip(start_days[keep], start_slots[keep], end_slots[keep]):
+            day_start = datetime.combine(start_date + timedelta(days=int(day_offsets[day_index])), time())
+            windows.append((day_start + int(first_slot) * slot_delta,
+                            day_start + int(last_slot) * slot_delta))
+        return windows
+
+    def _common_free(self, rows: np.ndarray, start_date: date, day_offsets) -> np.ndarray:
+        """Return a (len(day_offsets) x slots) boolean array of slots where every row is free."""
+        busy = np.zeros((len(day_offsets), self.bytes_per_day), dtype=np.uint8)
+        if len(rows):
+            for index, offset in enumerate(day_offsets):
+                day = start_date + timedelta(days=int(offset))
+                if day in self._days:
+                    np.bitwise_or.reduce(self._gather(day, rows), axis=0, out=busy[index])
+        return ~np.unpackbits(busy, axis=1, count=self.slots_per_day).astype(bool)
+
+    def _row(self, member_id: str) -> int:
+        try:
+            return self._member_rows[member_id]
+        except KeyError:
+            raise KeyError(f"Unknown member: {member_id}") from None
+
+    def _rows(self, member_ids) -> np.ndarray:
+        return np.fromiter((self._row(member_id) for member_id in member_ids), dtype=np.intp)
+
+    def _day_rollup(self, day: date):
+        """Return (free slots, longest free run) over all member rows for a day, materializing it if needed."""
+        rollup = self._day_rollups.get(day)
+        if rollup is None:
+            if day not in self._days:
+                full = np.full(self._capacity, self.slots_per_day, dtype=np.int16)
+                return full, full
+            busy = np.unpackbits(self._dense(day, self._capacity), axis=1, count=self.slots_per_day)
+            rollup = (self.slots_per_day - busy.sum(axis=1, dtype=np.int16), _longest_free_runs(busy))
+            self._day_rollups[day] = rollup
+        return rollup
+
+    def _week_rollup(self, week_start: date):
+        """Return (free slots, longest free run) over all member rows for the week starting on a Monday."""
+        rollup = self._week_rollups.get(week_start)
+        if rollup is None:
+            days = [self._day_rollup(week_start + timedelta(days=offset)) for offset in range(7)]
+            rollup = (np.sum([free for free, _ in days], axis=0, dtype=np.int32),
+                      np.max([longest for _, longest in days], axis=0))
+            self._week_rollups[week_start] = rollup
+        return rollup
+
+    def _drop_rollups(self, day: date) -> None:
+        self._day_rollups.pop(day, None)
+        self._week_rollups.pop(day - timedelta(days=day.weekday()), None)
+
+    def _stored_row(self, day: date, row: int):
+        """Return a row's packed bitmap on a day without copying, or None if its block was never written."""
+        block_index, offset = divmod(row, BLOCK_ROWS)
+        blocks = self._days.get(day)
+        if blocks is None or block_index >= len(blocks) or blocks[block_index] is None:
+            return None
+        block = blocks[block_index]
+        # Blocks split from a snapshot may be shorter than BLOCK_ROWS.
+        return block[offset] if offset < len(block) else None
+
+    def _gather(self, day: date, rows: np.ndarray) -> np.ndarray:
+        """Return a (len(rows) x bytes per day) array of the rows' packed bitmaps on a day."""
+        blocks = self._days.get(day) or ()
+        if len(blocks) == 1 and blocks[0] is not None and (not len(rows) or rows.max() < len(blocks[0])):
+            return blocks[0][rows]
+        gathered = np.zeros((len(rows), self.bytes_per_day), dtype=np.uint8)
+        if len(rows) <= GATHER_BY_ROW:
+            for position, row in enumerate(rows.tolist()):
+                bitmap = self._stored_row(day, row)
+                if bitmap is not None:
+                    gathered[position] = bitmap
+            return gathered
+        block_indexes, offsets = np.divmod(rows, BLOCK_ROWS)
+        for block_index in np.unique(block_indexes):
+            block = blocks[block_index] if block_index < len(blocks) else None
+            if block is None:
+                continue
+            positions = np.flatnonzero((block_indexes == block_index) & (offsets < len(block)))
+            gathered[positions] = block[offsets[positions]]
+        return gathered
+
+    def _dense(self, day: date, row_count: int) -> np.ndarray:
+        """Return the first row_count rows of a day as one array, a view when a single block holds them."""
+        blocks = self._days[day]
+        if len(blocks) == 1 and blocks[0] is not None and len(blocks[0]) >= row_count:
+            return blocks[0][:row_count]
+        dense = np.zeros((row_count, self.bytes_per_day), dtype=np.uint8)
+        for first, block in zip(range(0, row_count, BLOCK_ROWS), blocks):
+            if block is not None:
+                rows = min(len(block), row_count - first)
+                dense[first:first + rows] = block[:rows]
+        return dense
+
+    def _writable_row(self, day: date, row: int) -> np.ndarray:
+        """Return a writable bitmap row, copying its block (and the day's block list) if this version does not own them."""
+        block_index, offset = divmod(row, BLOCK_ROWS)
+        if day not in self._owned_days:
+            self._days[day] = list(self._days.get(day, ()))
+            self._owned_days.add(day)
+        blocks = self._days[day]
+        if block_index >= len(blocks):
+            blocks.extend([None] * (block_index + 1 - len(blocks)))
+        if (day, block_index) not in self._owned_blocks:
+            block = np.zeros((BLOCK_ROWS, self.bytes_per_day), dtype=np.uint8)
+            if blocks[block_index] is not None:
+                block[:len(blocks[block_index])] = blocks[block_index]
+            blocks[block_index] = block
+            self._owned_blocks.add((day, block_index))
+        return blocks[block_index][offset]
+
+    def _fork(self) -> "AvailabilityStore":
+        """Return a shallow copy sharing every block and the member rows with this store."""
+        store = copy.copy(self)
+        store._days = dict(self._days)
+        # Both versions now share every block list and block, so neither may write one in place.
+        store._owned_days, store._owned_blocks = set(), set()
+        self._owned_days, self._owned_blocks = set(), set()
+        store._rows_shared = self._rows_shared = True
+        store._day_rollups = dict(self._day_rollups)
+        store._week_rollups = dict(self._week_rollups)
+        return store
+
+    def _slot_ranges(self, start: datetime, end: datetime):
+        """Yield (day, first_slot, last_slot) covering [start, end), one entry per calendar day."""
+        day = start.date()
+        while True:
+            day_start = datetime.combine(day, time())
+            first_minute = max((start - day_start) / timedelta(minutes=1), 0)
+            last_minute = min((end - day_start) / timedelta(minutes=1), MINUTES_PER_DAY)
+            first_slot = int(first_minute // self.slot_minutes)
+            last_slot = int(-(-last_minute // self.slot_minutes))
+            if last_slot > first_slot:
+                yield day, first_slot, last_slot
+            if end <= day_start + timedelta(days=1):
+                return
+            day += timedelta(days=1)
+
+
+def _longest_free_runs(busy: np.ndarray) -> np.ndarray:
+    """Return the longest run of zeros in each row of a (rows x slots) 0/1 array."""
+    rows, slots = busy.shape
+    # Bracket every row with busy sentinels; the gaps between consecutive busy
+    # positions in the flattened array are then exactly the free runs.
+    padded = np.ones((rows, slots + 2), dtype=np.uint8)
+    padded[:, 1:-1] = busy
+    positions = np.flatnonzero(padded)
+    gaps = np.diff(positions) - 1
+    longest = np.zeros(rows, dtype=np.int16)
+    np.maximum.at(longest, positions[:-1] // (slots + 2), gaps.astype(np.int16))
+    return longest
+
+
+def _week_spans(start_date: date, end_date: date):
+    """Yield (first day, last day) of each Monday-Sunday week's part of [start_date, end_date]."""
+    day = start_date
+    while day <= end_date:
+        last_day = min(day + timedelta(days=6 - day.weekday()), end_date)
+        yield day, last_day
+        day = last_day + timedelta(days=1)
+
+
+def _slot_masks(first_slot: int, last_slot: int):
+    """Yield (byte index, bit mask) pairs covering slots [first_slot, last_slot) of a packed bitmap."""
+    for byte_index in range(first_slot >> 3, ((last_slot - 1) >> 3) + 1):
+        low = max(first_slot - byte_index * 8, 0)
+        high = min(last_slot - byte_index * 8, 8)
+        # np.packbits is big-endian: slot 0 of a byte is its most significant bit.
+        yield byte_index, (0xFF >> low) & (0xFF << (8 - high)) & 0xFF
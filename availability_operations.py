@@ -0,0 +1,377 @@
+import asyncio
+import azure.functions as func
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+import zlib
+from datetime import date, datetime, time, timedelta
+from time import perf_counter
+
+from availability import AvailabilityStore, BusyChange
+from availability_snapshot import load_snapshot
+from calendar_backend import CalendarClient, load_default_calendar_client
+from metrics import metrics
+from persistence import load_default_persistence
+from parsing_operations import MAX_QUERY_BYTES, QUERY_TOO_LARGE, create_error_response, read_body
+from request_logging import REQUEST_LOGGER, bind_request_id
+from response_encoding import json_backend
+from time_zones import time_zone_service
+
+MAX_RANGE_DAYS = 92
+# Date arithmetic around a range (whole weeks, the day after, local-day shifts)
+# steps up to a week past it, so ranges stay that far inside date's limits.
+EARLIEST_DATE = date.min + timedelta(days=7)
+LATEST_DATE = date.max - timedelta(days=7)
+MAX_SUGGESTIONS = 50
+# Store versions restart with every process, so ETags also carry an instance tag.
+INSTANCE_TAG = uuid.uuid4().hex[:8]
+
+logger = logging.getLogger(f"{REQUEST_LOGGER}.availability")
+
+def load_default_store() -> AvailabilityStore:
+    """
+    Return the startup availability store.
+
+    Memory-maps the snapshot named by the AVAILABILITY_SNAPSHOT_PATH app setting
+    when it exists, so a cold start does not rebuild availability; otherwise loads
+    it from the SQLite database named by SQLITE_PATH when that holds any. Failing
+    both (or if they cannot be read), starts from an empty store.
+    """
+    snapshot_path = os.environ.get("AVAILABILITY_SNAPSHOT_PATH")
+    if snapshot_path and os.path.exists(snapshot_path):
+        try:
+            return load_snapshot(snapshot_path)
+        except (OSError, ValueError):
+            logger.exception(f"Could not load availability snapshot {snapshot_path}",
+                             extra={"message_type": "snapshot_load_failed"})
+    persistence = load_default_persistence()
+    if persistence is not None:
+        try:
+            if persistence.has_availability():
+                return persistence.load_availability()
+        except (sqlite3.Error, ValueError):
+            logger.exception("Could not load availability from SQLite",
+                             extra={"message_type": "persistence_load_failed"})
+    return AvailabilityStore()
+
+availability_store = None
+calendar_client = None
+_calendar_loaded = False
+_calendar_error = None
+_calendar_lock = threading.Lock()
+_store_lock = threading.Lock()
+_publish_lock = threading.Lock()
+
+def get_availability_store() -> AvailabilityStore:
+    """Return the process-wide availability store used by the HTTP handlers, loading it on first use."""
+    global availability_store
+    if availability_store is None:
+        with _store_lock:
+            if availability_store is None:
+                availability_store = load_default_store()
+    return availability_store
+
+async def _request_store() -> AvailabilityStore:
+    """Return the process-wide store; the first load (snapshot or SQLite) runs off the event loop."""
+    if availability_store is not None:
+        return availability_store
+    return await asyncio.to_thread(get_availability_store)
+
+def publish_availability_changes(changes, members=()) -> AvailabilityStore:
+    """
+    Apply BusyChanges to the process-wide store and publish the result as its new version.
+
+    Requests already running keep the version they started with; later ones see
+    the new one. Writers are serialized so no update is lost, and the changed
+    member-days are written through to SQLite when persistence is configured.
+    """
+    global availability_store
+    changes = list(changes)
+    with _publish_lock:
+        availability_store = get_availability_store().apply_changes(changes, members)
+        persistence = load_default_persistence()
+        if persistence is not None:
+            persistence.save_changes(availability_store, changes, members)
+        return availability_store
+
+def get_calendar_client():
+    """
+    Return the configured calendar client, or None when availability comes only from the store.
+
+    Unless set_calendar_client was called, the client is built on first use from
+    the CALENDAR_BACKEND_URL app setting. Invalid settings are read once and then
+    raise ValueError on every call.
+    """
+    global calendar_client, _calendar_loaded, _calendar_error
+    if not _calendar_loaded:
+        with _calendar_lock:
+            if not _calendar_loaded:
+                try:
+                    calendar_client = load_default_calendar_client()
+                except ValueError as e:
+                    _calendar_error = f"Invalid calendar backend settings: {str(e)}"
+                    logger.exception(_calendar_error, extra={"message_type": "calendar_config_invalid"})
+                _calendar_loaded = True
+    if _calendar_error is not None:
+        raise ValueError(_calendar_error)
+    return calendar_client
+
+def set_calendar_client(client: CalendarClient) -> None:
+    """Configure the calendar client used to load members missing from the store."""
+    global calendar_client, _calendar_loaded, _calendar_error
+    calendar_client = client
+    _calendar_loaded = True
+    _calendar_error = None
+
+async def find_common_availability(req: func.HttpRequest, store: AvailabilityStore = None,
+                                   calendar: CalendarClient = None) -> func.HttpResponse:
+    """
+    Return the windows in which all requested members are free over a date range.
+
+    Expects a JSON body: {"members": [...], "start_date": "YYYY-MM-DD",
+    "end_date": "YYYY-MM-DD", "min_duration_minutes": 30}. end_date is inclusive
+    and defaults to start_date. When a calendar client is configured, members not
+    yet in the store are fetched from it concurrently before the search.
+    """
+    bind_request_id(req)
+    logger.info("Processing new common availability request", extra={"message_type": "availability_received"})
+    try:
+        store = store or await _request_store()
+        try:
+            calendar = calendar or get_calendar_client()
+        except ValueError as e:
+            return create_error_response(str(e), status_code=503)
+        if read_body(req, MAX_QUERY_BYTES) is None:
+            return create_error_response(QUERY_TOO_LARGE, status_code=413)
+        try:
+            started = perf_counter()
+            request_data = req.get_json()
+            members, start_date, end_date, min_duration = _parse_availability_request(request_data)
+            metrics.observe("decode", perf_counter() - started)
+        except ValueError as e:
+            return create_error_response(f"Invalid availability request: {str(e)}", status_code=400)
+
+        store, error_response = await _load_missing_members(store, calendar, members, start_date, end_date)
+        if error_response is not None:
+            return error_response
+        etag = availability_etag(store, req.get_body())
+        if etag in req.headers.get("If-None-Match", ""):
+            return func.HttpResponse(status_code=304, headers={"ETag": etag})
+
+        started = perf_counter()
+        windows = store.common_free_windows(members, start_date, end_date, min_duration)
+        serializing = perf_counter()
+        metrics.observe("availability_lookup", serializing - started)
+        response_data = {
+            "status": "success",
+            "members": members,
+            "windows": [
+                {
+                    "start": start.isoformat(),
+                    "end": end.isoformat(),
+                    "duration_minutes": int((end - start).total_seconds() // 60)
+                }
+                for start, end in windows
+            ]
+        }
+        response_body = json_backend.dumps(response_data)
+        metrics.observe("serialization", perf_counter() - serializing)
+        return func.HttpResponse(
+            response_body,
+            mimetype="application/json",
+            status_code=200,
+            headers={"ETag": etag}
+        )
+
+    except Exception as e:
+        with metrics.timed("error"):
+            error_msg = f"Error processing request: {str(e)}"
+            logger.exception(error_msg, extra={"message_type": "request_failed"})
+            return create_error_response(error_msg, status_code=500)
+
+async def suggest_meeting_slots(req: func.HttpRequest, store: AvailabilityStore = None,
+                                calendar: CalendarClient = None) -> func.HttpResponse:
+    """
+    Return the best-scoring meeting slots for required and optional attendees.
+
+    Expects a JSON body: {"required": [...], "optional": [...], "start_date": "YYYY-MM-DD",
+    "end_date": "YYYY-MM-DD", "duration_minutes": 30, "limit": 5,
+    "preferred_start": "2026-10-20T15:00:00+02:00", "time_zones": {"member": "Europe/Paris"},
+    "working_hours": {"start": "09:00", "end": "17:00"}}. Only "required", "start_date"
+    and "duration_minutes" are mandatory. Times in the response are on the store's UTC clock.
+    """
+    bind_request_id(req)
+    logger.info("Processing new slot suggestion request", extra={"message_type": "suggestion_received"})
+    try:
+        store = store or await _request_store()
+        try:
+            calendar = calendar or get_calendar_client()
+        except ValueError as e:
+            return create_error_response(str(e), status_code=503)
+        if read_body(req, MAX_QUERY_BYTES) is None:
+            return create_error_response(QUERY_TOO_LARGE, status_code=413)
+        try:
+            started = perf_counter()
+            options = _parse_suggestion_request(req.get_json())
+            metrics.observe("decode", perf_counter() - started)
+        except ValueError as e:
+            return create_error_response(f"Invalid suggestion request: {str(e)}", status_code=400)
+
+        members = options["required"] + options["optional"]
+        store, error_response = await _load_missing_members(store, calendar, members, options["start_date"],
+                                                            options["end_date"])
+        if error_response is not None:
+            return error_response
+        etag = availability_etag(store, req.get_body())
+        if etag in req.headers.get("If-None-Match", ""):
+            return func.HttpResponse(status_code=304, headers={"ETag": etag})
+
+        # Imported on first use, like the other handlers' heavy modules.
+        from slot_suggestions import suggest_slots
+        started = perf_counter()
+        suggestions = suggest_slots(store, **options)
+        serializing = perf_counter()
+        metrics.observe("availability_lookup", serializing - started)
+        response_data = {
+            "status": "success",
+            "suggestions": [
+                dict(suggestion, start=suggestion["start"].isoformat(), end=suggestion["end"].isoformat())
+                for suggestion in suggestions
+            ]
+        }
+        response_body = json_backend.dumps(response_data)
+        metrics.observe("serialization", perf_counter() - serializing)
+        return func.HttpResponse(
+            response_body,
+            mimetype="application/json",
+            status_code=200,
+            headers={"ETag": etag}
+        )
+
+    except Exception as e:
+        with metrics.timed("error"):
+            error_msg = f"Error processing request: {str(e)}"
+            logger.exception(error_msg, extra={"message_type": "request_failed"})
+            return create_error_response(error_msg, status_code=500)
+
+def availability_etag(store: AvailabilityStore, request_body: bytes) -> str:
+    """Return the ETag of a response to request_body computed from a store version."""
+    return f'"{INSTANCE_TAG}-{store.version}-{zlib.crc32(request_body):08x}"'
+
+async def _load_missing_members(store: AvailabilityStore, calendar, members, start_date: date, end_date: date):
+    """
+    Fetch members missing from the store through the calendar client, if one is configured.
+
+    Returns (store, error response): the store version that includes the fetched
+    members (published when store is the process-wide one), and an error response
+    when members are still unknown (404) or their lookup failed (503), otherwise None.
+    """
+    unknown = [member for member in members if member not in store]
+    failed = []
+    if unknown and calendar is not None:
+        window_start = datetime.combine(start_date, time())
+        window_end = datetime.combine(end_date + timedelta(days=1), time())
+        busy_by_member, errors = await calendar.fetch_many(unknown, window_start, window_end)
+        changes = [
+            BusyChange(member, max(busy_start, window_start), min(busy_end, window_end), True)
+            for member, intervals in busy_by_member.items()
+            for busy_start, busy_end in intervals
+        ]
+        if busy_by_member:
+            # Applying changes copies store rows and publishing writes SQLite; keep both off the event loop.
+            if store is availability_store:
+                store = await asyncio.to_thread(publish_availability_changes, changes, busy_by_member)
+            else:
+                store = await asyncio.to_thread(store.apply_changes, changes, busy_by_member)
+        unknown = [member for member, error in errors.items() if isinstance(error, KeyError)]
+        failed = [member for member, error in errors.items() if not isinstance(error, KeyError)]
+    if unknown:
+        return store, create_error_response(f"Unknown members: {', '.join(unknown)}", status_code=404)
+    if failed:
+        error_msg = f"Calendar lookup failed for members: {', '.join(failed)}"
+        logger.warning(error_msg, extra={"message_type": "calendar_lookup_failed"})
+        return store, create_error_response(error_msg, status_code=503)
+    return store, None
+
+def _parse_availability_request(request_data):
+    """Validate an availability request body; raises ValueError with a client-facing message."""
+    if not isinstance(request_data, dict):
+        raise ValueError("body must be a JSON object")
+
+    members = _parse_member_list(request_data, "members")
+    if not members:
+        raise ValueError("'members' must be a non-empty list of member ids")
+    start_date, end_date = _parse_date_range(request_data)
+    min_duration = _parse_non_negative_int(request_data, "min_duration_minutes", 0)
+    return members, start_date, end_date, min_duration
+
+def _parse_suggestion_request(request_data) -> dict:
+    """Validate a slot suggestion request body into suggest_slots keyword arguments."""
+    if not isinstance(request_data, dict):
+        raise ValueError("body must be a JSON object")
+
+    required = _parse_member_list(request_data, "required")
+    if not required:
+        raise ValueError("'required' must be a non-empty list of member ids")
+    start_date, end_date = _parse_date_range(request_data)
+    duration = _parse_non_negative_int(request_data, "duration_minutes", None)
+    if not duration:
+        raise ValueError("'duration_minutes' must be a positive integer")
+    limit = _parse_non_negative_int(request_data, "limit", 5)
+    if not 1 <= limit <= MAX_SUGGESTIONS:
+        raise ValueError(f"'limit' must be between 1 and {MAX_SUGGESTIONS}")
+
+    preferred_start = request_data.get("preferred_start")
+    if preferred_start is not None:
+        preferred_start = datetime.fromisoformat(str(preferred_start))
+
+    time_zones = request_data.get("time_zones", {})
+    if not isinstance(time_zones, dict):
+        raise ValueError("'time_zones' must map member ids to time zone names")
+    for zone_name in set(time_zones.values()):
+        time_zone_service.zone(zone_name)
+
+    working_hours = request_data.get("working_hours", {})
+    if not isinstance(working_hours, dict):
+        raise ValueError("'working_hours' must be an object with 'start' and 'end'")
+    work_start = time.fromisoformat(str(working_hours.get("start", "09:00")))
+    work_end = time.fromisoformat(str(working_hours.get("end", "17:00")))
+    if work_end <= work_start:
+        raise ValueError("working hours must end after they start")
+
+    return {
+        "required": required,
+        "optional": _parse_member_list(request_data, "optional"),
+        "start_date": start_date,
+        "end_date": end_date,
+        "duration_minutes": duration,
+        "preferred_start": preferred_start,
+        "time_zones": time_zones,
+        "working_hours": (work_start, work_end),
+        "limit": limit,
+    }
+
+def _parse_member_list(request_data: dict, field: str) -> list:
+    members = request_data.get(field, [])
+    if not isinstance(members, list) or not all(isinstance(m, str) for m in members):
+        raise ValueError(f"'{field}' must be a list of member ids")
+    return members
+
+def _parse_date_range(request_data: dict):
+    start_date = date.fromisoformat(str(request_data.get("start_date")))
+    end_date = date.fromisoformat(str(request_data.get("end_date", start_date.isoformat())))
+    if end_date < start_date:
+        raise ValueError("'end_date' must not be before 'start_date'")
+    if (end_date - start_date).days + 1 > MAX_RANGE_DAYS:
+        raise ValueError(f"date range must not exceed {MAX_RANGE_DAYS} days")
+    if start_date < EARLIEST_DATE or end_date > LATEST_DATE:
+        raise ValueError(f"dates must be between {EARLIEST_DATE.isoformat()} and {LATEST_DATE.isoformat()}")
+    return start_date, end_date
+
+def _parse_non_negative_int(request_data: dict, field: str, default):
+    value = request_data.get(field, default)
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise ValueError(f"'{field}' must be a non-negative integer")
+    return value
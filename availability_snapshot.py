@@ -0,0 +1,119 @@
+"""Versioned binary snapshots of availability data that can be memory-mapped at startup.
+
+Layout (little-endian):
+
+    header         HEADER struct, see below
+    member index   member_count x (uint16 byte length, UTF-8 member id)
+    padding        zero bytes up to a 64-byte boundary
+    bitmaps        day_count x member_count x bytes_per_day packed busy bits
+
+Days are stored densely from first_day, so the bitmaps section maps directly onto a
+(days x members x bytes) array and every day is a zero-copy view of the file.
+"""
+
+import mmap
+import os
+import struct
+from datetime import date, timedelta
+
+import numpy as np
+
+from availability import AvailabilityStore
+
+SNAPSHOT_MAGIC = b"TAVSNAP\x00"
+SNAPSHOT_VERSION = 1
+BITMAP_ALIGNMENT = 64
+
+# magic, version, slot_minutes, bytes_per_day, reserved, member_count, day_count,
+# first_day (proleptic ordinal), reserved, member_index_offset, bitmaps_offset
+HEADER = struct.Struct("<8sHHHHIIiIQQ")
+MEMBER_LENGTH = struct.Struct("<H")
+
+
+def write_snapshot(store: AvailabilityStore, path: str, start_date: date = None, end_date: date = None) -> dict:
+    """
+    Write store to path as a snapshot covering start_date..end_date inclusive.
+
+    The range defaults to the store's first and last written days. The file is
+    written beside path and renamed into place, so readers never see a partial
+    snapshot. Returns the header fields that were written.
+    """
+    stored_days = store.stored_days()
+    start_date = start_date or (stored_days[0] if stored_days else date.today())
+    end_date = end_date or (stored_days[-1] if stored_days else start_date)
+    if end_date < start_date:
+        raise ValueError("end_date must not be before start_date")
+
+    members = store.members
+    member_index = b"".join(
+        MEMBER_LENGTH.pack(len(encoded)) + encoded
+        for encoded in (member_id.encode("utf-8") for member_id in members)
+    )
+    member_index_offset = HEADER.size
+    bitmaps_offset = -(-(member_index_offset + len(member_index)) // BITMAP_ALIGNMENT) * BITMAP_ALIGNMENT
+    day_count = (end_date - start_date).days + 1
+    empty_day = bytes(len(members) * store.bytes_per_day)
+
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as out:
+        out.write(HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION, store.slot_minutes, store.bytes_per_day, 0,
+            len(members), day_count, start_date.toordinal(), 0, member_index_offset, bitmaps_offset
+        ))
+        out.write(member_index)
+        out.write(bytes(bitmaps_offset - member_index_offset - len(member_index)))
+        for offset in range(day_count):
+            bitmaps = store.day_bitmaps(start_date + timedelta(days=offset))
+            out.write(empty_day if bitmaps is None else np.ascontiguousarray(bitmaps).tobytes())
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(temporary_path, path)
+
+    return {
+        "version": SNAPSHOT_VERSION,
+        "slot_minutes": store.slot_minutes,
+        "members": len(members),
+        "first_day": start_date.isoformat(),
+        "days": day_count,
+    }
+
+
+def load_snapshot(path: str) -> AvailabilityStore:
+    """
+    Memory-map a snapshot and return a store whose day bitmaps are views of the file.
+
+    Nothing is copied or deserialized beyond the member index; days are copied
+    only if the returned store is later written to. Raises ValueError for files
+    that are not snapshots, use an unsupported version or are truncated.
+    """
+    with open(path, "rb") as snapshot_file:
+        if os.fstat(snapshot_file.fileno()).st_size < HEADER.size:
+            raise ValueError(f"{path} is too small to be an availability snapshot")
+        buffer = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    (magic, version, slot_minutes, bytes_per_day, _, member_count, day_count,
+     first_day, _, member_index_offset, bitmaps_offset) = HEADER.unpack_from(buffer, 0)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"{path} is not an availability snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported availability snapshot version {version} (expected {SNAPSHOT_VERSION})")
+    if len(buffer) < bitmaps_offset + day_count * member_count * bytes_per_day:
+        raise ValueError(f"{path} is truncated")
+
+    members = []
+    position = member_index_offset
+    for _ in range(member_count):
+        (length,) = MEMBER_LENGTH.unpack_from(buffer, position)
+        position += MEMBER_LENGTH.size
+        members.append(bytes(buffer[position:position + length]).decode("utf-8"))
+        position += length
+
+    bitmaps = np.frombuffer(buffer, dtype=np.uint8, count=day_count * member_count * bytes_per_day,
+                            offset=bitmaps_offset).reshape(day_count, member_count, bytes_per_day)
+    start_date = date.fromordinal(first_day)
+    day_matrices = {start_date + timedelta(days=offset): bitmaps[offset] for offset in range(day_count)}
+
+    store = AvailabilityStore.from_day_matrices(slot_minutes, members, day_matrices, backing=buffer)
+    if store.bytes_per_day != bytes_per_day:
+        raise ValueError(f"{path} has inconsistent slot geometry")
+    return store
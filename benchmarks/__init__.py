@@ -0,0 +1 @@
+"""Offline benchmarks for TeamAvailabilityApp; run each module with python -m benchmarks.<name>."""
@@ -0,0 +1,82 @@
+"""Measure .ics ingestion throughput in events per second on a synthetic calendar.
+
+    python -m benchmarks.ics_throughput --events 100000 --members 500
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Allow running from the repository root without installation.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from availability import AvailabilityStore
+from ics_ingest import ingest_ics
+
+WINDOW_START = datetime(2026, 10, 1)
+WINDOW_END = datetime(2026, 11, 1)
+
+
+def write_synthetic_calendar(path: str, events: int, members: int, recurring_ratio: float = 0.2, seed: int = 7) -> None:
+    """Write a calendar of random one-off and weekly events spread over the benchmark window."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as out:
+        out.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//TeamAvailabilityApp//benchmark//EN\r\n")
+        for index in range(events):
+            start = WINDOW_START + timedelta(days=rng.randrange(31), hours=rng.randrange(8, 18),
+                                             minutes=rng.choice((0, 15, 30, 45)))
+            end = start + timedelta(minutes=rng.choice((15, 30, 60, 90)))
+            attendees = rng.sample(range(members), k=min(members, rng.randint(1, 4)))
+            out.write("BEGIN:VEVENT\r\n")
+            out.write(f"UID:event-{index}@benchmark\r\n")
+            out.write(f"DTSTART:{start:%Y%m%dT%H%M%S}Z\r\nDTEND:{end:%Y%m%dT%H%M%S}Z\r\n")
+            out.write(f"SUMMARY:Synthetic meeting {index}\r\n")
+            if rng.random() < recurring_ratio:
+                out.write("RRULE:FREQ=WEEKLY;COUNT=6\r\n")
+            out.write(f"ORGANIZER:mailto:member{attendees[0]}@example.com\r\n")
+            for attendee in attendees[1:]:
+                out.write(f"ATTENDEE;PARTSTAT=ACCEPTED:mailto:member{attendee}@example.com\r\n")
+            out.write("END:VEVENT\r\n")
+        out.write("END:VCALENDAR\r\n")
+
+
+def run(events: int, members: int, slot_minutes: int) -> dict:
+    """Generate a calendar, ingest it and return throughput figures."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "benchmark.ics")
+        write_synthetic_calendar(path, events, members)
+        file_bytes = os.path.getsize(path)
+
+        store = AvailabilityStore(slot_minutes=slot_minutes)
+        started = time.perf_counter()
+        stats = ingest_ics(path, store, WINDOW_START, WINDOW_END)
+        elapsed = time.perf_counter() - started
+
+    return {
+        "benchmark": "ics_throughput",
+        "events": stats["events"],
+        "occurrences": stats["occurrences"],
+        "members": len(store.members),
+        "file_megabytes": round(file_bytes / 1e6, 2),
+        "seconds": round(elapsed, 3),
+        "events_per_second": round(stats["events"] / elapsed),
+        "occurrences_per_second": round(stats["occurrences"] / elapsed),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--members", type=int, default=500)
+    parser.add_argument("--slot-minutes", type=int, default=15)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.events, args.members, args.slot_minutes)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
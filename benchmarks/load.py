@@ -0,0 +1,376 @@
+"""Drive the Functions HTTP routes with open-loop load from a pool of worker processes.
+
+Requests either go in-process to each worker's own copy of the app, or over HTTP to
+a locally running host (`func start`):
+
+    python -m benchmarks.load --route process_scheduling_query --rates 200,400,800,1600 --duration 20
+    python -m benchmarks.load --url http://localhost:7071 --route http_trigger1 --rates 500 --connections 16
+
+Arrivals follow a Poisson process at the target rate, split evenly across workers.
+Latency is measured from each request's scheduled send time, so queueing behind a
+saturated worker or host shows up as latency rather than as a quietly lower rate.
+Every rate step reports throughput, latency percentiles and error rates per
+interval, and the first step that cannot keep up is reported as the knee. A rate
+of 0 runs closed-loop instead, with every connection sending back to back.
+"""
+
+import argparse
+import asyncio
+import http.client
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+
+# Allow running from the repository root without installation.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.replay import BATCH_SIZE, generate_corpus
+
+ROUTES = ("http_trigger1", "process_scheduling_query", "process_scheduling_query_batch")
+
+# A step counts as saturated when it completes less than this share of its target rate.
+SATURATION_RATIO = 0.95
+BARRIER_TIMEOUT_SECONDS = 120.0
+
+
+def request_factory(route: str, seed: int = 42, distinct: int = None, body: bytes = None):
+    """Return a callable producing the (method, params, body) of the next request to route."""
+    if body is not None:
+        return lambda: ("POST", {}, body)
+    if route == "http_trigger1":
+        names = itertools.count()
+        return lambda: ("GET", {"name": f"user{next(names)}"}, b"")
+    queries = generate_corpus(sys.maxsize, seed, distinct)
+    if route == "process_scheduling_query_batch":
+        return lambda: ("POST", {}, "\n".join(
+            json.dumps({"UserQuery": query}) for query in itertools.islice(queries, BATCH_SIZE)).encode("utf-8"))
+    return lambda: ("POST", {}, next(queries).encode("utf-8"))
+
+
+class InProcessTarget:
+    """Calls a function_app route handler directly, awaiting async handlers on a private loop."""
+
+    def __init__(self, route: str):
+        import azure.functions as func
+        import function_app
+
+        self.route = route
+        self.handler = function_app.route_handlers()[route]
+        self.request_class = func.HttpRequest
+        self.loop = asyncio.new_event_loop()
+
+    def send(self, method: str, params: dict, body: bytes) -> int:
+        response = self.handler(self.request_class(method=method, url=f"/api/{self.route}", params=params, body=body))
+        if asyncio.iscoroutine(response):
+            response = self.loop.run_until_complete(response)
+        return response.status_code
+
+
+class HttpTarget:
+    """Sends requests to a running host over one persistent connection per thread."""
+
+    def __init__(self, route: str, base_url: str, function_key: str = None, timeout_seconds: float = 30.0):
+        parsed = urlsplit(base_url)
+        self.connection_class = http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+        self.netloc = parsed.netloc
+        self.path = f"{parsed.path.rstrip('/')}/api/{route}"
+        self.headers = {"x-functions-key": function_key} if function_key else {}
+        self.timeout_seconds = timeout_seconds
+        self._local = threading.local()
+
+    def send(self, method: str, params: dict, body: bytes) -> int:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self.connection_class(self.netloc, timeout=self.timeout_seconds)
+        path = f"{self.path}?{urlencode(params)}" if params else self.path
+        try:
+            connection.request(method, path, body=body or None, headers=self.headers)
+            response = connection.getresponse()
+            response.read()
+        except Exception:
+            # The connection state is unknown after a failure; reconnect on the next request.
+            connection.close()
+            self._local.connection = None
+            raise
+        return response.status
+
+
+_barrier = None
+_targets = {}
+
+
+def _init_worker(barrier) -> None:
+    global _barrier
+    _barrier = barrier
+
+
+def _worker_target(spec: dict):
+    """Return this worker's target for spec, building and warming it on first use."""
+    key = (spec["route"], spec["url"])
+    target = _targets.get(key)
+    if target is None:
+        if spec["url"]:
+            target = HttpTarget(spec["route"], spec["url"], spec["function_key"])
+        else:
+            target = InProcessTarget(spec["route"])
+        make_request = request_factory(spec["route"], spec["seed"], spec["distinct"], spec["body"])
+        for _ in range(spec["warmup"]):
+            target.send(*make_request())
+        _targets[key] = target
+    return target
+
+
+def _run_worker(spec: dict) -> dict:
+    """Run one worker's share of a rate step once every worker is ready, and return its raw samples."""
+    try:
+        target = _worker_target(spec)
+    except BaseException:
+        # Release the other workers instead of leaving them waiting on the barrier.
+        _barrier.abort()
+        raise
+    _barrier.wait(BARRIER_TIMEOUT_SECONDS)
+    return drive(target, request_factory(spec["route"], spec["seed"], spec["distinct"], spec["body"]),
+                 spec["rate"], spec["duration"], spec["connections"], spec["seed"])
+
+
+def drive(target, make_request, rate: float, duration: float, connections: int = 1, seed: int = 42) -> dict:
+    """
+    Send requests to target for duration seconds and return per-request samples.
+
+    With a positive rate, sends follow a Poisson schedule and latency counts from the
+    scheduled time; arrivals still unsent when the duration ends are counted as
+    dropped. With rate 0, each connection sends back to back. More than one
+    connection sends from a thread pool, which only helps targets that release the
+    GIL while waiting (HTTP).
+    """
+    scheduled_ns, latency_ns, statuses = array("q"), array("q"), array("h")
+    exceptions = Counter()
+    lock = threading.Lock()
+
+    def send(scheduled: int, request: tuple) -> None:
+        try:
+            status = target.send(*request)
+        except Exception as error:
+            status = 0
+            with lock:
+                exceptions[type(error).__name__] += 1
+        finished = time.perf_counter_ns()
+        with lock:
+            scheduled_ns.append(scheduled - started)
+            latency_ns.append(finished - scheduled)
+            statuses.append(status)
+
+    started = time.perf_counter_ns()
+    deadline = started + int(duration * 1e9)
+    dropped = 0
+
+    if rate > 0:
+        rng = random.Random(seed)
+        executor = ThreadPoolExecutor(connections) if connections > 1 else None
+        arrival = started
+        while True:
+            arrival += int(rng.expovariate(rate) * 1e9)
+            if arrival >= deadline:
+                break
+            now = time.perf_counter_ns()
+            if now >= deadline:
+                dropped += 1
+                continue
+            # Bodies come from one generator, so they are built here rather than on the sending threads.
+            request = make_request()
+            if arrival > now:
+                time.sleep((arrival - now) / 1e9)
+            if executor:
+                executor.submit(send, arrival, request)
+            else:
+                send(arrival, request)
+        if executor:
+            executor.shutdown(wait=True)
+    else:
+        def loop() -> None:
+            while time.perf_counter_ns() < deadline:
+                with lock:
+                    request = make_request()
+                send(time.perf_counter_ns(), request)
+
+        threads = [threading.Thread(target=loop) for _ in range(connections)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    return {
+        "scheduled_ns": scheduled_ns.tobytes(),
+        "latency_ns": latency_ns.tobytes(),
+        "statuses": statuses.tobytes(),
+        "exceptions": dict(exceptions),
+        "dropped": dropped,
+    }
+
+
+def _percentiles(latency_ms) -> dict:
+    if not len(latency_ms):
+        return {"p50": None, "p90": None, "p99": None, "p999": None, "max": None}
+    p50, p90, p99, p999 = np.percentile(latency_ms, (50, 90, 99, 99.9))
+    return {"p50": round(float(p50), 3), "p90": round(float(p90), 3), "p99": round(float(p99), 3),
+            "p999": round(float(p999), 3), "max": round(float(latency_ms.max()), 3)}
+
+
+def summarize(samples: list, rate: float, interval_seconds: float = 1.0, max_error_rate: float = 0.01,
+              p99_slo_ms: float = None) -> dict:
+    """
+    Merge worker samples into one step report.
+
+    Requests are bucketed into intervals by completion time. A request is an error
+    when it raised or returned a 5xx status.
+    """
+    scheduled = np.concatenate([np.frombuffer(sample["scheduled_ns"], dtype=np.int64) for sample in samples])
+    latency = np.concatenate([np.frombuffer(sample["latency_ns"], dtype=np.int64) for sample in samples])
+    statuses = np.concatenate([np.frombuffer(sample["statuses"], dtype=np.int16) for sample in samples])
+    exceptions = sum((Counter(sample["exceptions"]) for sample in samples), Counter())
+    dropped = sum(sample["dropped"] for sample in samples)
+
+    latency_ms = latency / 1e6
+    completed_s = (scheduled + latency) / 1e9
+    errors = (statuses == 0) | (statuses >= 500)
+    seconds = float(completed_s.max()) if len(completed_s) else 0.0
+    throughput = len(latency) / seconds if seconds else 0.0
+    error_rate = float(errors.mean()) if len(errors) else 0.0
+
+    intervals = []
+    buckets = (completed_s // interval_seconds).astype(np.int64)
+    for bucket in np.unique(buckets):
+        in_bucket = buckets == bucket
+        count = int(in_bucket.sum())
+        bucket_errors = int(errors[in_bucket].sum())
+        bucket_latency = _percentiles(latency_ms[in_bucket])
+        # The last interval may be cut short by the end of the step.
+        span = min(interval_seconds, seconds - bucket * interval_seconds) or interval_seconds
+        intervals.append({
+            "start_seconds": round(float(bucket * interval_seconds), 3),
+            "requests": count,
+            "requests_per_second": round(count / span, 1),
+            "errors": bucket_errors,
+            "error_rate": round(bucket_errors / count, 4),
+            "p50_ms": bucket_latency["p50"],
+            "p99_ms": bucket_latency["p99"],
+        })
+
+    latency_summary = _percentiles(latency_ms)
+    saturated = error_rate > max_error_rate
+    if rate > 0:
+        saturated = saturated or throughput < rate * SATURATION_RATIO
+    if p99_slo_ms is not None and latency_summary["p99"] is not None:
+        saturated = saturated or latency_summary["p99"] > p99_slo_ms
+    status_codes, status_counts = np.unique(statuses, return_counts=True)
+    return {
+        "rate": rate,
+        "requests": len(latency),
+        "dropped": dropped,
+        "seconds": round(seconds, 3),
+        "requests_per_second": round(throughput, 1),
+        "errors": int(errors.sum()),
+        "error_rate": round(error_rate, 4),
+        "status_counts": {str(int(code)): int(count) for code, count in zip(status_codes, status_counts)},
+        "exceptions": dict(exceptions),
+        "latency_ms": latency_summary,
+        "saturated": saturated,
+        "intervals": intervals,
+    }
+
+
+def run(route: str = "process_scheduling_query", rates=(100,), duration: float = 10.0, workers: int = None,
+        connections: int = None, url: str = None, function_key: str = None, interval_seconds: float = 1.0,
+        distinct: int = None, body: bytes = None, warmup: int = 20, seed: int = 42,
+        max_error_rate: float = 0.01, p99_slo_ms: float = None) -> dict:
+    """
+    Run each rate step in turn on a pool of worker processes and return the report.
+
+    rates are total requests per second across all workers. The pool is created
+    once, so workers stay warm from one step to the next.
+    """
+    if route not in ROUTES and body is None:
+        raise ValueError(f"Route {route} needs a request body; generated bodies exist for {', '.join(ROUTES)}")
+    workers = workers or os.cpu_count() or 1
+    connections = connections or (8 if url else 1)
+    # Spawned workers import the app from scratch, like separate host instances.
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+
+    steps = []
+    with context.Pool(workers, initializer=_init_worker, initargs=(barrier,)) as pool:
+        for rate in rates:
+            specs = [{
+                "route": route, "url": url, "function_key": function_key, "body": body, "distinct": distinct,
+                "warmup": warmup, "rate": rate / workers, "duration": duration, "connections": connections,
+                "seed": seed + worker,
+            } for worker in range(workers)]
+            # One spec per worker: each blocks on the barrier, so no worker can take a second.
+            samples = pool.map(_run_worker, specs, chunksize=1)
+            steps.append(summarize(samples, rate, interval_seconds, max_error_rate, p99_slo_ms))
+
+    sustained = [step["rate"] for step in steps if step["rate"] > 0 and not step["saturated"]]
+    knee = next((step["rate"] for step in steps if step["rate"] > 0 and step["saturated"]), None)
+    return {
+        "benchmark": "load",
+        "mode": "http" if url else "in-process",
+        "route": route,
+        "url": url,
+        "workers": workers,
+        "connections_per_worker": connections,
+        "duration_seconds": duration,
+        "max_sustained_rate": max(sustained) if sustained else None,
+        "knee_rate": knee,
+        "steps": steps,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--route", default="process_scheduling_query",
+                        help=f"Function route to load; generated bodies exist for {', '.join(ROUTES)}")
+    parser.add_argument("--rates", default="100",
+                        help="Comma-separated total requests per second, one step each; 0 runs closed-loop")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per rate step")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--connections", type=int, help="Concurrent connections per worker (default: 8 over HTTP, 1 in-process)")
+    parser.add_argument("--url", help="Base URL of a running host, e.g. http://localhost:7071; in-process when omitted")
+    parser.add_argument("--function-key", default=os.environ.get("FUNCTION_KEY"), help="Sent as x-functions-key")
+    parser.add_argument("--body-file", help="Send this file's contents as every request body")
+    parser.add_argument("--distinct", type=int, help="Cycle generated queries through this many unique phrasings")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds per reported interval")
+    parser.add_argument("--warmup", type=int, default=20, help="Requests each worker sends before timing starts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--p99-slo-ms", type=float, help="Count a step as saturated when its p99 exceeds this")
+    parser.add_argument("--output", help="Write the result JSON to this file")
+    args = parser.parse_args(argv)
+
+    body = None
+    if args.body_file:
+        with open(args.body_file, "rb") as body_file:
+            body = body_file.read()
+    result = run(args.route, [float(rate) for rate in args.rates.split(",")], args.duration, args.workers,
+                 args.connections, args.url, args.function_key, args.interval, args.distinct, body, args.warmup,
+                 args.seed, args.max_error_rate, args.p99_slo_ms)
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output + "\n")
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
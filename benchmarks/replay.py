@@ -0,0 +1,261 @@
+"""Replay a corpus of scheduling queries through the request handlers in-process.
+
+Reports throughput, p50/p95/p99 latency and tracemalloc allocation figures as JSON,
+and compares against a previous run:
+
+    python -m benchmarks.replay --synthetic 100000 --output run.json
+    python -m benchmarks.replay --corpus queries.txt --baseline run.json
+
+A corpus file holds one query per line, either raw text or an NDJSON object with a
+"UserQuery" field. The synthetic generator is lazy, so it scales to millions of
+queries without holding them in memory.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from array import array
+
+import numpy as np
+
+# Allow running from the repository root without installation.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import azure.functions as func
+from parsing_operations import decode_batch_line, parse_schedule_query, parse_schedule_query_batch
+
+VERBS = ("Schedule", "Set up", "Book", "Find time for", "Arrange", "Plan")
+MEETINGS = ("a meeting", "standup", "a 1:1", "project review", "design sync", "team lunch", "retro")
+PEOPLE = ("John", "@jane.smith", "Ana and Bob", "the marketing team", "Priya, Sam & Lee", "@john.doe")
+DATES = ("tomorrow", "today", "next Tuesday", "on Friday", "next week", "March 3rd", "2026-11-03", "")
+TIMES = ("at 2pm", "at 10am", "between 3 and 5", "from 9:30am to 10:15am", "at noon", "3-5pm", "")
+DURATIONS = ("for 30 minutes", "for an hour", "for 90 min", "1-hour", "")
+RECURRENCES = ("every Monday", "daily", "every other week", "weekly", "", "", "")
+
+BATCH_SIZE = 100
+
+
+def generate_corpus(count: int, seed: int = 42, distinct: int = None):
+    """
+    Lazily yield count synthetic queries built from scheduling phrase templates.
+
+    With distinct set, queries cycle through that many unique phrasings, which
+    models the repeated traffic the query cache is meant to absorb.
+    """
+    rng = random.Random(seed)
+
+    def make_query():
+        parts = (rng.choice(VERBS), rng.choice(MEETINGS), "with", rng.choice(PEOPLE),
+                 rng.choice(DATES), rng.choice(TIMES), rng.choice(DURATIONS), rng.choice(RECURRENCES))
+        return " ".join(part for part in parts if part)
+
+    if distinct:
+        pool = [make_query() for _ in range(distinct)]
+        yield from itertools.islice(itertools.cycle(pool), count)
+    else:
+        for _ in range(count):
+            yield make_query()
+
+
+def read_corpus(path: str):
+    """Lazily yield queries from a corpus file, skipping blank and undecodable lines."""
+    with open(path, "rb") as corpus:
+        for raw_line in corpus:
+            raw_line = raw_line.rstrip(b"\n")
+            if not raw_line.strip():
+                continue
+            try:
+                yield decode_batch_line(raw_line)
+            except ValueError:
+                continue
+
+
+def _request(route: str, body: bytes) -> func.HttpRequest:
+    return func.HttpRequest(method="POST", url=f"/api/{route}", body=body)
+
+
+def _call_parse(queries):
+    parse_schedule_query(_request("process_scheduling_query", queries[0].encode("utf-8")))
+
+
+def _call_batch(queries):
+    body = "\n".join(json.dumps({"UserQuery": query}) for query in queries).encode("utf-8")
+    parse_schedule_query_batch(_request("process_scheduling_query_batch", body))
+
+
+def _call_route(route_name: str):
+    """Build a target that calls a function_app route by name, awaiting async handlers on one loop."""
+    def call(queries):
+        import function_app
+        handler = function_app.route_handlers()[route_name]
+        response = handler(_request(route_name, queries[0].encode("utf-8")))
+        if asyncio.iscoroutine(response):
+            _event_loop().run_until_complete(response)
+    return call
+
+
+_EVENT_LOOP = []
+
+
+def _event_loop():
+    if not _EVENT_LOOP:
+        _EVENT_LOOP.append(asyncio.new_event_loop())
+    return _EVENT_LOOP[0]
+
+
+# name -> (callable taking a list of queries, queries per call)
+TARGETS = {
+    "parse_schedule_query": (_call_parse, 1),
+    "process_scheduling_query_batch": (_call_batch, BATCH_SIZE),
+    "process_scheduling_query_route": (_call_route("process_scheduling_query"), 1),
+}
+
+
+def _chunks(queries, size: int):
+    iterator = iter(queries)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def replay(queries, target: str = "parse_schedule_query", allocation_sample: int = 1000, warmup: int = 100) -> dict:
+    """
+    Replay queries through a target and return throughput, latency and allocation figures.
+
+    Latency is per call (a batch target sends BATCH_SIZE queries per call). The
+    first warmup queries are excluded from timing. Allocation figures come from a
+    separate tracemalloc pass over the next allocation_sample queries, so tracing
+    overhead does not distort the latency numbers.
+    """
+    call, per_call = TARGETS[target]
+    chunks = _chunks(queries, per_call)
+
+    for chunk in itertools.islice(chunks, -(-warmup // per_call)):
+        call(chunk)
+
+    sampled = list(itertools.islice(chunks, -(-allocation_sample // per_call)))
+    allocations = _measure_allocations(call, sampled)
+
+    latencies_ns = array("q")
+    query_count = 0
+    started = time.perf_counter()
+    for chunk in itertools.chain(sampled, chunks):
+        call_started = time.perf_counter_ns()
+        call(chunk)
+        latencies_ns.append(time.perf_counter_ns() - call_started)
+        query_count += len(chunk)
+    elapsed = time.perf_counter() - started
+
+    latencies_ms = np.frombuffer(latencies_ns, dtype=np.int64) / 1e6
+    p50, p95, p99 = np.percentile(latencies_ms, (50, 95, 99)) if len(latencies_ms) else (0.0, 0.0, 0.0)
+    return {
+        "benchmark": "replay",
+        "target": target,
+        "calls": len(latencies_ns),
+        "queries": query_count,
+        "seconds": round(elapsed, 4),
+        "queries_per_second": round(query_count / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            "p50": round(float(p50), 4),
+            "p95": round(float(p95), 4),
+            "p99": round(float(p99), 4),
+            "max": round(float(latencies_ms.max()), 4) if len(latencies_ms) else 0.0,
+        },
+        **allocations,
+    }
+
+
+def _measure_allocations(call, chunks) -> dict:
+    """Trace calls with tracemalloc and return mean peak and retained bytes per call."""
+    if not chunks:
+        return {"allocation_sample": 0, "alloc_peak_bytes_per_call": None, "retained_bytes_per_call": None}
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        peak_total = 0
+        for chunk in chunks:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            call(chunk)
+            _, peak = tracemalloc.get_traced_memory()
+            peak_total += peak - before
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return {
+        "allocation_sample": len(chunks),
+        "alloc_peak_bytes_per_call": round(peak_total / len(chunks), 1),
+        "retained_bytes_per_call": round((retained - baseline) / len(chunks), 1),
+    }
+
+
+def compare_to_baseline(result: dict, baseline: dict) -> dict:
+    """Return percentage changes from a baseline run (positive is worse for latency and allocations)."""
+    def change(current, previous):
+        if not previous or current is None:
+            return None
+        return round((current - previous) / previous * 100, 2)
+
+    return {
+        "queries_per_second_pct": change(result["queries_per_second"], baseline.get("queries_per_second")),
+        "p50_pct": change(result["latency_ms"]["p50"], baseline.get("latency_ms", {}).get("p50")),
+        "p99_pct": change(result["latency_ms"]["p99"], baseline.get("latency_ms", {}).get("p99")),
+        "alloc_peak_pct": change(result["alloc_peak_bytes_per_call"], baseline.get("alloc_peak_bytes_per_call")),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--corpus", help="Corpus file with one query per line")
+    source.add_argument("--synthetic", type=int, metavar="N", help="Replay N generated queries")
+    parser.add_argument("--distinct", type=int, help="Cycle the synthetic corpus through this many unique queries")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--target", choices=sorted(TARGETS), default="parse_schedule_query")
+    parser.add_argument("--allocation-sample", type=int, default=1000)
+    parser.add_argument("--disable-cache", action="store_true", help="Bypass the query result cache")
+    parser.add_argument("--output", help="Write the result JSON to this file")
+    parser.add_argument("--baseline", help="Compare against a previous result JSON")
+    parser.add_argument("--max-regression-pct", type=float,
+                        help="Exit non-zero if throughput drops or p99 rises by more than this percentage")
+    args = parser.parse_args(argv)
+
+    if args.disable_cache:
+        import parsing_operations
+        parsing_operations.query_cache.max_entries = 0
+        parsing_operations.query_cache.clear()
+
+    queries = read_corpus(args.corpus) if args.corpus else generate_corpus(args.synthetic, args.seed, args.distinct)
+    result = replay(queries, args.target, args.allocation_sample)
+    result["corpus"] = args.corpus or f"synthetic:{args.synthetic}:seed={args.seed}:distinct={args.distinct}"
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            result["baseline"] = compare_to_baseline(result, json.load(baseline_file))
+        if args.max_regression_pct is not None:
+            throughput_change = result["baseline"]["queries_per_second_pct"] or 0
+            p99_change = result["baseline"]["p99_pct"] or 0
+            if -throughput_change > args.max_regression_pct or p99_change > args.max_regression_pct:
+                exit_code = 1
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output + "\n")
+    print(output)
+    return exit_code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
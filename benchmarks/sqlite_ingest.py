@@ -0,0 +1,99 @@
+"""Measure SQLite write throughput while persisting a bulk calendar ingestion.
+
+    python -m benchmarks.sqlite_ingest --events 100000 --members 500 --changes 5000
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+# Allow running from the repository root without installation.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from availability import AvailabilityStore, BusyChange
+from benchmarks.ics_throughput import WINDOW_END, WINDOW_START, write_synthetic_calendar
+from ics_ingest import ingest_ics
+from persistence import SQLitePersistence
+
+# Rows written one INSERT and commit at a time, for comparison with executemany.
+SINGLE_ROW_SAMPLE = 2000
+
+
+def run(events: int, members: int, changes: int, change_batch: int = 50, seed: int = 7) -> dict:
+    """Ingest a synthetic calendar, persist it and incremental changes, and return throughput figures."""
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "benchmark.ics")
+        write_synthetic_calendar(path, events, members)
+        store = AvailabilityStore()
+        ingest_ics(path, store, WINDOW_START, WINDOW_END)
+
+        persistence = SQLitePersistence(os.path.join(directory, "availability.db"))
+        started = time.perf_counter()
+        rows = persistence.save_availability(store)
+        bulk_seconds = time.perf_counter() - started
+
+        single = SQLitePersistence(os.path.join(directory, "single.db"))
+        connection = single.pool.connection()
+        sample = list(itertools.islice(
+            ((member_id, day.toordinal(), store.member_bitmap(member_id, day).tobytes())
+             for day in store.stored_days() for member_id in store.members
+             if store.member_bitmap(member_id, day) is not None), SINGLE_ROW_SAMPLE))
+        started = time.perf_counter()
+        for row in sample:
+            with connection:
+                connection.execute("INSERT OR REPLACE INTO busy_days (member_id, day, bitmap) VALUES (?, ?, ?)", row)
+        single_seconds = time.perf_counter() - started
+
+        member_ids = store.members
+        started = time.perf_counter()
+        for _ in range(0, changes, change_batch):
+            batch = []
+            for _ in range(change_batch):
+                start = WINDOW_START + timedelta(days=rng.randrange(31), hours=rng.randrange(8, 18))
+                batch.append(BusyChange(rng.choice(member_ids), start, start + timedelta(minutes=30),
+                                        rng.random() < 0.7))
+            store = store.apply_changes(batch)
+            persistence.save_changes(store, batch)
+        change_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        loaded = persistence.load_availability()
+        load_seconds = time.perf_counter() - started
+        database_bytes = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)
+                             if name.startswith("availability.db"))
+        persistence.close()
+        single.close()
+
+    return {
+        "benchmark": "sqlite_ingest",
+        "members": len(member_ids),
+        "days": len(loaded.stored_days()),
+        "rows": rows,
+        "database_megabytes": round(database_bytes / 1e6, 2),
+        "bulk_seconds": round(bulk_seconds, 3),
+        "bulk_rows_per_second": round(rows / bulk_seconds),
+        "single_row_rows_per_second": round(len(sample) / single_seconds),
+        "changes_per_second": round(changes / change_seconds),
+        "load_seconds": round(load_seconds, 3),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--members", type=int, default=500)
+    parser.add_argument("--changes", type=int, default=5000)
+    parser.add_argument("--change-batch", type=int, default=50)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.events, args.members, args.changes, args.change_batch)))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,81 @@
+"""Measure cold-start time from importing function_app to the first scheduling response.
+
+Each run happens in a fresh interpreter so nothing is already imported:
+
+    python -m benchmarks.startup --runs 5 --budget-ms 1000
+
+Exits non-zero when the median exceeds the budget (STARTUP_BUDGET_MS by default).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", "1000"))
+HEAVY_MODULES = ("numpy", "pandas", "openpyxl", "availability", "meeting_extraction")
+
+# Runs in the child interpreter; the clock starts before function_app is imported.
+_STARTUP_SCRIPT = """
+import time
+started = time.perf_counter()
+import asyncio, json, sys
+import function_app
+imported = time.perf_counter()
+loaded_at_import = [name for name in {heavy!r} if name in sys.modules]
+
+import azure.functions as func
+handlers = {{f.get_function_name(): f.get_user_function() for f in function_app.app.get_functions()}}
+req = func.HttpRequest(method="POST", url="/api/process_scheduling_query",
+                       body=b"Schedule a meeting with John tomorrow at 2pm")
+response = asyncio.run(handlers["process_scheduling_query"](req))
+responded = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "first_response_ms": (responded - started) * 1000,
+    "status_code": response.status_code,
+    "loaded_at_import": loaded_at_import,
+}}))
+"""
+
+
+def measure_once() -> dict:
+    """Start a fresh interpreter, import the app, serve one request and return its timings."""
+    completed = subprocess.run(
+        [sys.executable, "-c", _STARTUP_SCRIPT.format(heavy=HEAVY_MODULES)],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure_startup(runs: int = 3, budget_ms: float = DEFAULT_BUDGET_MS) -> dict:
+    """Return median import and import-to-first-response times over several fresh starts."""
+    samples = [measure_once() for _ in range(runs)]
+    first_response_ms = statistics.median(sample["first_response_ms"] for sample in samples)
+    return {
+        "benchmark": "startup",
+        "runs": runs,
+        "import_ms": round(statistics.median(sample["import_ms"] for sample in samples), 2),
+        "first_response_ms": round(first_response_ms, 2),
+        "budget_ms": budget_ms,
+        "within_budget": first_response_ms <= budget_ms,
+        "status_codes": sorted({sample["status_code"] for sample in samples}),
+        "loaded_at_import": samples[-1]["loaded_at_import"],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args(argv)
+    result = measure_startup(args.runs, args.budget_ms)
+    print(json.dumps(result))
+    return 0 if result["within_budget"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,255 @@
+"""Async calendar provider interface, a pooled HTTP backend, a bounded-concurrency client and an in-process fake."""
+
+import abc
+import asyncio
+import http.client
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from urllib.parse import urlencode, urlsplit
+
+
+class CalendarBackend(abc.ABC):
+    """
+    Interface for calendar providers that report members' busy intervals.
+
+    Implementations should hold one pooled connection/session for their lifetime
+    and release it in close(), so that concurrent fetch_busy calls share it.
+    fetch_busy raises KeyError for a member the provider does not know.
+    """
+
+    @abc.abstractmethod
+    async def fetch_busy(self, member_id: str, start: datetime, end: datetime) -> list:
+        """Return the member's busy (start, end) intervals that overlap [start, end)."""
+
+    async def close(self) -> None:
+        """Release the backend's pooled resources."""
+
+
+class HttpCalendarBackend(CalendarBackend):
+    """
+    Calendar backend for an HTTP(S) service, sharing a pool of keep-alive connections.
+
+    fetch_busy sends GET {base_url}/busy?member_id=...&start=...&end=... with ISO
+    8601 times. The service answers {"busy": [{"start": ..., "end": ...}, ...]}, or
+    404 for an unknown member. Times with an offset are converted to naive UTC.
+
+    At most pool_size requests are in flight, each on a connection taken from the
+    pool and returned after the response is read, so concurrent calls reuse the
+    same TCP (and TLS) sessions. Requests use the blocking http.client and run on
+    the event loop's default executor. close() closes the idle connections and any
+    still in use as they come back.
+    """
+
+    def __init__(self, base_url: str, pool_size: int = 16, timeout_seconds: float = 5.0, headers: dict = None):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https") or not parts.netloc:
+            raise ValueError(f"Calendar backend URL must be http(s)://host[/path], got {base_url!r}")
+        if pool_size < 1:
+            raise ValueError("pool_size must be at least 1")
+        self._connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._netloc = parts.netloc
+        self._path = parts.path.rstrip("/") + "/busy"
+        self.pool_size = pool_size
+        self.timeout_seconds = timeout_seconds
+        self.headers = {"Accept": "application/json", **(headers or {})}
+        self.connections_opened = 0
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._idle = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    async def fetch_busy(self, member_id: str, start: datetime, end: datetime) -> list:
+        return await asyncio.to_thread(self._fetch_busy, member_id, start, end)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    def _fetch_busy(self, member_id: str, start: datetime, end: datetime) -> list:
+        url = f"{self._path}?{urlencode({'member_id': member_id, 'start': start.isoformat(), 'end': end.isoformat()})}"
+        with self._slots:
+            connection, reused = self._acquire()
+            try:
+                try:
+                    response, body = self._request(connection, url)
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    if not reused:
+                        raise
+                    # The server dropped an idle keep-alive connection; retry once on a fresh one.
+                    connection.close()
+                    connection = self._open()
+                    response, body = self._request(connection, url)
+            except BaseException:
+                connection.close()
+                raise
+            self._release(connection, keep=not response.will_close)
+        if response.status == 404:
+            raise KeyError(f"Unknown member: {member_id}")
+        if response.status != 200:
+            raise http.client.HTTPException(f"Calendar backend returned HTTP {response.status} for {member_id}")
+        return _parse_busy(body, member_id)
+
+    def _request(self, connection, url: str):
+        connection.request("GET", url, headers=self.headers)
+        response = connection.getresponse()
+        return response, response.read()
+
+    def _acquire(self):
+        """Return (connection, reused), preferring the most recently used idle connection."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._open(), False
+
+    def _open(self):
+        with self._lock:
+            self.connections_opened += 1
+        return self._connection_class(self._netloc, timeout=self.timeout_seconds)
+
+    def _release(self, connection, keep: bool) -> None:
+        with self._lock:
+            if keep and not self._closed:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+
+def _parse_busy(body: bytes, member_id: str) -> list:
+    """
+    Parse a busy response into (start, end) naive UTC datetimes.
+
+    Malformed data raises http.client.HTTPException rather than KeyError, which
+    callers read as an unknown member.
+    """
+    try:
+        intervals = json.loads(body)["busy"]
+        if not isinstance(intervals, list):
+            raise TypeError("'busy' is not a list")
+        return [(_naive_utc(interval["start"]), _naive_utc(interval["end"])) for interval in intervals]
+    except (ValueError, KeyError, TypeError) as error:
+        raise http.client.HTTPException(
+            f"Calendar backend sent malformed busy intervals for {member_id}: {error!r}") from error
+
+
+def _naive_utc(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+class FakeCalendarBackend(CalendarBackend):
+    """
+    In-process calendar backend with configurable latency, for offline testing.
+
+    busy maps member ids to lists of (start, end) datetimes. Each call sleeps for
+    latency_seconds and is counted, and the peak number of overlapping calls is
+    tracked so tests can observe the concurrency a client achieves.
+    """
+
+    def __init__(self, busy: dict = None, latency_seconds: float = 0.05):
+        self.busy = busy if busy is not None else {}
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+        self.active_calls = 0
+        self.peak_concurrency = 0
+        self.closed = False
+
+    async def fetch_busy(self, member_id: str, start: datetime, end: datetime) -> list:
+        self.calls += 1
+        self.active_calls += 1
+        self.peak_concurrency = max(self.peak_concurrency, self.active_calls)
+        try:
+            await asyncio.sleep(self.latency_seconds)
+            if member_id not in self.busy:
+                raise KeyError(f"Unknown member: {member_id}")
+            return [(busy_start, busy_end) for busy_start, busy_end in self.busy[member_id]
+                    if busy_start < end and busy_end > start]
+        finally:
+            self.active_calls -= 1
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class CalendarClient:
+    """
+    Fetches many members' busy intervals concurrently through one backend.
+
+    At most max_concurrency calls are outstanding at once and each call is
+    bounded by timeout_seconds. Failures are reported per member rather than
+    failing the whole fetch.
+    """
+
+    def __init__(self, backend: CalendarBackend, max_concurrency: int = 16, timeout_seconds: float = 2.0):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.timeout_seconds = timeout_seconds
+        self._semaphore = None
+        self._loop = None
+
+    async def fetch_many(self, member_ids, start: datetime, end: datetime):
+        """
+        Return (busy_by_member, errors_by_member) for the given members and window.
+
+        errors_by_member maps a member id to the exception its fetch raised;
+        asyncio.TimeoutError marks a call that exceeded the per-call timeout.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        member_ids = list(dict.fromkeys(member_ids))
+        outcomes = await asyncio.gather(
+            *(self._fetch_one(member_id, start, end) for member_id in member_ids),
+            return_exceptions=True
+        )
+        busy_by_member, errors_by_member = {}, {}
+        for member_id, outcome in zip(member_ids, outcomes):
+            if isinstance(outcome, Exception):
+                errors_by_member[member_id] = outcome
+            else:
+                busy_by_member[member_id] = outcome
+        return busy_by_member, errors_by_member
+
+    async def load_into(self, store, member_ids, start: datetime, end: datetime) -> dict:
+        """Fetch members' busy intervals into an AvailabilityStore and return per-member errors."""
+        busy_by_member, errors_by_member = await self.fetch_many(member_ids, start, end)
+        for member_id, intervals in busy_by_member.items():
+            store.add_member(member_id)
+            for busy_start, busy_end in intervals:
+                store.mark_busy(member_id, max(busy_start, start), min(busy_end, end))
+        return errors_by_member
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+    async def _fetch_one(self, member_id: str, start: datetime, end: datetime) -> list:
+        async with self._semaphore:
+            return await asyncio.wait_for(
+                self.backend.fetch_busy(member_id, start, end),
+                timeout=self.timeout_seconds
+            )
+
+
+def load_default_calendar_client():
+    """
+    Return a CalendarClient for the CALENDAR_BACKEND_URL app setting, or None when it is unset.
+
+    CALENDAR_MAX_CONCURRENCY (default 16) bounds both outstanding calls and the
+    backend's connection pool; CALENDAR_TIMEOUT_SECONDS (default 2) bounds each call.
+    """
+    url = os.environ.get("CALENDAR_BACKEND_URL")
+    if not url:
+        return None
+    max_concurrency = int(os.environ.get("CALENDAR_MAX_CONCURRENCY", "16"))
+    timeout_seconds = float(os.environ.get("CALENDAR_TIMEOUT_SECONDS", "2"))
+    backend = HttpCalendarBackend(url, pool_size=max_concurrency, timeout_seconds=timeout_seconds)
+    return CalendarClient(backend, max_concurrency=max_concurrency, timeout_seconds=timeout_seconds)
@@ -1,8 +1,20 @@
 """Azure Functions HTTP trigger example with multiple endpoints."""
 
+import asyncio
 import azure.functions as func
 import logging
-from parsing_operations import parse_schedule_query  
+import json
+import time
+from parsing_operations import parse_schedule_query, parse_schedule_query_batch
+from request_logging import start_logging_pipeline_from_environment
+
+# Modules with heavy dependencies (numpy, availability data) and the extraction
+# patterns are imported on first use so that a cold start only pays for what the
+# first request needs. Call the warmup route to load everything ahead of traffic.
+WARMUP_QUERY = "Schedule a meeting with John tomorrow at 2pm"
+
+# Request-path log records are queued and formatted on a background thread.
+start_logging_pipeline_from_environment()
 
 app = func.FunctionApp(http_auth_level=func.AuthLevel.FUNCTION)
 
@@ -28,7 +40,75 @@ def http_trigger1(req: func.HttpRequest) -> func.HttpResponse:
              status_code=200
         )
 
+# Parsing is CPU-bound and may write query history to SQLite, so the async parse
+# routes run it on the default executor rather than on the worker's event loop,
+# where it would stall every other request (including availability calls waiting
+# on the calendar backend). Identical concurrent queries still share one
+# extraction: the single-flight layer coalesces across executor threads.
 @app.route(route="process_scheduling_query", methods=["POST"])
-def process_scheduling_query(req: func.HttpRequest) -> func.HttpResponse:
+async def process_scheduling_query(req: func.HttpRequest) -> func.HttpResponse:
     """Delegate to parse_schedule_query function."""
-    return parse_schedule_query(req)  # Use the imported function
\ No newline at end of file
+    return await asyncio.to_thread(parse_schedule_query, req)
+
+@app.route(route="process_scheduling_query_batch", methods=["POST"])
+async def process_scheduling_query_batch(req: func.HttpRequest) -> func.HttpResponse:
+    """Delegate to parse_schedule_query_batch function."""
+    return await asyncio.to_thread(parse_schedule_query_batch, req)
+
+@app.route(route="process_availability_query", methods=["POST"])
+async def process_availability_query(req: func.HttpRequest) -> func.HttpResponse:
+    """Delegate to find_common_availability function."""
+    from availability_operations import find_common_availability
+    return await find_common_availability(req)
+
+@app.route(route="suggest_meeting_slots", methods=["POST"])
+async def suggest_meeting_slots(req: func.HttpRequest) -> func.HttpResponse:
+    """Delegate to the suggest_meeting_slots availability operation."""
+    from availability_operations import suggest_meeting_slots as suggest
+    return await suggest(req)
+
+@app.route(route="metrics", methods=["GET"])
+def metrics_endpoint(req: func.HttpRequest) -> func.HttpResponse:
+    """Expose request stage latency histograms and cache counters in Prometheus text format."""
+    from metrics import metrics
+    return func.HttpResponse(
+        metrics.render_prometheus(),
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        status_code=200
+    )
+
+@app.route(route="warmup", methods=["GET", "POST"])
+def warmup(req: func.HttpRequest) -> func.HttpResponse:
+    """Pre-load lazily imported modules and tables and report how long it took."""
+    return func.HttpResponse(
+        json.dumps(warm_up()),
+        mimetype="application/json",
+        status_code=200
+    )
+
+_route_handlers = {}
+
+def route_handlers() -> dict:
+    """
+    Return the registered handlers by function name, for in-process callers such as tests.
+
+    The app can only be indexed once per process, so the result is cached.
+    """
+    if not _route_handlers:
+        for function in app.get_functions():
+            _route_handlers[function.get_function_name()] = function.get_user_function()
+    return _route_handlers
+
+def warm_up() -> dict:
+    """Import deferred modules, compile extraction patterns and load the availability store."""
+    started = time.perf_counter()
+    from parsing_operations import extract_meeting_details
+    from availability_operations import get_availability_store
+
+    extract_meeting_details(WARMUP_QUERY)
+    store = get_availability_store()
+    return {
+        "status": "success",
+        "members": len(store.members),
+        "milliseconds": round((time.perf_counter() - started) * 1000, 3)
+    }
@@ -0,0 +1,445 @@
+"""Streaming iCalendar (.ics) ingestion into the availability store.
+
+Calendars are read one line at a time: VEVENT blocks are assembled by a generator,
+recurrences are expanded lazily and only within the requested window, and every
+occurrence is written straight into an AvailabilityStore. Memory use therefore
+depends on the size of one event, not of the file.
+
+Run as a script to ingest a file and report throughput:
+
+    python -m ics_ingest org.ics --start 2026-10-01 --end 2026-11-01 --snapshot org.tavsnap
+"""
+
+import argparse
+import calendar
+import json
+import time
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from availability import AvailabilityStore, DEFAULT_SLOT_MINUTES
+from availability_snapshot import write_snapshot
+
+ICS_WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+# RRULE parts that are expanded. An event whose rule uses any other part (BYHOUR,
+# BYWEEKNO, BYYEARDAY, ...) is counted as skipped rather than expanded wrongly.
+SUPPORTED_RULE_PARTS = {"FREQ", "INTERVAL", "COUNT", "UNTIL", "WKST", "BYDAY", "BYMONTHDAY", "BYMONTH", "BYSETPOS"}
+# Consecutive periods without an occurrence before a rule is given up on, e.g. yearly
+# on 30 February. Leap days can skip 7 years; a daily rule limited to one month skips 11 months.
+MAX_EMPTY_PERIODS = {"DAILY": 4 * 366, "WEEKLY": 4 * 53, "MONTHLY": 8 * 12, "YEARLY": 8}
+
+
+def unfold_lines(lines):
+    """Yield logical content lines from physical lines, joining RFC 5545 folded continuations."""
+    current = None
+    for raw_line in lines:
+        line = raw_line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def parse_content_line(line: str):
+    """Split "NAME;PARAM=VALUE:value" into (name, params, value)."""
+    if '"' not in line:
+        head, separator, value = line.partition(":")
+        if not separator:
+            raise ValueError(f"Malformed content line: {line[:80]}")
+        if ";" not in head:
+            return head.upper(), {}, value
+        return _split_head(head, value)
+
+    in_quotes = False
+    for index, char in enumerate(line):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == ":" and not in_quotes:
+            head, value = line[:index], line[index + 1:]
+            break
+    else:
+        raise ValueError(f"Malformed content line: {line[:80]}")
+    return _split_head(head, value)
+
+
+def _split_head(head: str, value: str):
+    name, *raw_params = head.split(";")
+    params = {}
+    for raw_param in raw_params:
+        key, _, param_value = raw_param.partition("=")
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, value
+
+
+def iter_vevents(lines):
+    """
+    Yield each VEVENT as a dict of property name to a list of (params, value).
+
+    Sub-components nested in an event (such as VALARM) are skipped.
+    """
+    event = None
+    nested = 0
+    for line in unfold_lines(lines):
+        try:
+            name, params, value = parse_content_line(line)
+        except ValueError:
+            continue
+        if name == "BEGIN":
+            if value.upper() == "VEVENT":
+                event, nested = {}, 0
+            elif event is not None:
+                nested += 1
+        elif name == "END":
+            if event is not None and nested:
+                nested -= 1
+            elif event is not None and value.upper() == "VEVENT":
+                yield event
+                event = None
+        elif event is not None and not nested:
+            event.setdefault(name, []).append((params, value))
+
+
+def parse_ics_datetime(params: dict, value: str) -> datetime:
+    """
+    Parse a DATE or DATE-TIME value to a naive datetime.
+
+    UTC and TZID times are converted to naive UTC; floating times, dates and
+    TZIDs unknown to zoneinfo are kept as written.
+    """
+    wall_time, zone = _parse_wall_time(params, value)
+    return _to_utc(wall_time, zone)
+
+
+def _parse_wall_time(params: dict, value: str):
+    """Return (naive wall-clock datetime, ZoneInfo or None) for a DATE or DATE-TIME value."""
+    value = value.strip()
+    try:
+        if params.get("VALUE") == "DATE" or len(value) == 8:
+            return datetime(int(value[0:4]), int(value[4:6]), int(value[6:8])), None
+        if value[8] != "T":
+            raise ValueError
+        parsed = datetime(int(value[0:4]), int(value[4:6]), int(value[6:8]),
+                          int(value[9:11]), int(value[11:13]), int(value[13:15]))
+    except (ValueError, IndexError):
+        raise ValueError(f"Malformed date-time: {value}") from None
+    tzid = params.get("TZID")
+    if value.endswith("Z") or not tzid:
+        return parsed, None
+    try:
+        return parsed, ZoneInfo(tzid)
+    except (ZoneInfoNotFoundError, ValueError):
+        return parsed, None
+
+
+def _to_utc(wall_time: datetime, zone) -> datetime:
+    if zone is None:
+        return wall_time
+    return wall_time.replace(tzinfo=zone).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def parse_ics_duration(value: str) -> timedelta:
+    """Parse an RFC 5545 DURATION such as "PT1H30M" or "P1D"."""
+    sign = -1 if value.startswith("-") else 1
+    value = value.lstrip("+-")
+    if not value.startswith("P"):
+        raise ValueError(f"Malformed duration: {value}")
+    total = timedelta()
+    number = ""
+    units = {"W": timedelta(weeks=1), "D": timedelta(days=1), "H": timedelta(hours=1),
+             "M": timedelta(minutes=1), "S": timedelta(seconds=1)}
+    for char in value[1:]:
+        if char.isdigit():
+            number += char
+        elif char in units:
+            total += int(number or 0) * units[char]
+            number = ""
+    return sign * total
+
+
+def event_occurrences(event: dict, window_start: datetime, window_end: datetime):
+    """
+    Lazily yield the (start, end) busy intervals of an event that overlap the window.
+
+    Cancelled and transparent (free) events yield nothing. Supports DAILY, WEEKLY,
+    MONTHLY and YEARLY rules with INTERVAL, COUNT, UNTIL, BYDAY (with ordinals such
+    as 2TU or -1FR in monthly and yearly rules), BYMONTHDAY, BYMONTH, BYSETPOS and
+    EXDATE. Raises ValueError for a rule with another frequency, no FREQ, or any other part.
+    """
+    if _first_value(event, "STATUS", "").upper() == "CANCELLED":
+        return
+    if _first_value(event, "TRANSP", "").upper() == "TRANSPARENT":
+        return
+    if "DTSTART" not in event:
+        return
+
+    # Recurrences are expanded in the event's wall-clock time so that a 09:00 meeting
+    # stays at 09:00 local across DST changes, then each occurrence is converted to UTC.
+    start_params, start_value = event["DTSTART"][0]
+    start, zone = _parse_wall_time(start_params, start_value)
+    if "DTEND" in event:
+        duration = parse_ics_datetime(*event["DTEND"][0]) - _to_utc(start, zone)
+    elif "DURATION" in event:
+        duration = parse_ics_duration(event["DURATION"][0][1])
+    else:
+        all_day = start_params.get("VALUE") == "DATE" or len(start_value.strip()) == 8
+        duration = timedelta(days=1) if all_day else timedelta()
+    if duration <= timedelta():
+        return
+
+    excluded = set()
+    for params, value in event.get("EXDATE", ()):
+        excluded.update(parse_ics_datetime(params, part) for part in value.split(","))
+
+    rule = _parse_rrule(_first_value(event, "RRULE"))
+    # The local skip-ahead point gets a day of slack for the zone's UTC offset.
+    skip_before = window_start - duration - timedelta(days=1)
+    for occurrence_start in _recurrence_starts(start, zone, rule, skip_before, window_end):
+        occurrence_end = occurrence_start + duration
+        if occurrence_end <= window_start or occurrence_start in excluded:
+            continue
+        yield occurrence_start, occurrence_end
+
+
+def event_members(event: dict) -> list:
+    """Return the organizer and non-declining attendees of an event as lower-case addresses."""
+    members = []
+    for name in ("ORGANIZER", "ATTENDEE"):
+        for params, value in event.get(name, ()):
+            if params.get("PARTSTAT", "").upper() == "DECLINED":
+                continue
+            address = value.strip()
+            if address.lower().startswith("mailto:"):
+                address = address[7:]
+            address = address.lower()
+            if address and address not in members:
+                members.append(address)
+    return members
+
+
+def ingest_ics(source, store: AvailabilityStore, window_start: datetime, window_end: datetime,
+               member_id: str = None) -> dict:
+    """
+    Stream a calendar into store and return ingestion counters.
+
+    source is a path or an iterable of lines. Busy time is recorded for member_id
+    when given (a single person's export), otherwise for each event's organizer
+    and accepting attendees. Occurrences are clipped to [window_start, window_end).
+    """
+    if isinstance(source, str):
+        with open(source, encoding="utf-8", errors="replace", newline="") as lines:
+            return ingest_ics(lines, store, window_start, window_end, member_id)
+
+    stats = {"events": 0, "occurrences": 0, "skipped": 0}
+    for event in iter_vevents(source):
+        stats["events"] += 1
+        members = [member_id] if member_id else event_members(event)
+        if not members:
+            stats["skipped"] += 1
+            continue
+        try:
+            for start, end in event_occurrences(event, window_start, window_end):
+                start, end = max(start, window_start), min(end, window_end)
+                for member in members:
+                    store.mark_busy(member, start, end)
+                stats["occurrences"] += 1
+        except ValueError:
+            stats["skipped"] += 1
+    return stats
+
+
+def _first_value(event: dict, name: str, default=None):
+    values = event.get(name)
+    return values[0][1] if values else default
+
+
+def _parse_rrule(value):
+    if not value:
+        return None
+    rule = {}
+    for part in value.split(";"):
+        key, _, part_value = part.partition("=")
+        rule[key.upper()] = part_value
+    return rule
+
+
+def _recurrence_starts(start: datetime, zone, rule, skip_before: datetime, window_end: datetime):
+    """
+    Yield occurrence starts as naive UTC, in order, until the rule or the window is exhausted.
+
+    start and skip_before are wall-clock times in zone; window_end is UTC.
+    """
+    if rule is None:
+        yield _to_utc(start, zone)
+        return
+
+    unsupported = set(rule) - SUPPORTED_RULE_PARTS
+    if unsupported:
+        raise ValueError(f"Unsupported RRULE parts: {', '.join(sorted(unsupported))}")
+    frequency = rule.get("FREQ", "").upper()
+    if frequency not in MAX_EMPTY_PERIODS:
+        raise ValueError(f"Unsupported RRULE frequency: {frequency or 'missing'}")
+    interval = max(int(rule.get("INTERVAL", 1)), 1)
+    count = int(rule["COUNT"]) if "COUNT" in rule else None
+    until = parse_ics_datetime({}, rule["UNTIL"]) if "UNTIL" in rule else None
+    by = {
+        "BYDAY": _parse_by_day(rule.get("BYDAY", "")),
+        "BYMONTHDAY": _parse_numbers(rule.get("BYMONTHDAY", ""), 31),
+        "BYMONTH": _parse_numbers(rule.get("BYMONTH", ""), 12, negative=False),
+        "BYSETPOS": _parse_numbers(rule.get("BYSETPOS", ""), 366),
+    }
+
+    period = 0
+    if count is None and frequency in ("DAILY", "WEEKLY") and skip_before > start:
+        # Without COUNT nothing depends on earlier occurrences, so jump to the window.
+        period_days = interval * (7 if frequency == "WEEKLY" else 1)
+        period = max((skip_before - start).days // period_days - 1, 0)
+
+    emitted = 0
+    empty_periods = 0
+    while True:
+        candidates = _period_candidates(start, frequency, interval, period, by)
+        if candidates is None:
+            return
+        # A rule such as yearly on 30 February never matches; give up after a run of empty periods.
+        empty_periods = 0 if candidates else empty_periods + 1
+        if empty_periods > MAX_EMPTY_PERIODS[frequency]:
+            return
+        for candidate in candidates:
+            if candidate < start:
+                continue
+            candidate_utc = _to_utc(candidate, zone)
+            if (until is not None and candidate_utc > until) or candidate_utc >= window_end:
+                return
+            if count is not None and emitted >= count:
+                return
+            emitted += 1
+            yield candidate_utc
+        period += 1
+
+
+def _period_candidates(start: datetime, frequency: str, interval: int, period: int, by: dict):
+    """Return the occurrence starts in the period'th period of a rule, in order, or None past the last year."""
+    if frequency == "DAILY":
+        days = [d for d in [start.date() + timedelta(days=period * interval)] if _in_filters(d, by)]
+    elif frequency == "WEEKLY":
+        week_start = start.date() - timedelta(days=start.weekday()) + timedelta(weeks=period * interval)
+        weekdays = sorted({weekday for _, weekday in by["BYDAY"]}) or [start.weekday()]
+        days = [d for d in (week_start + timedelta(days=weekday) for weekday in weekdays)
+                if _in_filters(d, {**by, "BYDAY": []})]
+    else:
+        months = period * interval * (12 if frequency == "YEARLY" else 1)
+        year, month = divmod(start.month - 1 + months, 12)
+        year += start.year
+        if year > date.max.year:
+            return None
+        days = _month_days(year, month + 1, start, by) if frequency == "MONTHLY" else _year_days(year, start, by)
+    if by["BYSETPOS"]:
+        days = sorted({days[position - 1 if position > 0 else position] for position in by["BYSETPOS"]
+                       if -len(days) <= position <= len(days)})
+    # An empty list when nothing matches, e.g. the 31st in a 30-day month.
+    return [start.replace(year=d.year, month=d.month, day=d.day) for d in days]
+
+
+def _month_days(year: int, month: int, start: datetime, by: dict) -> list:
+    """Days of a month picked by BYMONTHDAY and BYDAY (ordinals count within the month), or start's day."""
+    if by["BYMONTH"] and month not in by["BYMONTH"]:
+        return []
+    length = calendar.monthrange(year, month)[1]
+    if not by["BYDAY"] and not by["BYMONTHDAY"]:
+        return [date(year, month, start.day)] if start.day <= length else []
+    days = [date(year, month, day) for day in range(1, length + 1)]
+    return [d for d in days if _matches_month_day(d, by["BYMONTHDAY"], length)
+            and _matches_by_day(d, by["BYDAY"], d.day, length)]
+
+
+def _year_days(year: int, start: datetime, by: dict) -> list:
+    """Days of a year picked by BYMONTH, BYMONTHDAY and BYDAY, or start's month and day."""
+    if by["BYMONTH"] or by["BYMONTHDAY"]:
+        months = by["BYMONTH"] or range(1, 13)
+        return [d for month in sorted(set(months)) for d in _month_days(year, month, start, by)]
+    if by["BYDAY"]:
+        # Without BYMONTH, BYDAY ordinals count within the year (20MO is the 20th Monday).
+        length = 366 if calendar.isleap(year) else 365
+        first = date(year, 1, 1)
+        return [d for d in (first + timedelta(days=offset) for offset in range(length))
+                if _matches_by_day(d, by["BYDAY"], d.toordinal() - first.toordinal() + 1, length)]
+    return _month_days(year, start.month, start, by)
+
+
+def _in_filters(day: date, by: dict) -> bool:
+    """Whether a daily or weekly candidate passes the BYMONTH, BYMONTHDAY and BYDAY limits."""
+    return ((not by["BYMONTH"] or day.month in by["BYMONTH"])
+            and _matches_month_day(day, by["BYMONTHDAY"], calendar.monthrange(day.year, day.month)[1])
+            and (not by["BYDAY"] or day.weekday() in {weekday for _, weekday in by["BYDAY"]}))
+
+
+def _matches_month_day(day: date, month_days: list, length: int) -> bool:
+    return not month_days or day.day in month_days or day.day - length - 1 in month_days
+
+
+def _matches_by_day(day: date, by_day: list, position: int, length: int) -> bool:
+    """Whether day matches a BYDAY entry; position and length locate it in the month or year."""
+    if not by_day:
+        return True
+    forward, backward = (position - 1) // 7 + 1, -((length - position) // 7 + 1)
+    return any(weekday == day.weekday() and ordinal in (None, forward, backward) for ordinal, weekday in by_day)
+
+
+def _parse_by_day(value: str) -> list:
+    """Parse BYDAY into (ordinal or None, weekday) pairs, e.g. "2TU,-1FR" -> [(2, 1), (-1, 4)]."""
+    entries = []
+    for part in value.upper().split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if part[-2:] not in ICS_WEEKDAYS:
+            raise ValueError(f"Invalid BYDAY value: {part}")
+        ordinal = int(part[:-2]) if part[:-2] else None
+        if ordinal == 0:
+            raise ValueError(f"Invalid BYDAY value: {part}")
+        entries.append((ordinal, ICS_WEEKDAYS[part[-2:]]))
+    return entries
+
+
+def _parse_numbers(value: str, limit: int, negative: bool = True) -> list:
+    """Parse a comma-separated BY* list of non-zero integers within +/-limit."""
+    numbers = [int(part) for part in value.split(",") if part.strip()]
+    for number in numbers:
+        if number == 0 or abs(number) > limit or (number < 0 and not negative):
+            raise ValueError(f"Invalid RRULE value: {number}")
+    return numbers
+
+
+def main(argv=None) -> int:
+    """Command-line entry point: ingest a calendar file and print counters and throughput."""
+    parser = argparse.ArgumentParser(description="Ingest an iCalendar file into team availability.")
+    parser.add_argument("path", help="Path to the .ics file")
+    parser.add_argument("--start", required=True, type=date.fromisoformat, help="First day of the window (YYYY-MM-DD)")
+    parser.add_argument("--end", required=True, type=date.fromisoformat, help="Day after the window (YYYY-MM-DD)")
+    parser.add_argument("--member", help="Assign every event to this member (single-person export)")
+    parser.add_argument("--slot-minutes", type=int, default=DEFAULT_SLOT_MINUTES, help="Bitmap slot size in minutes")
+    parser.add_argument("--snapshot", help="Write the ingested availability to this snapshot file")
+    args = parser.parse_args(argv)
+
+    store = AvailabilityStore(slot_minutes=args.slot_minutes)
+    started = time.perf_counter()
+    stats = ingest_ics(args.path, store, datetime.combine(args.start, datetime.min.time()),
+                       datetime.combine(args.end, datetime.min.time()), member_id=args.member)
+    elapsed = time.perf_counter() - started
+
+    stats["members"] = len(store.members)
+    stats["seconds"] = round(elapsed, 3)
+    stats["events_per_second"] = round(stats["events"] / elapsed) if elapsed else None
+    if args.snapshot:
+        write_snapshot(store, args.snapshot, args.start, args.end - timedelta(days=1))
+        stats["snapshot"] = args.snapshot
+    print(json.dumps(stats))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,455 @@
+"""Rule-based extraction of meeting details from raw scheduling query text.
+
+All patterns and lookup tables are compiled once at import so a single call is a
+handful of regex scans over the query. Queries that yield nothing recognisable are
+handed to an optional fallback extractor (e.g. a model call) registered with
+register_fallback_extractor. When a team directory is registered (or named by the
+TEAM_DIRECTORY_PATH app setting), participant names are also resolved to member ids.
+When the requester's time zone is known, clock times are also resolved to UTC.
+"""
+
+import re
+from datetime import date, datetime, time, timedelta
+
+from team_directory import load_default_directory
+
+WEEKDAYS = {
+    "monday": 0, "mon": 0,
+    "tuesday": 1, "tue": 1, "tues": 1,
+    "wednesday": 2, "wed": 2,
+    "thursday": 3, "thu": 3, "thur": 3, "thurs": 3,
+    "friday": 4, "fri": 4,
+    "saturday": 5, "sat": 5,
+    "sunday": 6, "sun": 6,
+}
+WEEKDAY_NAMES = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+MONTHS = {
+    "january": 1, "jan": 1, "february": 2, "feb": 2, "march": 3, "mar": 3,
+    "april": 4, "apr": 4, "may": 5, "june": 6, "jun": 6, "july": 7, "jul": 7,
+    "august": 8, "aug": 8, "september": 9, "sep": 9, "sept": 9,
+    "october": 10, "oct": 10, "november": 11, "nov": 11, "december": 12, "dec": 12,
+}
+
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+    "fifteen": 15, "twenty": 20, "thirty": 30, "forty-five": 45, "ninety": 90,
+}
+
+RELATIVE_DAYS = {"today": 0, "tonight": 0, "tomorrow": 1, "day after tomorrow": 2}
+
+_WEEKDAY_ALT = "|".join(sorted(WEEKDAYS, key=len, reverse=True))
+_MONTH_ALT = "|".join(sorted(MONTHS, key=len, reverse=True))
+_NUMBER_ALT = "|".join(sorted(NUMBER_WORDS, key=len, reverse=True))
+
+# One clock time: "2pm", "2:30 p.m.", "14:00", "noon", "midnight".
+_TIME = r"(?:(\d{1,2})(?::(\d{2}))?\s*(am|pm|a\.m\.|p\.m\.)?|(noon|midnight))"
+
+RELATIVE_DAY_RE = re.compile(r"\b(day after tomorrow|tomorrow|today|tonight)\b", re.IGNORECASE)
+WEEKDAY_RE = re.compile(rf"\b(?:(next|this|coming)\s+)?({_WEEKDAY_ALT})\b\.?", re.IGNORECASE)
+NEXT_PERIOD_RE = re.compile(r"\b(next|this)\s+(week|month)\b", re.IGNORECASE)
+ISO_DATE_RE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+SLASH_DATE_RE = re.compile(r"\b(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?\b")
+MONTH_DAY_RE = re.compile(
+    rf"\b(?:({_MONTH_ALT})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?|(\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?({_MONTH_ALT}))\b",
+    re.IGNORECASE,
+)
+
+TIME_RANGE_RE = re.compile(
+    rf"\b(?:between|from)\s+{_TIME}\s+(?:and|to|until|till|-)\s+{_TIME}"
+    rf"|(?<![\d/-])\b{_TIME}\s*(?:-|–|to)\s*{_TIME}(?=\s|[,.;!?]|$)",
+    re.IGNORECASE,
+)
+TIME_AT_RE = re.compile(rf"\b(?:at|@|by|around)\s+{_TIME}(?![\w/-])", re.IGNORECASE)
+TIME_BARE_RE = re.compile(
+    r"\b(\d{1,2})(?::(\d{2}))?\s*(am|pm|a\.m\.|p\.m\.)(?!\w)|\b(\d{1,2}):(\d{2})\b|\b(noon|midnight)\b",
+    re.IGNORECASE,
+)
+
+DURATION_RE = re.compile(
+    rf"\b(half\s+an?|\d+(?:\.\d+)?|{_NUMBER_ALT})(?:\s*-\s*|\s+|(?<=\d))(hours?|hrs?|h|minutes?|mins?)\b",
+    re.IGNORECASE,
+)
+
+RECURRENCE_RULES = (
+    (re.compile(rf"\bevery\s+other\s+({_WEEKDAY_ALT})\b", re.IGNORECASE), "weekly", 2),
+    (re.compile(rf"\b(?:every|each)\s+({_WEEKDAY_ALT})\b", re.IGNORECASE), "weekly", 1),
+    (re.compile(r"\b(?:every\s+weekday|weekdays)\b", re.IGNORECASE), "weekdays", 1),
+    (re.compile(r"\b(?:daily|every\s+day|each\s+day|every\s+morning|every\s+afternoon)\b", re.IGNORECASE), "daily", 1),
+    (re.compile(r"\b(?:biweekly|bi-weekly|fortnightly|every\s+other\s+week|every\s+two\s+weeks)\b", re.IGNORECASE), "weekly", 2),
+    (re.compile(r"\b(?:weekly|every\s+week|each\s+week)\b", re.IGNORECASE), "weekly", 1),
+    (re.compile(r"\b(?:monthly|every\s+month|each\s+month)\b", re.IGNORECASE), "monthly", 1),
+)
+
+_PARTICIPANT_STOP = (
+    r"today|tonight|tomorrow|on|at|next|this|from|between|for|every|each|daily|weekly|monthly|"
+    r"starting|in|about|regarding|re|to|by|around|before|after|" + _WEEKDAY_ALT
+)
+PARTICIPANTS_RE = re.compile(
+    rf"\bwith\s+(.+?)(?=\s+(?:{_PARTICIPANT_STOP})\b|\s*[;:!?()]|\.(?:\s|$)|$)",
+    re.IGNORECASE,
+)
+PARTICIPANT_SPLIT_RE = re.compile(r"\s*(?:,|&|\band\b|\+)\s*", re.IGNORECASE)
+MENTION_RE = re.compile(r"@([A-Za-z][\w.\-]*[\w])")
+
+_fallback_extractor = None
+_team_directory = load_default_directory()
+
+
+def register_fallback_extractor(extractor) -> None:
+    """
+    Register the slower extractor used for queries the rules cannot resolve.
+
+    The extractor is called as extractor(user_query) and must return a details dict;
+    pass None to disable the fallback.
+    """
+    global _fallback_extractor
+    _fallback_extractor = extractor
+
+
+def register_team_directory(directory) -> None:
+    """
+    Register the TeamDirectory used to resolve participant names to member ids.
+
+    While one is registered, details include "participant_matches"; pass None to disable.
+    """
+    global _team_directory
+    _team_directory = directory
+
+
+def extract_details(user_query: str, reference_date: date = None, time_zone: str = None,
+                    use_fallback: bool = True) -> dict:
+    """
+    Extract participants, date, time range, duration and recurrence from a query.
+
+    Relative dates are resolved against reference_date (today by default, in
+    time_zone when given). The "resolved" flag is False when no date, time,
+    duration or recurrence was found, in which case the registered fallback
+    extractor, if any, supplies the result (unless use_fallback is False). With a
+    time_zone (an IANA name), times are read as wall-clock times there and details
+    add "time_zone", "start_utc" and "end_utc" (naive UTC, the availability store's clock).
+    """
+    if time_zone:
+        # Imported on first use: the time zone service needs numpy, which plain extraction does not.
+        from time_zones import time_zone_service
+    if reference_date is None:
+        reference_date = time_zone_service.today(time_zone) if time_zone else date.today()
+
+    meeting_date, date_text = extract_date(user_query, reference_date)
+    start_time, end_time = _extract_times(user_query)
+    duration = _extract_duration(user_query)
+    if duration is None and start_time and end_time:
+        duration = _minutes_between(start_time, end_time)
+
+    participants = _extract_participants(user_query)
+    details = {
+        "participants": participants,
+        "date": meeting_date.isoformat() if meeting_date else None,
+        "date_text": date_text,
+        "start_time": start_time,
+        "end_time": end_time,
+        "duration_minutes": duration,
+        "recurrence": extract_recurrence(user_query),
+    }
+    if _team_directory is not None:
+        details["participant_matches"] = _match_participants(participants)
+    if time_zone:
+        details.update(_utc_times(time_zone, meeting_date, start_time, end_time, duration))
+    details["resolved"] = any(
+        details[key] is not None
+        for key in ("date", "start_time", "duration_minutes", "recurrence")
+    )
+    details["source"] = "rules"
+
+    if use_fallback and not details["resolved"] and _fallback_extractor is not None:
+        fallback_details = dict(_fallback_extractor(user_query))
+        fallback_details.setdefault("source", "fallback")
+        return fallback_details
+    return details
+
+
+def extract_wording(user_query: str, reference_date: date) -> dict:
+    """
+    Return the details that echo the query's own wording: participants, date_text and participant_matches.
+
+    The other rule-based details depend only on the query's normalized form (see
+    query_cache.normalize_text); these do not, so they are never shared between phrasings.
+    """
+    participants = _extract_participants(user_query)
+    wording = {"participants": participants, "date_text": extract_date(user_query, reference_date)[1]}
+    if _team_directory is not None:
+        wording["participant_matches"] = _match_participants(participants)
+    return wording
+
+
+def fallback_registered() -> bool:
+    return _fallback_extractor is not None
+
+
+def _utc_times(time_zone: str, meeting_date, start_time, end_time, duration) -> dict:
+    """Resolve the meeting's local start and end to UTC ISO strings; None when missing or out of range."""
+    from time_zones import time_zone_service
+    start_utc = end_utc = None
+    if meeting_date and start_time:
+        try:
+            start = datetime.combine(meeting_date, time.fromisoformat(start_time))
+            start_utc = time_zone_service.to_utc(time_zone, start)
+            if end_time:
+                end_utc = time_zone_service.to_utc(
+                    time_zone, datetime.combine(meeting_date, time.fromisoformat(end_time)))
+            elif duration:
+                end_utc = start_utc + timedelta(minutes=duration)
+        except (OverflowError, ValueError):
+            # At the ends of datetime's range there may be no UTC time to report.
+            start_utc = end_utc = None
+    return {
+        "time_zone": time_zone,
+        "start_utc": start_utc.isoformat() if start_utc else None,
+        "end_utc": end_utc.isoformat() if end_utc else None,
+    }
+
+
+def _extract_participants(text: str) -> list:
+    participants = []
+    for match in PARTICIPANTS_RE.finditer(text):
+        for name in PARTICIPANT_SPLIT_RE.split(match.group(1)):
+            name = name.strip().lstrip("@").strip()
+            if name and name not in participants:
+                participants.append(name)
+    for mention in MENTION_RE.findall(text):
+        if mention not in participants:
+            participants.append(mention)
+    return participants
+
+
+def _match_participants(participants: list) -> list:
+    return [_match_participant(name) for name in participants]
+
+
+def _match_participant(name: str) -> dict:
+    """Resolve one participant name; member_id is None when the name is unknown or ambiguous."""
+    member_id, candidates = _team_directory.resolve_one(name)
+    return {
+        "name": name,
+        "member_id": member_id,
+        "candidates": [
+            {"member_id": candidate.member_id, "name": candidate.name, "score": candidate.score}
+            for candidate in candidates
+        ],
+    }
+
+
+def extract_date(text: str, reference_date: date):
+    """Return (date, matched text) for the first date expression in text, or (None, None)."""
+    meeting_date, span = find_date(text, reference_date)
+    if span is None:
+        return None, None
+    return meeting_date, text[span[0]:span[1]]
+
+
+def find_date(text: str, reference_date: date):
+    """Return (date, (start, end)) for the first date expression in text, or (None, None)."""
+    match = RELATIVE_DAY_RE.search(text)
+    if match:
+        offset = RELATIVE_DAYS[match.group(1).lower()]
+        return reference_date + timedelta(days=offset), match.span()
+
+    match = ISO_DATE_RE.search(text)
+    if match:
+        resolved = _safe_date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        if resolved:
+            return resolved, match.span()
+
+    match = MONTH_DAY_RE.search(text)
+    if match:
+        month_name = match.group(1) or match.group(4)
+        day = int(match.group(2) or match.group(3))
+        resolved = _upcoming_month_day(MONTHS[month_name.lower()], day, reference_date)
+        if resolved:
+            return resolved, match.span()
+
+    match = SLASH_DATE_RE.search(text)
+    if match:
+        month, day, year = int(match.group(1)), int(match.group(2)), match.group(3)
+        if year:
+            year = int(year) + (2000 if len(year) == 2 else 0)
+            resolved = _safe_date(year, month, day)
+        else:
+            resolved = _upcoming_month_day(month, day, reference_date)
+        if resolved:
+            return resolved, match.span()
+
+    match = WEEKDAY_RE.search(text)
+    if match:
+        modifier = (match.group(1) or "").lower()
+        weekday = WEEKDAYS[match.group(2).lower()]
+        if modifier == "next":
+            # "next Tuesday" is the Tuesday of the following calendar week.
+            week_start = reference_date - timedelta(days=reference_date.weekday()) + timedelta(days=7)
+            return week_start + timedelta(days=weekday), _weekday_span(match)
+        days_ahead = (weekday - reference_date.weekday()) % 7
+        return reference_date + timedelta(days=days_ahead), _weekday_span(match)
+
+    match = NEXT_PERIOD_RE.search(text)
+    if match:
+        modifier, period = match.group(1).lower(), match.group(2).lower()
+        if period == "week":
+            week_start = reference_date - timedelta(days=reference_date.weekday())
+            return week_start + timedelta(days=7 if modifier == "next" else 0), match.span()
+        if modifier == "next":
+            year, month = divmod(reference_date.month, 12)
+            return date(reference_date.year + year, month + 1, 1), match.span()
+        return reference_date.replace(day=1), match.span()
+
+    return None, None
+
+
+def _weekday_span(match) -> tuple:
+    """Return the span of a weekday match without its trailing abbreviation period."""
+    return match.start(), match.start() + len(match.group(0).rstrip("."))
+
+
+def _safe_date(year: int, month: int, day: int):
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _upcoming_month_day(month: int, day: int, reference_date: date):
+    """Resolve a month/day without a year to its next occurrence on or after reference_date."""
+    resolved = _safe_date(reference_date.year, month, day)
+    if resolved and resolved < reference_date:
+        resolved = _safe_date(reference_date.year + 1, month, day)
+    return resolved
+
+
+def _extract_times(text: str):
+    """Return (start, end) as "HH:MM" strings; end is None for a single time."""
+    for match in TIME_RANGE_RE.finditer(text):
+        groups = match.groups()
+        introduced = any(groups[0:8])  # "between ... and ..." / "from ... to ..."
+        start_parts, end_parts = (groups[0:4], groups[4:8]) if introduced else (groups[8:12], groups[12:16])
+        if not introduced and not (_has_marker(start_parts) or _has_marker(end_parts)):
+            # A bare "10-15" is more often a count or a date fragment than a time range.
+            continue
+        hours = _resolve_range(start_parts, end_parts)
+        if hours:
+            return _format_time(hours[0], start_parts[1]), _format_time(hours[1], end_parts[1])
+
+    match = TIME_AT_RE.search(text)
+    if match:
+        parts = match.groups()
+        hour = _hour_24(parts, _meridiem(parts[2]))
+        if hour is not None:
+            if not _has_marker(parts):
+                hour = _business_hour(hour)
+            return _format_time(hour, parts[1]), None
+
+    match = TIME_BARE_RE.search(text)
+    if match:
+        if match.group(6):
+            parts = (None, None, None, match.group(6))
+        elif match.group(4):
+            parts = (match.group(4), match.group(5), None, None)
+        else:
+            parts = (match.group(1), match.group(2), match.group(3), None)
+        hour = _hour_24(parts, _meridiem(parts[2]))
+        if hour is not None:
+            return _format_time(hour, parts[1]), None
+
+    return None, None
+
+
+def _has_marker(parts) -> bool:
+    """True when a time carries minutes, a meridiem or is a word such as "noon"."""
+    return any(part is not None for part in parts[1:])
+
+
+def _meridiem(token):
+    if token is None:
+        return None
+    return "am" if token[0].lower() == "a" else "pm"
+
+
+def _hour_24(parts, meridiem):
+    """Convert (hour, minute, meridiem, word) groups to a 24-hour hour, or None if invalid."""
+    hour_text, minute_text, _, word = parts
+    if word:
+        return 12 if word.lower() == "noon" else 0
+    if hour_text is None:
+        return None
+    hour = int(hour_text)
+    if minute_text is not None and int(minute_text) > 59:
+        return None
+    if meridiem is None:
+        return hour if hour <= 23 else None
+    if not 1 <= hour <= 12:
+        return None
+    if meridiem == "am":
+        return 0 if hour == 12 else hour
+    return 12 if hour == 12 else hour + 12
+
+
+def _business_hour(hour: int) -> int:
+    """Read a bare 1-7 o'clock hour as afternoon, the common meaning in scheduling requests."""
+    return hour + 12 if 1 <= hour <= 7 else hour
+
+
+def _resolve_range(start_parts, end_parts):
+    """Return (start_hour, end_hour) for a time range, inferring missing meridiems."""
+    start_meridiem, end_meridiem = _meridiem(start_parts[2]), _meridiem(end_parts[2])
+    start_hour = _hour_24(start_parts, start_meridiem)
+    end_hour = _hour_24(end_parts, end_meridiem)
+    if start_hour is None or end_hour is None:
+        return None
+    if end_meridiem is None and end_parts[3] is None:
+        end_hour = _business_hour(end_hour)
+    if start_meridiem is None and start_parts[3] is None:
+        if end_meridiem is not None:
+            # "3-5pm": the start shares the end's meridiem unless that would put it after the end.
+            shared = _hour_24(start_parts, end_meridiem)
+            if shared is not None and shared < end_hour:
+                start_hour = shared
+        else:
+            start_hour = _business_hour(start_hour)
+    if end_hour <= start_hour:
+        return None
+    return start_hour, end_hour
+
+
+def _format_time(hour: int, minute_text) -> str:
+    return f"{hour:02d}:{int(minute_text or 0):02d}"
+
+
+def _minutes_between(start_time: str, end_time: str) -> int:
+    start_hour, start_minute = map(int, start_time.split(":"))
+    end_hour, end_minute = map(int, end_time.split(":"))
+    return (end_hour - start_hour) * 60 + (end_minute - start_minute)
+
+
+def _extract_duration(text: str):
+    match = DURATION_RE.search(text)
+    if not match:
+        return None
+    amount_text, unit = match.group(1).lower(), match.group(2).lower()
+    if amount_text.startswith("half"):
+        amount = 0.5
+    elif amount_text in NUMBER_WORDS:
+        amount = NUMBER_WORDS[amount_text]
+    else:
+        amount = float(amount_text)
+    minutes = amount * 60 if unit.startswith("h") else amount
+    return int(round(minutes))
+
+
+def extract_recurrence(text: str):
+    for pattern, frequency, interval in RECURRENCE_RULES:
+        match = pattern.search(text)
+        if match:
+            recurrence = {"frequency": frequency, "interval": interval}
+            if match.groups():
+                recurrence["weekday"] = WEEKDAY_NAMES[WEEKDAYS[match.group(1).lower()]]
+            return recurrence
+    return None
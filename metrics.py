@@ -0,0 +1,223 @@
+"""In-process latency histograms for request stages and sampled profiling of slow requests."""
+
+import functools
+import inspect
+import logging
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+
+# request_logging imports this module, so the logger is named rather than built from REQUEST_LOGGER.
+logger = logging.getLogger("schedule.profiler")
+
+# Upper bounds in seconds, roughly x2.5 apart from 25us to 10s.
+DEFAULT_BUCKETS = (
+    0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+STAGES = ("decode", "extraction", "availability_lookup", "serialization", "error")
+
+
+class LatencyHistogram:
+    """Cumulative-bucket histogram of durations in seconds, in the Prometheus style."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += seconds
+
+    def snapshot(self):
+        """Return (cumulative counts per bucket including +Inf, sum, count)."""
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        cumulative, running = [], 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return cumulative, total, running
+
+
+class MetricsRegistry:
+    """
+    Per-stage latency histograms plus named counters for the request path.
+
+    Record a stage with observe(stage, seconds) around the code being measured,
+    or with the timed(stage) context manager where a block is more convenient.
+    Gauge callbacks added with add_gauges are read only when metrics are rendered.
+    """
+
+    def __init__(self, stages=STAGES, buckets=DEFAULT_BUCKETS):
+        self._buckets = tuple(buckets)
+        self._histograms = {stage: LatencyHistogram(self._buckets) for stage in stages}
+        self._counters = {}
+        self._gauge_sources = []
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(stage, LatencyHistogram(self._buckets))
+        histogram.observe(seconds)
+
+    def timed(self, stage: str):
+        """Context manager that records the duration of its block under stage."""
+        return _StageTimer(self, stage)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def add_gauges(self, source) -> None:
+        """Register a callable returning {metric name: value} to include when rendering."""
+        self._gauge_sources.append(source)
+
+    def histogram(self, stage: str) -> LatencyHistogram:
+        return self._histograms[stage]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms = {stage: LatencyHistogram(self._buckets) for stage in self._histograms}
+            self._counters = {}
+
+    def render_prometheus(self, prefix: str = "schedule") -> str:
+        """Render all metrics in the Prometheus text exposition format (version 0.0.4)."""
+        name = f"{prefix}_stage_duration_seconds"
+        lines = [f"# HELP {name} Time spent in each request stage.", f"# TYPE {name} histogram"]
+        for stage, histogram in sorted(self._histograms.items()):
+            cumulative, total, count = histogram.snapshot()
+            for bound, bucket_count in zip(histogram.buckets, cumulative):
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound:g}"}} {bucket_count}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {cumulative[-1]}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {total:.9g}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {count}')
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+        for counter_name, value in counters:
+            lines.append(f"# TYPE {prefix}_{counter_name} counter")
+            lines.append(f"{prefix}_{counter_name} {value}")
+
+        for source in self._gauge_sources:
+            for gauge_name, value in sorted(source().items()):
+                lines.append(f"# TYPE {prefix}_{gauge_name} gauge")
+                lines.append(f"{prefix}_{gauge_name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class _StageTimer:
+    __slots__ = ("_registry", "_stage", "_started")
+
+    def __init__(self, registry: MetricsRegistry, stage: str):
+        self._registry = registry
+        self._stage = stage
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._registry.observe(self._stage, time.perf_counter() - self._started)
+        return False
+
+
+class SlowRequestProfiler:
+    """
+    Profiles a random sample of requests with cProfile and keeps the slow ones.
+
+    Disabled unless threshold_ms is set. A sampled request runs under cProfile;
+    if it takes longer than threshold_ms its profile is written to output_dir as
+    a .prof file for pstats/snakeviz (the default is schedule-profiles under the
+    system temp directory). Only one request is profiled at a time, and a profile
+    that cannot be written is logged without failing the request.
+
+    Only synchronous handlers can be profiled: cProfile follows one thread, and
+    across an await it would time whatever else the event loop runs. Async routes
+    run their CPU-bound work in a thread, so profile that function instead.
+    """
+
+    def __init__(self, threshold_ms: float = None, sample_rate: float = 0.01, output_dir: str = None):
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.output_dir = output_dir
+        self.captured = 0
+        self._active = threading.Lock()
+
+    @classmethod
+    def from_environment(cls):
+        """Configure from PROFILE_SLOW_REQUESTS_MS, PROFILE_SAMPLE_RATE and PROFILE_OUTPUT_DIR."""
+        threshold = os.environ.get("PROFILE_SLOW_REQUESTS_MS")
+        return cls(
+            threshold_ms=float(threshold) if threshold else None,
+            sample_rate=float(os.environ.get("PROFILE_SAMPLE_RATE", "0.01")),
+            output_dir=os.environ.get("PROFILE_OUTPUT_DIR"),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms is not None and self.sample_rate > 0
+
+    def profiled(self, fn):
+        """Decorate a synchronous handler so that sampled slow calls are profiled."""
+        name = fn.__name__
+        if inspect.iscoroutinefunction(fn):
+            raise TypeError(f"{name} is a coroutine function; profile the synchronous work it runs instead")
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profile = self._start()
+            if profile is None:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._stop(profile, name, time.perf_counter() - started)
+        return wrapper
+
+    def _start(self):
+        if not self.enabled or random.random() >= self.sample_rate:
+            return None
+        if not self._active.acquire(blocking=False):
+            return None
+        import cProfile
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already active in this interpreter.
+            self._active.release()
+            return None
+        return profile
+
+    def _stop(self, profile, name: str, seconds: float) -> None:
+        try:
+            profile.disable()
+            if seconds * 1000 >= self.threshold_ms:
+                if self.output_dir is None:
+                    import tempfile
+                    self.output_dir = os.path.join(tempfile.gettempdir(), "schedule-profiles")
+                filename = f"{name}-{time.strftime('%Y%m%dT%H%M%S')}-{int(seconds * 1000)}ms-{self.captured}.prof"
+                try:
+                    os.makedirs(self.output_dir, exist_ok=True)
+                    profile.dump_stats(os.path.join(self.output_dir, filename))
+                except OSError:
+                    logger.exception(f"Could not write profile {filename} to {self.output_dir}")
+                else:
+                    self.captured += 1
+        finally:
+            self._active.release()
+
+
+metrics = MetricsRegistry()
+slow_request_profiler = SlowRequestProfiler.from_environment()
@@ -1,56 +1,313 @@
 import azure.functions as func
 import logging
 import json
+import os
+import re
+import sqlite3
+import time
+from datetime import date
 
+from metrics import metrics, slow_request_profiler
+from persistence import load_default_persistence
+from query_cache import QueryResultCache, normalize_text
+from request_logging import REQUEST_LOGGER, bind_request_id
+from response_encoding import error_body, json_backend, register_static_error, success_body
+from single_flight import SingleFlight
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+# Bodies over these sizes are rejected with 413 before they are decoded. A batch
+# line over MAX_QUERY_BYTES gets an error record without being decoded. The byte
+# limit alone still admits a huge number of short lines, and work and response
+# size grow with the line count, so batches over MAX_BATCH_LINES are rejected too.
+MAX_QUERY_BYTES = int(os.environ.get("MAX_QUERY_BYTES", "65536"))
+MAX_BATCH_BYTES = int(os.environ.get("MAX_BATCH_BYTES", str(8 * 1024 * 1024)))
+MAX_BATCH_LINES = int(os.environ.get("MAX_BATCH_LINES", "10000"))
+QUERY_TOO_LARGE = register_static_error(f"Request body exceeds {MAX_QUERY_BYTES} bytes")
+BATCH_TOO_LARGE = register_static_error(f"Request body exceeds {MAX_BATCH_BYTES} bytes")
+BATCH_TOO_MANY_LINES = register_static_error(f"Batch exceeds {MAX_BATCH_LINES} lines")
+LINE_TOO_LARGE = register_static_error(f"Error processing line: query exceeds {MAX_QUERY_BYTES} bytes")
+
+BLANK_LINE_RE = re.compile(rb"\s*\Z")
+
+# Clock times in queries are read in the zone named by this header, or by the
+# DEFAULT_TIME_ZONE app setting when the header is absent.
+TIME_ZONE_HEADER = "x-time-zone"
+DEFAULT_TIME_ZONE = os.environ.get("DEFAULT_TIME_ZONE") or None
+
+logger = logging.getLogger(f"{REQUEST_LOGGER}.parsing")
+
+query_cache = QueryResultCache(
+    max_entries=int(os.environ.get("QUERY_CACHE_MAX_ENTRIES", "4096")),
+    ttl_seconds=float(os.environ.get("QUERY_CACHE_TTL_SECONDS", "300"))
+)
+query_flight = SingleFlight()
+# Parsed queries are recorded here when the SQLITE_PATH app setting is set.
+query_history = load_default_persistence()
+metrics.add_gauges(lambda: {f"query_cache_{name}": value for name, value in query_cache.stats().items()})
+
+@slow_request_profiler.profiled
 def parse_schedule_query(req: func.HttpRequest) -> func.HttpResponse:
     """
     Parse a schedule query request containing raw text and return it in JSON format.
     """
-    logging.info("Processing new schedule query request")
+    bind_request_id(req)
+    logger.info("Processing new schedule query request", extra={"message_type": "query_received"})
     
     try:
-        # Get raw text from request body
-        user_query = req.get_body().decode('utf-8')
-        if not user_query:
+        body = read_body(req, MAX_QUERY_BYTES)
+        if body is None:
+            logger.warning(QUERY_TOO_LARGE, extra={"message_type": "body_too_large"})
+            return create_error_response(QUERY_TOO_LARGE, status_code=413)
+        if not body:
             error_msg = "Empty request body"
-            logging.warning(error_msg)
+            logger.warning(error_msg, extra={"message_type": "empty_body"})
             return create_error_response(error_msg, status_code=400)
-        
-        response_data = {
-            "status": "success",
-            "UserQuery": user_query
-        }
+
+        try:
+            time_zone = request_time_zone(req)
+        except ValueError as e:
+            return create_error_response(str(e), status_code=400)
+
+        # Get raw text from request body
+        started = time.perf_counter()
+        user_query = str(memoryview(body), 'utf-8')
+        metrics.observe("decode", time.perf_counter() - started)
         
         return func.HttpResponse(
-            json.dumps(response_data),
+            build_query_response(user_query, time_zone),
             mimetype="application/json",
             status_code=200
         )
             
     except Exception as e:
-        error_msg = f"Error processing request: {str(e)}"
-        logging.exception(error_msg)
-        return create_error_response(error_msg, status_code=500)
+        with metrics.timed("error"):
+            error_msg = f"Error processing request: {str(e)}"
+            logger.exception(error_msg, extra={"message_type": "request_failed"})
+            return create_error_response(error_msg, status_code=500)
+
+@slow_request_profiler.profiled
+def parse_schedule_query_batch(req: func.HttpRequest) -> func.HttpResponse:
+    """
+    Parse a batch of newline-delimited schedule queries and return one JSON result per line.
+
+    Each line is either raw query text or an NDJSON object with a "UserQuery" field.
+    A line that cannot be processed, including one over MAX_QUERY_BYTES, yields an
+    error record for that line only. A batch of more than MAX_BATCH_LINES lines is
+    rejected with 413 before any line is parsed.
+    """
+    bind_request_id(req)
+    logger.info("Processing new batch schedule query request", extra={"message_type": "batch_received"})
 
-def extract_meeting_details(req: func.HttpRequest) -> str:
-    """Extract the meeting details from the user's query."""
     try:
-        # Placeholder for actual meeting details extraction logic, for now just return the user's query
-        
-        return str(req.get_json())
-    except ValueError:
-        return "Error extracting meeting details"
+        body = read_body(req, MAX_BATCH_BYTES)
+        if body is None:
+            logger.warning(BATCH_TOO_LARGE, extra={"message_type": "body_too_large"})
+            return create_error_response(BATCH_TOO_LARGE, status_code=413)
+        if not body or body.isspace():
+            error_msg = "Empty request body"
+            logger.warning(error_msg, extra={"message_type": "empty_body"})
+            return create_error_response(error_msg, status_code=400)
+        if count_lines(body) > MAX_BATCH_LINES:
+            logger.warning(BATCH_TOO_MANY_LINES, extra={"message_type": "body_too_large"})
+            return create_error_response(BATCH_TOO_MANY_LINES, status_code=413)
+
+        try:
+            time_zone = request_time_zone(req)
+        except ValueError as e:
+            return create_error_response(str(e), status_code=400)
+
+        return func.HttpResponse(
+            b"".join(iter_batch_results(body, time_zone=time_zone)),
+            mimetype=NDJSON_MIMETYPE,
+            status_code=200
+        )
+
+    except Exception as e:
+        with metrics.timed("error"):
+            error_msg = f"Error processing request: {str(e)}"
+            logger.exception(error_msg, extra={"message_type": "request_failed"})
+            return create_error_response(error_msg, status_code=500)
+
+def request_time_zone(req: func.HttpRequest):
+    """Return the requester's IANA time zone name, or None; raises ValueError if it is unknown."""
+    headers = getattr(req, "headers", None)
+    time_zone = (headers.get(TIME_ZONE_HEADER) if headers else None) or DEFAULT_TIME_ZONE
+    if time_zone:
+        # Imported on first use: only requests that name a time zone need the service.
+        from time_zones import time_zone_service
+        time_zone_service.zone(time_zone)
+    return time_zone
+
+def read_body(req: func.HttpRequest, max_bytes: int):
+    """
+    Return the request body, or None if it is larger than max_bytes.
+
+    A Content-Length header over the limit rejects the request without touching the body.
+    """
+    headers = getattr(req, "headers", None)
+    declared = headers.get("content-length") if headers else None
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        return None
+    body = req.get_body()
+    return body if len(body) <= max_bytes else None
+
+def count_lines(body: bytes) -> int:
+    """Number of newline-separated lines in a batch body; a trailing newline does not start another."""
+    return body.count(b"\n") + (not body.endswith(b"\n"))
+
+def iter_batch_results(body, max_line_bytes: int = None, time_zone: str = None):
+    """
+    Yield one encoded NDJSON result line per non-blank line of a batch body, in order.
+
+    body is bytes or an iterable of byte chunks (see iter_body_lines); every line
+    is read in time_zone.
+    """
+    max_line_bytes = MAX_QUERY_BYTES if max_line_bytes is None else max_line_bytes
+    for line_number, raw_line in iter_body_lines(body, max_line_bytes):
+        if raw_line is None:
+            response_body = error_body(LINE_TOO_LARGE)
+        elif BLANK_LINE_RE.match(raw_line):
+            continue
+        else:
+            try:
+                started = time.perf_counter()
+                user_query = decode_batch_line(raw_line)
+                metrics.observe("decode", time.perf_counter() - started)
+                response_body = build_query_response(user_query, time_zone)
+            except Exception as e:
+                with metrics.timed("error"):
+                    response_body = error_body(f"Error processing line: {str(e)}")
+        # Splice the line number in as the first key of the response object.
+        yield b'{"line": %d, ' % line_number + response_body[1:] + b"\n"
+
+def iter_body_lines(body, max_line_bytes: int):
+    """
+    Yield (line_number, line) for each newline-separated line of a batch body.
+
+    For a bytes body each line is a memoryview slice, so nothing is copied before
+    it is decoded. Any other iterable is read as a stream of byte chunks and lines
+    are reassembled across chunk boundaries. A line longer than max_line_bytes is
+    yielded as None, and no more than max_line_bytes of it is ever buffered.
+    """
+    if isinstance(body, (bytes, bytearray)):
+        view = memoryview(body)
+        start, line_number = 0, 0
+        while True:
+            end = body.find(b"\n", start)
+            line_end = len(body) if end < 0 else end
+            line_number += 1
+            yield line_number, view[start:line_end] if line_end - start <= max_line_bytes else None
+            if end < 0:
+                return
+            start = end + 1
+
+    pending = bytearray()
+    oversize = False
+    line_number = 0
+    for chunk in body:
+        if not isinstance(chunk, (bytes, bytearray)):
+            chunk = bytes(chunk)
+        view = memoryview(chunk)
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if not oversize:
+                pending += view[start:len(chunk) if end < 0 else end]
+                oversize = len(pending) > max_line_bytes
+                if oversize:
+                    pending.clear()
+            if end < 0:
+                break
+            line_number += 1
+            yield line_number, None if oversize else bytes(pending)
+            pending.clear()
+            oversize = False
+            start = end + 1
+    yield line_number + 1, None if oversize else bytes(pending)
+
+def decode_batch_line(raw_line) -> str:
+    """Decode a single batch line (bytes or memoryview) into the user query it carries."""
+    line = str(raw_line, 'utf-8').rstrip("\r")
+    if line.lstrip().startswith("{"):
+        record = json.loads(line)
+        user_query = record.get("UserQuery")
+        if not isinstance(user_query, str):
+            raise ValueError("NDJSON line must contain a string 'UserQuery' field")
+    else:
+        user_query = line
+    if not user_query.strip():
+        raise ValueError("Empty query")
+    return user_query
+
+def build_query_response(user_query: str, time_zone: str = None) -> bytes:
+    """
+    Serialize the success response for a single decoded user query.
+
+    Details that depend only on what the query means are extracted from its
+    normalized text (see normalize_text) and cached under that text, the current
+    day (in time_zone, when given) and the time zone, so repeated phrasings skip
+    that extraction and concurrent misses for the same key share one. Details that
+    echo the query's wording (participants, date_text, participant matches) and any
+    fallback result are always computed from the query actually received.
+    """
+    # Imported on first use: compiling the extraction patterns is deferred past cold start.
+    from meeting_extraction import extract_wording, fallback_registered
+
+    if time_zone:
+        from time_zones import time_zone_service
+        today = time_zone_service.today(time_zone)
+    else:
+        today = date.today()
+    normalized = normalize_text(user_query, today)
+    cache_key = f"{today.isoformat()}|{normalized}|{time_zone}" if time_zone else f"{today.isoformat()}|{normalized}"
+    started = time.perf_counter()
+    cached = query_cache.get(cache_key)
+    if cached is None:
+        cached = query_flight.do(cache_key, _compute_details, cache_key, normalized, today, time_zone)
+    if not cached["resolved"] and fallback_registered():
+        details = extract_meeting_details(user_query, today, time_zone)
+    else:
+        # Overwriting existing keys keeps the cached key order, matching an uncached extraction.
+        details = {**cached, **extract_wording(user_query, today)}
+    metrics.observe("extraction", time.perf_counter() - started)
+    started = time.perf_counter()
+    details_json = json_backend.dumps(details)
+    response_body = success_body(user_query, details_json)
+    metrics.observe("serialization", time.perf_counter() - started)
+    if query_history is not None:
+        try:
+            query_history.record_query(user_query, details_json, time_zone)
+        except sqlite3.Error:
+            # History is optional; a locked or unwritable database must not fail the query.
+            logger.exception("Could not write query history", extra={"message_type": "history_write_failed"})
+    return response_body
+
+def _compute_details(cache_key: str, normalized: str, today: date, time_zone: str = None) -> dict:
+    details = extract_meeting_details(normalized, today, time_zone, use_fallback=False)
+    query_cache.put(cache_key, details)
+    return details
+
+def extract_meeting_details(user_query: str, reference_date: date = None, time_zone: str = None,
+                            use_fallback: bool = True) -> dict:
+    """Extract the meeting details from the user's query, reading clock times in time_zone when given."""
+    # Imported on first use: compiling the extraction patterns is deferred past cold start.
+    from meeting_extraction import extract_details
+    return extract_details(user_query, reference_date=reference_date, time_zone=time_zone,
+                           use_fallback=use_fallback)
+
+def set_team_directory(directory) -> None:
+    """Resolve participants against directory (None to stop) and drop results cached without it."""
+    from meeting_extraction import register_team_directory
+    register_team_directory(directory)
+    query_cache.clear()
 
 def create_error_response(message: str, status_code: int) -> func.HttpResponse:
     """
     Create a standardized error response.
     """
-    error_response = {
-        "status": "error",
-        "message": message
-    }
     return func.HttpResponse(
-        json.dumps(error_response),
+        error_body(message),
         mimetype="application/json",
         status_code=status_code
     )
\ No newline at end of file
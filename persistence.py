@@ -0,0 +1,297 @@
+"""Optional local SQLite persistence for availability, the team directory and parsed queries.
+
+Set the SQLITE_PATH app setting to a database file to enable it. The database runs
+in WAL mode so handlers keep reading while a write commits, and every thread uses
+its own connection from a ConnectionPool. Availability is stored as one row per
+member and day holding that day's packed busy bitmap (see AvailabilityStore):
+
+    availability_members   ids of every member with stored availability
+    busy_days              (member_id, day ordinal) -> bitmap, plus an index by day
+    directory_members      TeamDirectory members
+    query_history          parsed queries with their serialized details
+
+Bulk writes go through executemany in a single transaction. Parsed queries are
+buffered and written HISTORY_BATCH_SIZE at a time, so the request path does not
+wait for a commit per query; the buffer is flushed at exit.
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta, timezone
+
+from team_directory import Member, TeamDirectory
+
+HISTORY_BATCH_SIZE = 64
+# Buffered history rows kept while writes fail (e.g. a locked database); older ones are dropped past this.
+MAX_PENDING_HISTORY = 16 * HISTORY_BATCH_SIZE
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS availability_members (
+    member_id TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS busy_days (
+    member_id TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    bitmap BLOB NOT NULL,
+    PRIMARY KEY (member_id, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS busy_days_by_day ON busy_days (day);
+CREATE TABLE IF NOT EXISTS directory_members (
+    member_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT,
+    aliases TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS query_history (
+    id INTEGER PRIMARY KEY,
+    received_at TEXT NOT NULL,
+    user_query TEXT NOT NULL,
+    time_zone TEXT,
+    details TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS query_history_by_time ON query_history (received_at);
+"""
+
+
+class ConnectionPool:
+    """
+    One SQLite connection per thread, opened on first use.
+
+    Connections are opened in WAL mode with synchronous=NORMAL, which keeps
+    commits durable across process crashes without an fsync per transaction.
+    """
+
+    def __init__(self, path: str, timeout_seconds: float = 5.0):
+        self.path = path
+        self.timeout_seconds = timeout_seconds
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def connection(self) -> sqlite3.Connection:
+        """Return the calling thread's connection."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Only the owning thread uses a connection; close_all may run elsewhere at shutdown.
+            connection = sqlite3.connect(self.path, timeout=self.timeout_seconds, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def close_all(self) -> None:
+        """Close every connection the pool has opened."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+
+class SQLitePersistence:
+    """Reads and writes availability, directory members and query history in one SQLite database."""
+
+    def __init__(self, path: str, history_batch_size: int = HISTORY_BATCH_SIZE):
+        self.pool = ConnectionPool(path)
+        self.history_batch_size = history_batch_size
+        self._history = []
+        self._history_lock = threading.Lock()
+        with self.pool.connection() as connection:
+            connection.executescript(SCHEMA)
+
+    def save_availability(self, store, start_date: date = None, end_date: date = None) -> int:
+        """
+        Replace the stored busy rows of every written day of store in start_date..end_date.
+
+        Members without busy time that day take no row. Returns the number of rows written.
+        """
+        days = [day for day in store.stored_days()
+                if (start_date is None or day >= start_date) and (end_date is None or day <= end_date)]
+        members = store.members
+        written = 0
+        with self.pool.connection() as connection:
+            self._save_members(connection, store)
+            for day in days:
+                matrix = store.day_bitmaps(day)
+                ordinal = day.toordinal()
+                connection.execute("DELETE FROM busy_days WHERE day = ?", (ordinal,))
+                busy_rows = matrix.any(axis=1).nonzero()[0]
+                connection.executemany(
+                    "INSERT INTO busy_days (member_id, day, bitmap) VALUES (?, ?, ?)",
+                    ((members[row], ordinal, matrix[row].tobytes()) for row in busy_rows)
+                )
+                written += len(busy_rows)
+        return written
+
+    def save_changes(self, store, changes, members=()) -> int:
+        """
+        Write the member-days touched by BusyChanges as they are in store (a version with them applied).
+
+        Cost follows the number of member-days changed; returns how many were written.
+        """
+        touched = set()
+        for change in changes:
+            day = change.start.date()
+            while datetime.combine(day, datetime.min.time()) < change.end:
+                touched.add((change.member_id, day))
+                day += timedelta(days=1)
+        upserts, deletes = [], []
+        for member_id, day in touched:
+            bitmap = store.member_bitmap(member_id, day)
+            if bitmap is not None and bitmap.any():
+                upserts.append((member_id, day.toordinal(), bitmap.tobytes()))
+            else:
+                deletes.append((member_id, day.toordinal()))
+        with self.pool.connection() as connection:
+            self._save_members(connection, store, list(members) + [member_id for member_id, _ in touched])
+            connection.executemany(
+                "INSERT OR REPLACE INTO busy_days (member_id, day, bitmap) VALUES (?, ?, ?)", upserts)
+            connection.executemany("DELETE FROM busy_days WHERE member_id = ? AND day = ?", deletes)
+        return len(touched)
+
+    def load_availability(self, start_date: date = None, end_date: date = None):
+        """Return an AvailabilityStore with the stored members and the busy rows of start_date..end_date."""
+        # Imported on first use: numpy is only needed once availability is read.
+        import numpy as np
+        from availability import DEFAULT_SLOT_MINUTES, MINUTES_PER_DAY, AvailabilityStore
+
+        connection = self.pool.connection()
+        slot_minutes = int(self._meta(connection, "slot_minutes") or DEFAULT_SLOT_MINUTES)
+        bytes_per_day = (MINUTES_PER_DAY // slot_minutes + 7) // 8
+        members = [member_id for member_id, in
+                   connection.execute("SELECT member_id FROM availability_members ORDER BY rowid")]
+        rows = {member_id: row for row, member_id in enumerate(members)}
+        first = start_date.toordinal() if start_date else 0
+        last = end_date.toordinal() if end_date else date.max.toordinal()
+
+        day_matrices = {}
+        for member_id, ordinal, bitmap in connection.execute(
+                "SELECT member_id, day, bitmap FROM busy_days WHERE day BETWEEN ? AND ? ORDER BY day",
+                (first, last)):
+            matrix = day_matrices.get(ordinal)
+            if matrix is None:
+                matrix = day_matrices[ordinal] = np.zeros((len(members), bytes_per_day), dtype=np.uint8)
+            matrix[rows[member_id]] = np.frombuffer(bitmap, dtype=np.uint8)
+        return AvailabilityStore.from_day_matrices(
+            slot_minutes, members, {date.fromordinal(ordinal): matrix for ordinal, matrix in day_matrices.items()})
+
+    def has_availability(self) -> bool:
+        return self.pool.connection().execute("SELECT 1 FROM availability_members LIMIT 1").fetchone() is not None
+
+    def busy_days(self, member_id: str, start_date: date, end_date: date) -> dict:
+        """Return {day: packed bitmap bytes} of a member's busy days in start_date..end_date."""
+        cursor = self.pool.connection().execute(
+            "SELECT day, bitmap FROM busy_days WHERE member_id = ? AND day BETWEEN ? AND ?",
+            (member_id, start_date.toordinal(), end_date.toordinal()))
+        return {date.fromordinal(ordinal): bitmap for ordinal, bitmap in cursor}
+
+    def save_directory(self, directory: TeamDirectory) -> int:
+        """Replace the stored directory members with those of directory."""
+        with self.pool.connection() as connection:
+            connection.execute("DELETE FROM directory_members")
+            connection.executemany(
+                "INSERT INTO directory_members (member_id, name, email, aliases) VALUES (?, ?, ?, ?)",
+                ((member.member_id, member.name, member.email, json.dumps(list(member.aliases)))
+                 for member in directory)
+            )
+        return len(directory)
+
+    def load_directory(self) -> TeamDirectory:
+        """Return a TeamDirectory of the stored members, or None when none are stored."""
+        cursor = self.pool.connection().execute(
+            "SELECT member_id, name, email, aliases FROM directory_members ORDER BY member_id")
+        members = [Member(member_id, name, email, tuple(json.loads(aliases)))
+                   for member_id, name, email, aliases in cursor]
+        return TeamDirectory(members) if members else None
+
+    def record_query(self, user_query: str, details_json: bytes, time_zone: str = None) -> None:
+        """
+        Buffer a parsed query for the history table, writing a batch once it is full.
+
+        If the write raises sqlite3.Error the batch goes back into the buffer (up to
+        MAX_PENDING_HISTORY rows) to be retried with the next one, and the error propagates.
+        """
+        entry = (datetime.now(timezone.utc).isoformat(), user_query, time_zone, details_json.decode("utf-8"))
+        with self._history_lock:
+            self._history.append(entry)
+            if len(self._history) < self.history_batch_size:
+                return
+            batch, self._history = self._history, []
+        self._write_history(batch)
+
+    def flush_history(self) -> None:
+        """Write any buffered history rows; on sqlite3.Error they stay buffered, as in record_query."""
+        with self._history_lock:
+            batch, self._history = self._history, []
+        if batch:
+            self._write_history(batch)
+
+    def recent_queries(self, limit: int = 100) -> list:
+        """Return the latest history rows as dicts, newest first, including buffered ones."""
+        self.flush_history()
+        cursor = self.pool.connection().execute(
+            "SELECT received_at, user_query, time_zone, details FROM query_history ORDER BY id DESC LIMIT ?",
+            (limit,))
+        return [
+            {"received_at": received_at, "user_query": user_query, "time_zone": time_zone,
+             "details": json.loads(details)}
+            for received_at, user_query, time_zone, details in cursor
+        ]
+
+    def close(self) -> None:
+        self.flush_history()
+        self.pool.close_all()
+
+    def _write_history(self, batch: list) -> None:
+        try:
+            with self.pool.connection() as connection:
+                connection.executemany(
+                    "INSERT INTO query_history (received_at, user_query, time_zone, details) VALUES (?, ?, ?, ?)",
+                    batch)
+        except sqlite3.Error:
+            with self._history_lock:
+                self._history = (batch + self._history)[-MAX_PENDING_HISTORY:]
+            raise
+
+    def _save_members(self, connection, store, member_ids=None) -> None:
+        stored = self._meta(connection, "slot_minutes")
+        if stored is not None and int(stored) != store.slot_minutes:
+            raise ValueError(f"Database holds {stored}-minute slots, store uses {store.slot_minutes}")
+        connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('slot_minutes', ?)",
+                           (str(store.slot_minutes),))
+        member_ids = store.members if member_ids is None else set(member_ids)
+        connection.executemany("INSERT OR IGNORE INTO availability_members (member_id) VALUES (?)",
+                               ((member_id,) for member_id in member_ids))
+
+    @staticmethod
+    def _meta(connection, key: str):
+        row = connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+
+_default_persistence = None
+_default_loaded = False
+_default_lock = threading.Lock()
+
+
+def load_default_persistence():
+    """Return the SQLitePersistence for the SQLITE_PATH app setting (shared per process), or None when unset."""
+    global _default_persistence, _default_loaded
+    if not _default_loaded:
+        with _default_lock:
+            if not _default_loaded:
+                path = os.environ.get("SQLITE_PATH")
+                if path:
+                    _default_persistence = SQLitePersistence(path)
+                    atexit.register(_default_persistence.close)
+                _default_loaded = True
+    return _default_persistence
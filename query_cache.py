@@ -0,0 +1,104 @@
+"""Bounded TTL/LRU cache for scheduling query results."""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+
+def normalize_text(user_query: str, reference_date: date) -> str:
+    """
+    Collapse whitespace, fold case and replace the first relative date phrase by the date it resolves to.
+
+    The result is the cache key text, so "standup tomorrow" and "Standup  2026-10-18" share
+    it on 2026-10-17; values cached under it must be computed from it, not from whichever
+    phrasing arrived first. Text with a recurrence keeps its date phrase, since "every
+    monday" means more than the date it starts on.
+    """
+    # Imported on first use: compiling the extraction patterns is deferred past cold start.
+    from meeting_extraction import extract_recurrence, find_date
+
+    text = " ".join(user_query.split()).casefold()
+    meeting_date, span = find_date(text, reference_date)
+    if span is not None and extract_recurrence(text) is None:
+        text = f"{text[:span[0]]}{meeting_date.isoformat()}{text[span[1]:]}"
+    return text
+
+
+class QueryResultCache:
+    """
+    Thread-safe LRU cache of query results with a per-entry TTL.
+
+    Keys embed the day they were resolved against, and the whole cache is dropped
+    the first time it is touched on a new day, so an entry is never served across
+    a date boundary. A max_entries of 0 disables caching.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 300.0,
+                 clock=time.monotonic, today=date.today):
+        if max_entries < 0 or ttl_seconds <= 0:
+            raise ValueError("max_entries must be >= 0 and ttl_seconds must be > 0")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._today = today
+        self._day = today()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str):
+        """Return the cached value for key, or None on a miss or expired entry."""
+        with self._lock:
+            self._roll_day()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value) -> None:
+        """Store value under key, evicting the least recently used entries if full."""
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._roll_day()
+            self._entries[key] = (self._clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return hit/miss/eviction counters and the current size."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _roll_day(self) -> None:
+        today = self._today()
+        if today != self._day:
+            self.expirations += len(self._entries)
+            self._entries.clear()
+            self._day = today
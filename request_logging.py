@@ -0,0 +1,228 @@
+"""Queue-based, sampled and rate-limited structured logging for the request path.
+
+Request handlers log through loggers under REQUEST_LOGGER. Once start_logging_pipeline()
+has run, a record on those loggers is filtered and put on an in-memory queue by the
+request thread; a background QueueListener formats it as a JSON line (including any
+traceback) and hands it to the root logger's handlers. Until then they log normally.
+"""
+
+import atexit
+import contextvars
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+from metrics import metrics
+
+REQUEST_LOGGER = "schedule"
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_RATE_LIMIT = 100.0
+
+request_id_var = contextvars.ContextVar("request_id", default=None)
+_request_ids = itertools.count(1)
+_process_tag = f"{os.getpid():x}"
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def bind_request_id(req=None) -> str:
+    """
+    Set the request ID for log records emitted in the current context and return it.
+
+    Uses the caller's x-request-id header when present, otherwise a process-unique ID.
+    """
+    headers = getattr(req, "headers", None)
+    request_id = headers.get("x-request-id") if headers else None
+    if not request_id:
+        request_id = f"{_process_tag}-{next(_request_ids)}"
+    request_id_var.set(request_id)
+    return request_id
+
+
+def message_type(record: logging.LogRecord) -> str:
+    """Return the sampling key of a record: its message_type extra, or its call site."""
+    return getattr(record, "message_type", None) or f"{record.module}:{record.lineno}"
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Per-message-type sampling and token-bucket rate limiting.
+
+    sample_rates maps a message type to the fraction of its records to keep, and
+    rate_limits to the maximum records per second (default_rate_limit for types not
+    listed; None for no limit). The next kept record of a type carries the number
+    of records of that type dropped in between as record.suppressed. Runs on the
+    request thread, so it also stamps the current request ID.
+    """
+
+    def __init__(self, sample_rates=None, rate_limits=None, default_rate_limit=DEFAULT_RATE_LIMIT,
+                 clock=time.monotonic):
+        super().__init__()
+        self.sample_rates = dict(sample_rates or {})
+        self.rate_limits = dict(rate_limits or {})
+        self.default_rate_limit = default_rate_limit
+        self._clock = clock
+        self._buckets = {}
+        self._suppressed = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        key = message_type(record)
+        record.message_type = key
+
+        sample_rate = self.sample_rates.get(key, 1.0)
+        keep = sample_rate >= 1.0 or random.random() < sample_rate
+        with self._lock:
+            if keep:
+                keep = self._take_token(key)
+            if not keep:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            else:
+                record.suppressed = self._suppressed.pop(key, 0)
+        if not keep:
+            metrics.increment("log_records_dropped_total")
+        return keep
+
+    def _take_token(self, key: str) -> bool:
+        limit = self.rate_limits.get(key, self.default_rate_limit)
+        if limit is None:
+            return True
+        now = self._clock()
+        tokens, updated = self._buckets.get(key, (limit, now))
+        tokens = min(limit, tokens + (now - updated) * limit)
+        if tokens < 1.0:
+            self._buckets[key] = (tokens, now)
+            return False
+        self._buckets[key] = (tokens - 1.0, now)
+        return True
+
+
+class EnqueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that does no formatting on the calling thread.
+
+    The stock handler merges arguments and formats tracebacks before enqueueing;
+    here the record goes on the queue untouched and the listener does that work.
+    A full queue drops the record instead of blocking or raising.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.increment("log_records_dropped_total")
+
+
+class JsonFormatter(logging.Formatter):
+    """Format a record as a single-line JSON object."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message_type": getattr(record, "message_type", None),
+            "request_id": getattr(record, "request_id", None),
+            "message": record.getMessage(),
+        }
+        if getattr(record, "suppressed", 0):
+            payload["suppressed"] = record.suppressed
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload)
+
+
+class RootForwardHandler(logging.Handler):
+    """Listener-side handler that passes JSON-formatted records to the root logger's handlers."""
+
+    def __init__(self):
+        super().__init__()
+        self.setFormatter(JsonFormatter())
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            record.msg = self.format(record)
+            record.args = None
+            record.exc_info = None
+            record.exc_text = None
+            for handler in logging.getLogger().handlers or [logging.lastResort]:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+        except Exception:
+            self.handleError(record)
+
+
+def parse_type_settings(value: str) -> dict:
+    """Parse "type=number,type=number" settings such as LOG_SAMPLE_RATES."""
+    settings = {}
+    for item in filter(None, (part.strip() for part in (value or "").split(","))):
+        key, _, number = item.partition("=")
+        settings[key.strip()] = float(number)
+    return settings
+
+
+def start_logging_pipeline(handlers=None, sample_rates=None, rate_limits=None,
+                           default_rate_limit=DEFAULT_RATE_LIMIT, queue_size=DEFAULT_QUEUE_SIZE):
+    """
+    Route REQUEST_LOGGER records through the queue and start the listener thread.
+
+    handlers default to forwarding to the root logger's handlers. Calling this
+    again while a pipeline is running returns the running pipeline's listener.
+    """
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is not None:
+            return _pipeline[1]
+
+        log_queue = queue.Queue(maxsize=queue_size)
+        enqueue_handler = EnqueueHandler(log_queue)
+        enqueue_handler.addFilter(SamplingFilter(sample_rates, rate_limits, default_rate_limit))
+        listener = logging.handlers.QueueListener(
+            log_queue, *(handlers or [RootForwardHandler()]), respect_handler_level=True
+        )
+        listener.start()
+
+        logger = logging.getLogger(REQUEST_LOGGER)
+        logger.addHandler(enqueue_handler)
+        logger.propagate = False
+        _pipeline = (enqueue_handler, listener)
+        return listener
+
+
+def start_logging_pipeline_from_environment():
+    """Start the pipeline configured by LOG_SAMPLE_RATES, LOG_RATE_LIMITS and LOG_DEFAULT_RATE_LIMIT."""
+    default_rate_limit = os.environ.get("LOG_DEFAULT_RATE_LIMIT", str(DEFAULT_RATE_LIMIT))
+    return start_logging_pipeline(
+        sample_rates=parse_type_settings(os.environ.get("LOG_SAMPLE_RATES")),
+        rate_limits=parse_type_settings(os.environ.get("LOG_RATE_LIMITS")),
+        default_rate_limit=float(default_rate_limit) if default_rate_limit else None,
+    )
+
+
+def stop_logging_pipeline() -> None:
+    """Flush queued records, stop the listener and restore synchronous logging."""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            return
+        enqueue_handler, listener = _pipeline
+        _pipeline = None
+        logger = logging.getLogger(REQUEST_LOGGER)
+        logger.removeHandler(enqueue_handler)
+        logger.propagate = True
+        listener.stop()
+
+
+atexit.register(stop_logging_pipeline)
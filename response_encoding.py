@@ -0,0 +1,85 @@
+"""Byte-level building blocks for JSON response bodies.
+
+The success and error envelopes are assembled from pre-encoded byte templates with
+only the variable strings escaped per request; the bytes are identical to what
+json.dumps produces for the equivalent dict. Other payloads go through a pluggable
+JSON backend chosen with the JSON_BACKEND app setting:
+
+    json    the standard library (default; output identical to json.dumps)
+    orjson  orjson, when installed (faster; compact separators and raw UTF-8)
+    auto    orjson when installed, otherwise the standard library
+"""
+
+import json
+import os
+from json.encoder import encode_basestring_ascii
+
+SUCCESS_PREFIX = b'{"status": "success", "UserQuery": '
+DETAILS_SEPARATOR = b', "MeetingDetails": '
+ERROR_PREFIX = b'{"status": "error", "message": '
+ENVELOPE_END = b'}'
+
+# Error messages that never vary, encoded once at import.
+STATIC_ERROR_MESSAGES = ("Empty request body",)
+
+
+def encode_string(value: str) -> bytes:
+    """Encode a str as a JSON string literal exactly as json.dumps does by default."""
+    return encode_basestring_ascii(value).encode("ascii")
+
+
+def success_body(user_query: str, details_json: bytes) -> bytes:
+    """Return the success envelope for a query and its already-serialized MeetingDetails."""
+    return b"".join((SUCCESS_PREFIX, encode_string(user_query), DETAILS_SEPARATOR, details_json, ENVELOPE_END))
+
+
+def error_body(message: str) -> bytes:
+    """Return the error envelope for message, reusing the pre-encoded body for static messages."""
+    body = _static_error_bodies.get(message)
+    if body is None:
+        body = b"".join((ERROR_PREFIX, encode_string(message), ENVELOPE_END))
+    return body
+
+
+def register_static_error(message: str) -> str:
+    """Pre-encode the error body for a message that does not vary per request and return the message."""
+    _static_error_bodies[message] = b"".join((ERROR_PREFIX, encode_string(message), ENVELOPE_END))
+    return message
+
+
+_static_error_bodies = {}
+for _message in STATIC_ERROR_MESSAGES:
+    register_static_error(_message)
+
+
+class StdlibJsonBackend:
+    name = "json"
+
+    @staticmethod
+    def dumps(value) -> bytes:
+        return json.dumps(value).encode("utf-8")
+
+
+class OrjsonBackend:
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self.dumps = orjson.dumps
+
+
+def select_backend(name: str = "json"):
+    """Return the JSON backend for a JSON_BACKEND setting; raises ValueError for unknown names."""
+    if name == "json":
+        return StdlibJsonBackend()
+    if name == "orjson":
+        return OrjsonBackend()
+    if name == "auto":
+        try:
+            return OrjsonBackend()
+        except ImportError:
+            return StdlibJsonBackend()
+    raise ValueError(f"Unknown JSON backend: {name}")
+
+
+json_backend = select_backend(os.environ.get("JSON_BACKEND", "json"))
@@ -0,0 +1,109 @@
+"""Single-flight coalescing of identical in-flight computations."""
+
+import asyncio
+import inspect
+import threading
+from concurrent.futures import Future
+
+
+class _Call:
+    """One in-flight computation and the thread/task that is running it."""
+
+    def __init__(self, thread_id: int, task=None):
+        self.future = Future()
+        self.thread_id = thread_id
+        self.task = task
+
+
+class SingleFlight:
+    """
+    Run at most one computation per key at a time and share its outcome.
+
+    Callers that arrive while a computation for the same key is running wait for
+    it and receive the same result, or the same exception if it raised. The key is
+    released as soon as the computation finishes, so later callers start afresh.
+    Works from plain threads (do) and from coroutines (do_async), and a caller
+    that would have to block its own leader's thread computes directly instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """Call fn(*args, **kwargs) for key, or wait for the call already in flight."""
+        call, leader = self._join(key, task=None)
+        if call is None:
+            return fn(*args, **kwargs)
+        if not leader:
+            return call.future.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key, call, error=e)
+            raise
+        self._finish(key, call, result=result)
+        return result
+
+    async def do_async(self, key, fn, *args, **kwargs):
+        """Async variant of do; fn may be a coroutine function or a plain callable."""
+        call, leader = self._join(key, task=asyncio.current_task())
+        if call is None:
+            return await _maybe_await(fn(*args, **kwargs))
+        if not leader:
+            # Shield so a cancelled waiter does not cancel the shared computation.
+            shared = asyncio.wrap_future(call.future)
+            try:
+                return await asyncio.shield(shared)
+            except asyncio.CancelledError:
+                shared.add_done_callback(_consume_outcome)
+                raise
+        try:
+            result = await _maybe_await(fn(*args, **kwargs))
+        except BaseException as e:
+            self._finish(key, call, error=e)
+            raise
+        self._finish(key, call, result=result)
+        return result
+
+    def in_flight(self) -> int:
+        """Number of keys currently being computed."""
+        with self._lock:
+            return len(self._calls)
+
+    def _join(self, key, task):
+        """Return (call, is_leader); call is None when the caller must compute directly."""
+        thread_id = threading.get_ident()
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call(thread_id, task)
+                self._calls[key] = call
+                return call, True
+        if call.thread_id == thread_id and (task is None or call.task is None or call.task is task):
+            # Waiting here would block the thread (or task) the leader is running on.
+            return None, False
+        return call, False
+
+    def _finish(self, key, call, result=None, error=None) -> None:
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        if isinstance(error, asyncio.CancelledError):
+            call.future.cancel()
+        elif error is not None:
+            call.future.set_exception(error)
+        else:
+            call.future.set_result(result)
+
+
+async def _maybe_await(value):
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+def _consume_outcome(future) -> None:
+    """Mark an abandoned waiter's outcome as retrieved so asyncio does not log it."""
+    if not future.cancelled():
+        future.exception()
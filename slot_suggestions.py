@@ -0,0 +1,161 @@
+"""Ranked meeting slot suggestions over an AvailabilityStore.
+
+Candidate start slots are generated one day at a time and scored with NumPy. Only
+each day's best non-overlapping candidates are offered to a heap bounded at the
+number of suggestions wanted, so a month-long search for hundreds of attendees
+never holds more than one day of candidates at once.
+"""
+
+import heapq
+from datetime import date, datetime, time, timedelta, timezone
+
+import numpy as np
+
+from availability import AvailabilityStore
+from time_zones import MINUTES_PER_DAY, local_weekdays, time_zone_service
+
+DEFAULT_WORKING_HOURS = (time(9), time(17))
+WORKING_DAYS = frozenset(range(5))
+WORKING_DAYS_ARRAY = np.array(sorted(WORKING_DAYS))
+
+COVERAGE_WEIGHT = 0.5
+WORKING_HOURS_WEIGHT = 0.3
+PROXIMITY_WEIGHT = 0.2
+# The proximity score halves for every this many hours between a slot and the preferred start.
+PROXIMITY_HALF_LIFE_HOURS = 24.0
+
+
+def suggest_slots(store: AvailabilityStore, required, start_date: date, end_date: date,
+                  duration_minutes: int, optional=(), preferred_start: datetime = None,
+                  time_zones: dict = None, working_hours=DEFAULT_WORKING_HOURS,
+                  limit: int = 5, step_minutes: int = None) -> list:
+    """
+    Return up to limit slot suggestions, best first.
+
+    Every required member is free for the whole of a suggested slot. The score
+    (0 to 1) combines the share of optional members also free for it, the share of
+    attendee time that falls within each attendee's working hours on a weekday in
+    their own time zone (time_zones maps member ids to IANA names; others use UTC,
+    the store's clock), and closeness to preferred_start. Slots start every
+    step_minutes (default one store slot), do not cross midnight, and do not
+    overlap other suggestions on the same day. end_date is inclusive.
+    """
+    if duration_minutes <= 0 or limit <= 0:
+        raise ValueError("duration_minutes and limit must be positive")
+    if end_date < start_date:
+        raise ValueError("end_date must not be before start_date")
+    required = list(dict.fromkeys(required))
+    required_set = set(required)
+    optional = [member for member in dict.fromkeys(optional) if member not in required_set]
+    if not required:
+        raise ValueError("at least one required member is needed")
+
+    slot_minutes = store.slot_minutes
+    width = -(-duration_minutes // slot_minutes)
+    if width > store.slots_per_day:
+        raise ValueError("duration_minutes must not exceed a day")
+    step = max(1, (step_minutes or slot_minutes) // slot_minutes)
+
+    attendees = required + optional
+    zones = {}
+    for member in attendees:
+        zone_name = (time_zones or {}).get(member, "UTC")
+        zones[zone_name] = zones.get(zone_name, 0) + 1
+    for zone_name in zones:
+        time_zone_service.zone(zone_name)
+    preferred = _to_store_clock(preferred_start) if preferred_start else None
+
+    heap = []
+    for day, starts, scores, parts in _score_days(store, required, optional, zones, start_date, end_date,
+                                                  width, step, working_hours, preferred):
+        day_start = datetime.combine(day, time())
+        taken = []
+        for index in np.argsort(-scores, kind="stable"):
+            score = float(scores[index])
+            if len(heap) == limit and score <= heap[0][0]:
+                break
+            first_slot = int(starts[index])
+            if any(abs(first_slot - other) < width for other in taken):
+                continue
+            taken.append(first_slot)
+            start = day_start + timedelta(minutes=first_slot * slot_minutes)
+            # Earlier slots win ties, so the heap orders equal scores by descending start.
+            entry = (score, -(day.toordinal() * store.slots_per_day + first_slot), start, index, parts)
+            if len(heap) < limit:
+                heapq.heappush(heap, entry)
+            else:
+                heapq.heapreplace(heap, entry)
+            if len(taken) == limit:
+                break
+
+    suggestions = []
+    for score, _, start, index, parts in sorted(heap, reverse=True):
+        coverage, working_fit, available = parts[0][index], parts[1][index], parts[2][index]
+        suggestions.append({
+            "start": start,
+            "end": start + timedelta(minutes=duration_minutes),
+            "score": round(score, 4),
+            "optional_available": [member for member, free in zip(optional, available) if free],
+            "coverage": round(float(coverage), 4),
+            "working_hours_fit": round(float(working_fit), 4),
+        })
+    return suggestions
+
+
+def _score_days(store, required, optional, zones, start_date, end_date, width, step, working_hours, preferred):
+    """Lazily yield (day, candidate start slots, scores, (coverage, working fit, optional free)) per day."""
+    slot_minutes = store.slot_minutes
+    attendee_count = sum(zones.values())
+    # Days on which some required member has no long enough free run are skipped via rollups.
+    candidates = store.candidate_days(required, start_date, end_date, width * slot_minutes)
+    for offset in np.flatnonzero(candidates):
+        day = start_date + timedelta(days=int(offset))
+        required_busy = store.busy_matrix(required, day).any(axis=0)
+        starts = np.flatnonzero(_window_sums(required_busy, width) == 0)
+        starts = starts[starts % step == 0]
+        if len(starts):
+            if optional:
+                optional_free = _window_sums(store.busy_matrix(optional, day), width)[:, starts] == 0
+                coverage = optional_free.mean(axis=0)
+            else:
+                optional_free = np.zeros((0, len(starts)), dtype=bool)
+                coverage = np.ones(len(starts))
+
+            in_hours = sum(count * _working_slots(zone_name, day, slot_minutes, working_hours)
+                           for zone_name, count in zones.items())
+            working_fit = _window_sums(in_hours, width)[starts] / (width * attendee_count)
+
+            if preferred is None:
+                proximity = np.ones(len(starts))
+            else:
+                offsets = datetime.combine(day, time()) - preferred
+                hours = np.abs(offsets / timedelta(hours=1) + starts * (slot_minutes / 60))
+                proximity = 0.5 ** (hours / PROXIMITY_HALF_LIFE_HOURS)
+
+            scores = (COVERAGE_WEIGHT * coverage + WORKING_HOURS_WEIGHT * working_fit
+                      + PROXIMITY_WEIGHT * proximity)
+            yield day, starts, scores, (coverage, working_fit, optional_free.T)
+
+
+def _window_sums(values: np.ndarray, width: int) -> np.ndarray:
+    """Sums of every width-long run along the last axis (length slots - width + 1)."""
+    padded = np.zeros(values.shape[:-1] + (values.shape[-1] + 1,), dtype=np.int32)
+    np.cumsum(values, axis=-1, out=padded[..., 1:])
+    return padded[..., width:] - padded[..., :-width]
+
+
+def _working_slots(zone_name: str, day: date, slot_minutes: int, working_hours) -> np.ndarray:
+    """Return a bool array of the store (UTC) slots of day that lie wholly within weekday working hours in a zone."""
+    local_starts = time_zone_service.local_slot_minutes(zone_name, day, slot_minutes)
+    minute_of_day = local_starts % MINUTES_PER_DAY
+    work_start = working_hours[0].hour * 60 + working_hours[0].minute
+    work_end = working_hours[1].hour * 60 + working_hours[1].minute
+    return (np.isin(local_weekdays(local_starts), WORKING_DAYS_ARRAY)
+            & (minute_of_day >= work_start) & (minute_of_day + slot_minutes <= work_end))
+
+
+def _to_store_clock(value: datetime) -> datetime:
+    """Convert an aware datetime to the store's naive UTC clock; naive values are taken as already UTC."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,328 @@
+"""Team directory with exact, prefix and fuzzy lookup of members by name, alias or email.
+
+Every member is indexed under several normalized keys (member id, email and its
+local part, full name, each name token and aliases), each carrying a weight:
+
+    exact     dict lookup of the whole key
+    prefix    a sorted array of keys searched with bisect, i.e. a flattened trie;
+              the best PREFIX_TOP_K members over a prefix's whole key range are
+              cached per prefix
+    fuzzy     character bigram postings scored by Dice similarity, used only when
+              nothing matches exactly or by prefix
+
+Load an export with load_directory("members.csv") or load_directory("members.json").
+"""
+
+import csv
+import json
+import os
+import heapq
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+Member = namedtuple("Member", "member_id name email aliases")
+MatchCandidate = namedtuple("MatchCandidate", "member_id name score matched")
+
+# Weight of each kind of key; first names rank above surnames, and both below
+# identifiers and full names, so "John" prefers an alias "john" over "Johnson".
+EXACT_WEIGHT = 1.0
+ALIAS_WEIGHT = 0.95
+FIRST_NAME_WEIGHT = 0.9
+NAME_TOKEN_WEIGHT = 0.85
+
+MIN_PREFIX_LENGTH = 2
+# Prefix matches kept per cached prefix; a resolve with a larger limit scans the range uncached.
+PREFIX_TOP_K = 32
+MAX_CACHED_PREFIXES = 4096
+MIN_FUZZY_SIMILARITY = 0.4
+# A top candidate is taken as the match only if it scores at least this much
+# and leads the runner-up by AMBIGUITY_MARGIN.
+MIN_RESOLVED_SCORE = 0.85
+AMBIGUITY_MARGIN = 0.05
+
+
+def normalize_name(text: str) -> str:
+    """Casefold, strip accents and a leading @, and collapse whitespace."""
+    if not text.isascii():
+        decomposed = unicodedata.normalize("NFKD", text)
+        text = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(text.casefold().strip().lstrip("@").split())
+
+
+def _bigrams(key: str) -> set:
+    padded = f"${key}$"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+class TeamDirectory:
+    """In-memory index of members for resolving informal participant names to member ids."""
+
+    def __init__(self, members=()):
+        self._members = []
+        self._by_id = {}
+        self._exact = {}
+        self._key_ids = {}
+        self._key_names = []
+        self._key_entries = []
+        # (sorted keys, highest entry weight per key, key lengths), built on first prefix lookup.
+        self._sorted_keys = None
+        # prefix -> [(score, index, key)] best first, rebuilt after members are added.
+        self._prefix_top = {}
+        self._postings = {}
+        self._gram_counts = array("H")
+        self._entries_ranked = True
+        for member in members:
+            self.add(member)
+
+    def add(self, member: Member) -> None:
+        """Index a member; raises ValueError if its member id is already present."""
+        if member.member_id in self._by_id:
+            raise ValueError(f"Duplicate member id: {member.member_id}")
+        index = len(self._members)
+        self._members.append(member)
+        self._by_id[member.member_id] = index
+
+        seen = set()
+        for key, weight, fuzzy in self._member_keys(member):
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            entries = self._exact.setdefault(key, [])
+            entries.append((index, weight))
+            self._entries_ranked = False
+            if key not in self._key_ids:
+                key_id = len(self._key_entries)
+                self._key_ids[key] = key_id
+                self._key_names.append(key)
+                self._key_entries.append(entries)
+                grams = _bigrams(key) if fuzzy else ()
+                self._gram_counts.append(min(len(grams), 0xFFFF))
+                for gram in grams:
+                    self._postings.setdefault(gram, array("I")).append(key_id)
+        # A new key or a heavier entry under an existing one changes prefix results.
+        self._sorted_keys = None
+        self._prefix_top = {}
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __contains__(self, member_id: str) -> bool:
+        return member_id in self._by_id
+
+    def __iter__(self):
+        return iter(self._members)
+
+    def get(self, member_id: str) -> Member:
+        index = self._by_id.get(member_id)
+        return None if index is None else self._members[index]
+
+    def resolve(self, name: str, limit: int = 5) -> list:
+        """
+        Return up to limit MatchCandidates for a name, best first.
+
+        Scores are in (0, 1]: exact key matches score their key weight, prefix
+        matches less depending on how much of the key was typed, and fuzzy matches
+        less again by similarity.
+        """
+        query = normalize_name(name)
+        if not query:
+            return []
+        self._rank_entries()
+        best = {}
+
+        def offer(index, score, matched):
+            if score > best.get(index, (0.0, None))[0]:
+                best[index] = (score, matched)
+
+        # Entries are ranked by weight, so the first limit of each key are enough
+        # for the overall top limit however many members share the key.
+        for index, weight in self._exact.get(query, ())[:limit]:
+            offer(index, weight, query)
+
+        if len(query) >= MIN_PREFIX_LENGTH and len(best) < limit:
+            for score, index, key in self._prefix_matches(query, limit):
+                offer(index, score, key)
+
+        if not best:
+            for key_id, similarity in self._fuzzy_keys(query, limit):
+                key = self._key_names[key_id]
+                for index, weight in self._key_entries[key_id][:limit]:
+                    offer(index, weight * 0.7 * similarity, key)
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1][0], self._members[item[0]].name))
+        return [
+            MatchCandidate(self._members[index].member_id, self._members[index].name, round(score, 4), matched)
+            for index, (score, matched) in ranked[:limit]
+        ]
+
+    def resolve_one(self, name: str, limit: int = 5):
+        """Return (member_id or None, candidates); member_id is None when there is no clear winner."""
+        candidates = self.resolve(name, limit)
+        if not candidates or candidates[0].score < MIN_RESOLVED_SCORE:
+            return None, candidates
+        if len(candidates) > 1 and candidates[0].score - candidates[1].score < AMBIGUITY_MARGIN:
+            return None, candidates
+        return candidates[0].member_id, candidates
+
+    def _prefix_matches(self, query: str, limit: int) -> list:
+        """
+        Return [(score, index, key)] for the best members under keys that extend query, best first.
+
+        Every key in the prefix's range is scored, so a common prefix such as "jo"
+        still finds the best-weighted member however many keys sort before it.
+        Keys are visited best first and only until no remaining key can place a
+        member in the top PREFIX_TOP_K, which are cached per prefix.
+        """
+        top_k = max(limit, PREFIX_TOP_K)
+        cached = self._prefix_top.get(query) if limit <= PREFIX_TOP_K else None
+        if cached is not None:
+            return cached[:limit]
+        # Imported on first use, like the fuzzy stage.
+        import numpy as np
+
+        keys, weights, lengths = self._prefix_index()
+        first = bisect_left(keys, query)
+        last = bisect_left(keys, query + "\U0010ffff", first)
+        # A key's score bounds the score of every member under it.
+        scores = weights[first:last] * (0.6 + 0.2 * len(query) / lengths[first:last])
+        shortlist = min(len(scores), 8 * top_k)
+        order = np.argpartition(-scores, shortlist - 1)[:shortlist] if shortlist < len(scores) else np.arange(shortlist)
+        best = {}
+        while True:
+            for position in order[np.argsort(-scores[order], kind="stable")].tolist():
+                key_score = scores[position]
+                if len(best) >= top_k and heapq.nlargest(top_k, (score for score, _ in best.values()))[-1] > key_score:
+                    break
+                key = keys[first + position]
+                if key == query:
+                    continue
+                scale = 0.6 + 0.2 * len(query) / len(key)
+                for index, weight in self._exact[key][:top_k]:
+                    if weight * scale > best.get(index, (0.0, None))[0]:
+                        best[index] = (weight * scale, key)
+            else:
+                if len(order) < len(scores):
+                    # The shortlist ran out before the top was settled; score the whole range.
+                    order = np.arange(len(scores))
+                    continue
+            break
+        top = heapq.nsmallest(top_k, best.items(), key=lambda item: (-item[1][0], self._members[item[0]].name))
+        matches = [(score, index, key) for index, (score, key) in top]
+        if limit <= PREFIX_TOP_K:
+            if len(self._prefix_top) >= MAX_CACHED_PREFIXES:
+                self._prefix_top = {}
+            self._prefix_top[query] = matches
+        return matches[:limit]
+
+    def _prefix_index(self):
+        """Return the sorted keys with arrays of each key's highest entry weight and its length."""
+        if self._sorted_keys is None:
+            import numpy as np
+
+            names = self._key_names
+            order = sorted(range(len(names)), key=names.__getitem__)
+            keys = [names[key_id] for key_id in order]
+            # resolve ranks entries first, so each key's first entry has its highest weight.
+            weights = np.fromiter((entries[0][1] for entries in self._key_entries),
+                                  dtype=np.float64, count=len(names))[order]
+            lengths = np.fromiter(map(len, keys), dtype=np.float64, count=len(keys))
+            self._sorted_keys = (keys, weights, lengths)
+        return self._sorted_keys
+
+    def _rank_entries(self) -> None:
+        if not self._entries_ranked:
+            for entries in self._key_entries:
+                entries.sort(key=lambda entry: (-entry[1], self._members[entry[0]].name))
+            self._entries_ranked = True
+
+    def _fuzzy_keys(self, query: str, limit: int) -> list:
+        """Return [(key_id, similarity)] for the most similar keys, best first."""
+        # Imported on first use: numpy is only needed once a name fails exact and prefix lookup.
+        import numpy as np
+
+        grams = _bigrams(query)
+        postings = [np.frombuffer(self._postings[gram], dtype=np.uint32)
+                    for gram in grams if gram in self._postings]
+        if not postings:
+            return []
+        shared = np.bincount(np.concatenate(postings), minlength=len(self._key_names))
+        similarity = 2 * shared / (len(grams) + np.frombuffer(self._gram_counts, dtype=np.uint16))
+        matches = np.flatnonzero(similarity >= MIN_FUZZY_SIMILARITY)
+        best = matches[np.argsort(-similarity[matches], kind="stable")[:limit]]
+        return [(int(key_id), float(similarity[key_id])) for key_id in best]
+
+    @staticmethod
+    def _member_keys(member: Member):
+        """Yield (key, weight, fuzzy) for each key of a member; identifiers are not fuzzy-matched."""
+        yield normalize_name(member.member_id), EXACT_WEIGHT, False
+        if member.email:
+            email = normalize_name(member.email)
+            yield email, EXACT_WEIGHT, False
+            yield email.partition("@")[0], ALIAS_WEIGHT, True
+        full_name = normalize_name(member.name or "")
+        yield full_name, EXACT_WEIGHT, True
+        tokens = full_name.split()
+        if len(tokens) > 1:
+            yield tokens[0], FIRST_NAME_WEIGHT, True
+            for token in tokens[1:]:
+                yield token, NAME_TOKEN_WEIGHT, True
+        for alias in member.aliases:
+            yield normalize_name(alias), ALIAS_WEIGHT, True
+
+
+def _split_aliases(value) -> tuple:
+    if isinstance(value, (list, tuple)):
+        return tuple(alias for alias in value if alias)
+    return tuple(alias.strip() for alias in (value or "").replace("|", ";").split(";") if alias.strip())
+
+
+def member_from_record(record: dict) -> Member:
+    """Build a Member from an export row with member_id/id, name/display_name, email and aliases."""
+    member_id = record.get("member_id") or record.get("id") or record.get("email")
+    if not member_id:
+        raise ValueError(f"Directory record has no member id: {record}")
+    return Member(
+        member_id=str(member_id),
+        name=record.get("name") or record.get("display_name") or "",
+        email=record.get("email") or None,
+        aliases=_split_aliases(record.get("aliases")),
+    )
+
+
+def load_directory(path: str) -> TeamDirectory:
+    """
+    Load a directory export: a .json list of member objects (or {"members": [...]}),
+    or a CSV file with a header row. Aliases are a list in JSON and ;-separated in CSV.
+    """
+    if os.path.splitext(path)[1].lower() == ".json":
+        with open(path, encoding="utf-8") as export:
+            records = json.load(export)
+        if isinstance(records, dict):
+            records = records.get("members", [])
+        return TeamDirectory(member_from_record(record) for record in records)
+
+    with open(path, newline="", encoding="utf-8-sig") as export:
+        return TeamDirectory(member_from_record(record) for record in csv.DictReader(export))
+
+
+def load_default_directory():
+    """
+    Load the export named by the TEAM_DIRECTORY_PATH app setting.
+
+    With SQLite persistence configured (SQLITE_PATH), a loaded export is also saved
+    there, and the saved members are used when no export is named. Returns None
+    when there is neither.
+    """
+    # Imported here: persistence itself builds TeamDirectory instances.
+    from persistence import load_default_persistence
+
+    path = os.environ.get("TEAM_DIRECTORY_PATH")
+    persistence = load_default_persistence()
+    if path:
+        directory = load_directory(path)
+        if persistence is not None:
+            persistence.save_directory(directory)
+        return directory
+    return persistence.load_directory() if persistence is not None else None
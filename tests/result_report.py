@@ -0,0 +1,258 @@
+"""Streaming result reports for the test suites and benchmarks.
+
+ReportWriter appends rows to an .xlsx, .csv or .parquet file as they arrive instead
+of building the whole table first, so memory stays flat however many rows are
+written. Excel output uses openpyxl's write-only mode with named styles registered
+once per workbook; column widths come from the first WIDTH_SAMPLE_ROWS rows.
+Parquet output needs pyarrow.
+"""
+
+import csv
+import os
+import warnings
+from typing import Dict, List, Sequence
+
+from tabulate import tabulate
+
+REPORT_DIR = os.path.join(os.path.dirname(__file__), 'test-reports')
+
+# Rows buffered to size Excel columns before streaming starts.
+WIDTH_SAMPLE_ROWS = 200
+MAX_COLUMN_WIDTH = 50
+LINE_HEIGHT_POINTS = 15
+# Excel refuses to open cells longer than this.
+EXCEL_CELL_LIMIT = 32767
+PARQUET_ROW_GROUP_SIZE = 10000
+# Rows kept for the console table; the report file has all of them.
+PRINT_ROWS = 100
+
+
+class _ExcelSink:
+    """Write-only workbook with one styled table."""
+
+    def __init__(self, path: str, columns: Sequence[str], sheet_name: str, table_name: str):
+        # Imported here so that loading a test module does not pay for openpyxl
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+        from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+
+        self.path = path
+        self.columns = list(columns)
+        self.table_name = table_name
+        self.cell_class = WriteOnlyCell
+        self.illegal_characters = ILLEGAL_CHARACTERS_RE
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(sheet_name)
+
+        thin = Side(style='thin')
+        self.workbook.add_named_style(NamedStyle(
+            "report_header",
+            fill=PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+            font=Font(bold=True, color="FFFFFF"),
+            alignment=Alignment(horizontal="center", vertical="center", wrap_text=True),
+        ))
+        self.workbook.add_named_style(NamedStyle(
+            "report_cell",
+            alignment=Alignment(wrap_text=True, vertical="top"),
+            border=Border(left=thin, right=thin, top=thin, bottom=thin),
+        ))
+        self.pending = []
+        self.rows_written = 0
+
+    def write(self, values: List[str]) -> None:
+        values = [self._clean(value) for value in values]
+        if self.pending is not None:
+            self.pending.append(values)
+            if len(self.pending) >= WIDTH_SAMPLE_ROWS:
+                self._start()
+            return
+        self._append(values)
+
+    def close(self) -> None:
+        from openpyxl.utils import get_column_letter
+        from openpyxl.worksheet.table import Table, TableColumn, TableStyleInfo
+
+        if self.pending is not None:
+            self._start()
+        if self.rows_written:
+            table = Table(
+                displayName=self.table_name,
+                ref=f"A1:{get_column_letter(len(self.columns))}{self.rows_written + 1}",
+                # Write-only sheets cannot read the header back, so columns are named here.
+                tableColumns=[TableColumn(id=index, name=name) for index, name in enumerate(self.columns, 1)],
+            )
+            table.tableStyleInfo = TableStyleInfo(
+                name="TableStyleMedium9",  # This style has a dark header
+                showFirstColumn=False,
+                showLastColumn=False,
+                showRowStripes=True,
+                showColumnStripes=False
+            )
+            with warnings.catch_warnings():
+                # openpyxl warns on every write-only table; the columns are set above.
+                warnings.simplefilter("ignore", UserWarning)
+                self.sheet.add_table(table)
+        self.workbook.save(self.path)
+
+    def _start(self) -> None:
+        """Size the columns from the buffered rows, then write the header and the buffer."""
+        from openpyxl.utils import get_column_letter
+
+        for index, name in enumerate(self.columns):
+            width = max([len(name)] + [len(row[index]) for row in self.pending])
+            self.sheet.column_dimensions[get_column_letter(index + 1)].width = min(width + 2, MAX_COLUMN_WIDTH)
+        self.sheet.append([self._cell(name, "report_header") for name in self.columns])
+        pending, self.pending = self.pending, None
+        for values in pending:
+            self._append(values)
+
+    def _append(self, values: List[str]) -> None:
+        self.rows_written += 1
+        row_index = self.rows_written + 1
+        lines = max(value.count('\n') for value in values) + 1
+        if lines > 1:
+            self.sheet.row_dimensions[row_index].height = lines * LINE_HEIGHT_POINTS
+        self.sheet.append([self._cell(value, "report_cell") for value in values])
+        if lines > 1:
+            # The row is already on disk; drop its dimension so memory does not grow.
+            del self.sheet.row_dimensions[row_index]
+
+    def _cell(self, value: str, style: str):
+        cell = self.cell_class(self.sheet, value=value)
+        cell.style = style
+        return cell
+
+    def _clean(self, value) -> str:
+        return self.illegal_characters.sub("", str(value))[:EXCEL_CELL_LIMIT]
+
+
+class _CsvSink:
+    def __init__(self, path: str, columns: Sequence[str], **_):
+        self.file = open(path, "w", encoding="utf-8", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+
+    def write(self, values: List[str]) -> None:
+        self.writer.writerow(values)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class _ParquetSink:
+    """String columns written PARQUET_ROW_GROUP_SIZE rows per row group."""
+
+    def __init__(self, path: str, columns: Sequence[str], **_):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as error:
+            raise ImportError("Parquet reports need pyarrow (pip install pyarrow)") from error
+        self.pa = pa
+        self.columns = list(columns)
+        self.schema = pa.schema([(name, pa.string()) for name in self.columns])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.pending = []
+
+    def write(self, values: List[str]) -> None:
+        self.pending.append(values)
+        if len(self.pending) >= PARQUET_ROW_GROUP_SIZE:
+            self._flush()
+
+    def close(self) -> None:
+        self._flush()
+        self.writer.close()
+
+    def _flush(self) -> None:
+        if not self.pending:
+            return
+        arrays = [self.pa.array([str(row[index]) for row in self.pending], type=self.pa.string())
+                  for index in range(len(self.columns))]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+        self.pending = []
+
+
+_SINKS = {"xlsx": _ExcelSink, "csv": _CsvSink, "parquet": _ParquetSink}
+
+
+class ReportWriter:
+    """
+    Stream rows to a report file whose format follows its extension (.xlsx, .csv or .parquet).
+
+    Rows are dicts keyed by column name or sequences in column order. The file is
+    complete once close() has run.
+    """
+
+    def __init__(self, path: str, columns: Sequence[str], sheet_name: str = "Test Results",
+                 table_name: str = "TestResults"):
+        extension = os.path.splitext(path)[1].lstrip(".").lower()
+        if extension not in _SINKS:
+            raise ValueError(f"Unsupported report format: {extension or path}")
+        self.path = path
+        self.columns = list(columns)
+        self.rows = 0
+        self._sink = _SINKS[extension](path, self.columns, sheet_name=sheet_name, table_name=table_name)
+
+    def write(self, row) -> None:
+        values = [row.get(name, "") for name in self.columns] if isinstance(row, dict) else list(row)
+        self._sink.write(["" if value is None else value for value in values])
+        self.rows += 1
+
+    def close(self) -> None:
+        self._sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def report_formats() -> List[str]:
+    """Report formats named by TEST_REPORT_FORMATS (comma-separated, default xlsx)."""
+    formats = [name.strip().lower() for name in os.environ.get("TEST_REPORT_FORMATS", "xlsx").split(",")]
+    return [name for name in formats if name]
+
+
+class ResultRecorder:
+    """
+    Records request/response pairs for a test class, streaming them into report files.
+
+    Only the first PRINT_ROWS results are kept for the console table.
+    """
+
+    columns = ("Request Input", "Response Output")
+
+    def __init__(self, filename: str = "test_results", formats: Sequence[str] = None,
+                 output_dir: str = REPORT_DIR):
+        self.paths = [os.path.join(output_dir, f"{filename}.{name}") for name in (formats or report_formats())]
+        self.output_dir = output_dir
+        self.writers = None
+        self.count = 0
+        self.results: List[Dict] = []
+
+    def record_result(self, request_input: str, response_output: str):
+        if self.writers is None:
+            # Ensure the output directory exists
+            os.makedirs(self.output_dir, exist_ok=True)
+            self.writers = [ReportWriter(path, self.columns) for path in self.paths]
+        row = {"Request Input": request_input, "Response Output": response_output}
+        for writer in self.writers:
+            writer.write(row)
+        self.count += 1
+        if len(self.results) < PRINT_ROWS:
+            self.results.append(row)
+
+    def print_results_table(self):
+        print("\nTest Results:")
+        print(tabulate(self.results, headers="keys", tablefmt="pipe"))
+        if self.count > len(self.results):
+            print(f"... {self.count - len(self.results)} more results in the report files")
+
+    def save(self):
+        """Finish the report files and print where they are."""
+        for writer in self.writers or ():
+            writer.close()
+            print(f"\nTest results saved to: {writer.path}")
+        self.writers = None
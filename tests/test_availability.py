@@ -0,0 +1,231 @@
+import unittest
+import asyncio
+import json
+import sys
+import os
+from datetime import date, datetime, timedelta
+
+import azure.functions as func
+import numpy as np
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from availability import BLOCK_ROWS, AvailabilityStore, BusyChange
+from availability_operations import find_common_availability
+
+DAY = date(2026, 10, 19)
+
+
+def at(hour, minute=0, day=DAY):
+    return datetime(day.year, day.month, day.day, hour, minute)
+
+
+class TestAvailabilityStore(unittest.TestCase):
+    def setUp(self):
+        self.store = AvailabilityStore(slot_minutes=15)
+        self.store.mark_busy("alice", at(9), at(10))
+        self.store.mark_busy("bob", at(9, 30), at(11))
+        self.store.add_member("carol")
+
+    def test_busy_slots_round_to_whole_slots(self):
+        """Test that partial slots are marked busy"""
+        self.store.mark_busy("carol", at(13, 5), at(13, 20))
+        busy = self.store.busy_slots("carol", DAY)
+        self.assertEqual(list(busy.nonzero()[0]), [52, 53])
+
+    def test_common_free_windows(self):
+        """Test the OR of busy bitmaps across members"""
+        windows = self.store.common_free_windows(["alice", "bob", "carol"], DAY, DAY)
+        self.assertEqual(windows, [(at(0), at(9)), (at(11), datetime(2026, 10, 20))])
+
+    def test_min_duration_and_multi_day(self):
+        """Test that short windows are dropped and untouched days are fully free"""
+        self.store.mark_busy("alice", at(12), at(23, 30))
+        windows = self.store.common_free_windows(["alice", "bob"], DAY, date(2026, 10, 20), 60)
+        self.assertEqual(windows, [
+            (at(0), at(9)),
+            (at(11), at(12)),
+            (datetime(2026, 10, 20), datetime(2026, 10, 21)),
+        ])
+
+    def test_interval_across_midnight(self):
+        """Test that a busy interval is split at midnight"""
+        self.store.mark_busy("carol", at(23), datetime(2026, 10, 20, 1))
+        self.assertEqual(self.store.busy_slots("carol", DAY).sum(), 4)
+        self.assertEqual(self.store.busy_slots("carol", date(2026, 10, 20)).sum(), 4)
+
+    def test_many_members_grow_capacity(self):
+        """Test that adding members beyond the initial capacity keeps existing bitmaps"""
+        for index in range(250):
+            self.store.mark_busy(f"member{index}", at(index % 24), at(index % 24, 15))
+        self.assertEqual(self.store.busy_slots("alice", DAY).sum(), 4)
+        self.assertEqual(list(self.store.busy_slots("member249", DAY).nonzero()[0]), [36])
+        windows = self.store.common_free_windows(self.store.members, DAY, DAY)
+        self.assertEqual(windows[0], (at(0, 15), at(1)))
+        self.assertEqual(len(windows), 22)
+
+    def test_unknown_member(self):
+        with self.assertRaises(KeyError):
+            self.store.common_free_slots(["nobody"], DAY, DAY)
+
+
+class TestVersionedUpdates(unittest.TestCase):
+    def setUp(self):
+        self.store = AvailabilityStore(slot_minutes=15)
+        self.store.mark_busy("alice", at(9), at(10))
+        self.store.mark_busy("bob", at(9), at(10))
+        self.store.mark_busy("bob", at(9, day=date(2026, 10, 20)), at(10, day=date(2026, 10, 20)))
+
+    def test_apply_changes_leaves_the_old_version_unchanged(self):
+        """Test that a new version sees the changes and readers of the old one do not"""
+        updated = self.store.apply_changes([
+            BusyChange("alice", at(9), at(10), False),
+            BusyChange("alice", at(14), at(15), True),
+            BusyChange("carol", at(8), at(9), True),
+        ])
+        self.assertGreater(updated.version, self.store.version)
+        self.assertEqual(list(updated.busy_slots("alice", DAY).nonzero()[0]), [56, 57, 58, 59])
+        self.assertEqual(list(self.store.busy_slots("alice", DAY).nonzero()[0]), [36, 37, 38, 39])
+        self.assertIn("carol", updated)
+        self.assertNotIn("carol", self.store)
+
+    def test_only_changed_days_are_copied(self):
+        """Test that untouched day matrices are shared between versions"""
+        next_day = date(2026, 10, 20)
+        updated = self.store.apply_changes([BusyChange("alice", at(12), at(13), True)])
+        self.assertIs(updated.day_bitmaps(next_day).base, self.store.day_bitmaps(next_day).base)
+        self.assertFalse(np.shares_memory(updated.day_bitmaps(DAY), self.store.day_bitmaps(DAY)))
+        # Writing to the old version after the fork must not leak into the new one either.
+        self.store.mark_busy("bob", at(20, day=next_day), at(21, day=next_day))
+        self.assertEqual(updated.busy_slots("bob", next_day).sum(), 4)
+
+    def test_only_changed_member_blocks_are_copied(self):
+        """Test that a change copies the block of rows it touches, not the day's whole matrix"""
+        for index in range(3 * BLOCK_ROWS):
+            self.store.mark_busy(f"member{index}", at(11), at(12))
+        updated = self.store.apply_changes([BusyChange("member0", at(14), at(15), True)])
+        self.assertFalse(np.shares_memory(updated.member_bitmap("member0", DAY),
+                                          self.store.member_bitmap("member0", DAY)))
+        self.assertTrue(np.shares_memory(updated.member_bitmap(f"member{2 * BLOCK_ROWS}", DAY),
+                                         self.store.member_bitmap(f"member{2 * BLOCK_ROWS}", DAY)))
+        self.assertEqual(updated.busy_slots("member0", DAY).sum(), 8)
+        self.assertEqual(self.store.busy_slots("member0", DAY).sum(), 4)
+        self.assertEqual(updated.day_bitmaps(DAY).shape, (3 * BLOCK_ROWS + 2, updated.bytes_per_day))
+        free = updated.common_free_windows(["member0", f"member{BLOCK_ROWS}", "bob"], DAY, DAY)
+        self.assertEqual(free, [(at(0), at(9)), (at(10), at(11)), (at(12), at(14)), (at(15), datetime(2026, 10, 20))])
+
+    def test_frees_apply_before_busy_intervals(self):
+        """Test that a moved meeting stays busy when its old and new times overlap"""
+        updated = self.store.apply_changes([
+            BusyChange("bob", at(9, 30), at(10, 30), True),
+            BusyChange("bob", at(9), at(10), False),
+        ])
+        self.assertEqual(list(updated.busy_slots("bob", DAY).nonzero()[0]), [38, 39, 40, 41])
+
+
+class TestRollups(unittest.TestCase):
+    def setUp(self):
+        self.store = AvailabilityStore(slot_minutes=15)
+        self.store.mark_busy("alice", at(9), at(17))
+        self.store.mark_busy("bob", at(0), at(8))
+        self.store.mark_busy("bob", at(10), at(11))
+
+    def test_day_and_week_rollups(self):
+        """Test free slot counts and longest free runs per day and week"""
+        free_slots, longest_run = self.store.day_rollup(["alice", "bob"], DAY)
+        self.assertEqual(list(free_slots), [64, 60])
+        self.assertEqual(list(longest_run), [36, 52])
+        free_slots, longest_run = self.store.week_rollup(["alice"], date(2026, 10, 25))
+        self.assertEqual(free_slots[0], 6 * 96 + 64)
+        self.assertEqual(longest_run[0], 96)
+
+    def test_rollups_follow_changes(self):
+        """Test that rollups of changed days are recomputed in new versions only"""
+        self.store.week_rollup(["alice"], DAY)
+        updated = self.store.apply_changes([BusyChange("alice", at(0, day=date(2026, 10, 21)), at(23, day=date(2026, 10, 21)), True)])
+        self.assertEqual(updated.day_rollup(["alice"], date(2026, 10, 21))[1][0], 4)
+        self.assertEqual(self.store.day_rollup(["alice"], date(2026, 10, 21))[1][0], 96)
+        self.assertEqual(updated.week_rollup(["alice"], DAY)[0][0], 5 * 96 + 64 + 4)
+
+    def test_members_with_free_block(self):
+        """Test the 'does anyone have a block' query over whole and partial weeks"""
+        self.assertEqual(self.store.members_with_free_block(["alice", "bob"], DAY, DAY, 600), ["bob"])
+        self.assertEqual(self.store.members_with_free_block(["alice", "bob"], DAY, date(2026, 11, 1), 600),
+                         ["alice", "bob"])
+
+    def test_skipped_days_match_a_full_scan(self):
+        """Test that rollup-pruned window searches return the same windows as scanning every day"""
+        rng = np.random.default_rng(7)
+        store = AvailabilityStore(slot_minutes=15)
+        members = [f"member{index}" for index in range(12)]
+        for member in members:
+            for _ in range(120):
+                start = at(0, day=DAY) + timedelta(minutes=15 * int(rng.integers(0, 96 * 21)))
+                store.mark_busy(member, start, start + timedelta(minutes=15 * int(rng.integers(1, 12))))
+        store = store.apply_changes([BusyChange("member0", at(8, day=DAY + timedelta(days=3)), at(12, day=DAY + timedelta(days=3)), False)])
+        end_date = DAY + timedelta(days=20)
+        for duration in (30, 90, 180, 360):
+            with self.subTest(duration=duration):
+                free = store.common_free_slots(members[:4], DAY, end_date)
+                expected = 0
+                for row in free:
+                    runs = np.diff(np.flatnonzero(np.diff(np.concatenate(([0], row.astype(int), [0])))))[::2]
+                    expected += int((runs >= duration // 15).sum())
+                windows = store.common_free_windows(members[:4], DAY, end_date, duration)
+                self.assertEqual(len(windows), expected)
+
+
+class TestFindCommonAvailability(unittest.TestCase):
+    def setUp(self):
+        self.store = AvailabilityStore()
+        self.store.mark_busy("alice", at(9), at(17))
+
+    def _execute(self, request_data):
+        body = request_data if isinstance(request_data, bytes) else json.dumps(request_data).encode('utf-8')
+        req = func.HttpRequest(method="POST", url="/api/process_availability_query", body=body)
+        response = asyncio.run(find_common_availability(req, store=self.store))
+        return response, json.loads(response.get_body())
+
+    def test_valid_request(self):
+        response, response_body = self._execute({
+            "members": ["alice"], "start_date": "2026-10-19", "min_duration_minutes": 60
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response_body["windows"], [
+            {"start": "2026-10-19T00:00:00", "end": "2026-10-19T09:00:00", "duration_minutes": 540},
+            {"start": "2026-10-19T17:00:00", "end": "2026-10-20T00:00:00", "duration_minutes": 420},
+        ])
+
+    def test_etag_follows_the_store_version(self):
+        """Test that a repeated request is not modified until the availability changes"""
+        body = json.dumps({"members": ["alice"], "start_date": "2026-10-19"}).encode('utf-8')
+        response = asyncio.run(find_common_availability(
+            func.HttpRequest(method="POST", url="/api/process_availability_query", body=body), store=self.store))
+        etag = response.headers["ETag"]
+
+        req = func.HttpRequest(method="POST", url="/api/process_availability_query", body=body,
+                               headers={"If-None-Match": etag})
+        self.assertEqual(asyncio.run(find_common_availability(req, store=self.store)).status_code, 304)
+        updated = self.store.apply_changes([BusyChange("alice", at(18), at(19), True)])
+        response = asyncio.run(find_common_availability(req, store=updated))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_invalid_requests(self):
+        test_cases = [
+            (b'not json', 400),
+            ({"members": [], "start_date": "2026-10-19"}, 400),
+            ({"members": ["alice"], "start_date": "19/10/2026"}, 400),
+            ({"members": ["alice"], "start_date": "2026-10-19", "end_date": "2026-10-18"}, 400),
+            ({"members": ["alice"], "start_date": "2026-01-01", "end_date": "2026-12-31"}, 400),
+            ({"members": ["alice", "nobody"], "start_date": "2026-10-19"}, 404),
+        ]
+        for request_data, expected_status in test_cases:
+            with self.subTest(request_data=request_data):
+                response, response_body = self._execute(request_data)
+                self.assertEqual(response.status_code, expected_status)
+                self.assertEqual(response_body["status"], "error")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import asyncio
+import json
+import sys
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+
+import azure.functions as func
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from availability import BLOCK_ROWS, AvailabilityStore
+from availability_operations import find_common_availability
+from availability_snapshot import write_snapshot, load_snapshot, HEADER, SNAPSHOT_MAGIC
+
+FIRST_DAY = date(2026, 10, 19)
+
+
+class TestAvailabilitySnapshot(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "team.tavsnap")
+        self.store = AvailabilityStore(slot_minutes=5)
+        for index in range(30):
+            day = datetime.combine(FIRST_DAY + timedelta(days=index % 5), datetime.min.time())
+            self.store.mark_busy(f"member{index}", day + timedelta(hours=8 + index % 9),
+                                 day + timedelta(hours=9 + index % 9, minutes=25))
+        self.store.add_member("Zoë")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _query(self, store, members):
+        body = json.dumps({"members": members, "start_date": "2026-10-18",
+                           "end_date": "2026-10-25", "min_duration_minutes": 30}).encode('utf-8')
+        req = func.HttpRequest(method="POST", url="/api/process_availability_query", body=body)
+        return asyncio.run(find_common_availability(req, store=store)).get_body()
+
+    def test_round_trip_gives_byte_identical_query_results(self):
+        write_snapshot(self.store, self.path)
+        snapshot = load_snapshot(self.path)
+
+        self.assertEqual(snapshot.members, self.store.members)
+        self.assertEqual(snapshot.slot_minutes, 5)
+        for members in (self.store.members, ["member3", "member7"], ["Zoë"]):
+            with self.subTest(members=members):
+                self.assertEqual(self._query(snapshot, members), self._query(self.store, members))
+
+    def test_days_are_zero_copy_views_until_written(self):
+        write_snapshot(self.store, self.path, FIRST_DAY - timedelta(days=1), FIRST_DAY + timedelta(days=6))
+        snapshot = load_snapshot(self.path)
+        self.assertFalse(snapshot.day_bitmaps(FIRST_DAY).flags.writeable)
+
+        snapshot.mark_busy("member0", datetime(2026, 10, 19, 20), datetime(2026, 10, 19, 21))
+        self.assertTrue(snapshot.day_bitmaps(FIRST_DAY).flags.writeable)
+        self.assertEqual(snapshot.busy_slots("member0", FIRST_DAY).sum(), 17 + 12)
+        self.assertEqual(load_snapshot(self.path).busy_slots("member0", FIRST_DAY).sum(), 17)
+
+        snapshot.add_member("newcomer")
+        self.assertEqual(snapshot.busy_slots("member1", FIRST_DAY + timedelta(days=1)).sum(), 17)
+
+    def test_members_beyond_the_snapshot_blocks(self):
+        """Test members spanning several blocks, including ones added after the last, shorter block"""
+        for index in range(30, BLOCK_ROWS + 10):
+            self.store.mark_busy(f"member{index}", datetime(2026, 10, 19, 6), datetime(2026, 10, 19, 7))
+        write_snapshot(self.store, self.path)
+        snapshot = load_snapshot(self.path)
+        last = f"member{BLOCK_ROWS + 9}"
+        self.assertEqual(snapshot.busy_slots(last, FIRST_DAY).sum(), 12)
+
+        snapshot.mark_busy("newcomer", datetime(2026, 10, 19, 20), datetime(2026, 10, 19, 21))
+        self.assertEqual(snapshot.busy_slots("newcomer", FIRST_DAY).sum(), 12)
+        self.assertEqual(snapshot.busy_slots(last, FIRST_DAY).sum(), 12)
+        self.assertEqual(snapshot.busy_matrix([last, "newcomer", "Zoë"], FIRST_DAY).sum(axis=1).tolist(), [12, 12, 0])
+        self.assertEqual(self._query(snapshot, [last, "member0"]), self._query(self.store, [last, "member0"]))
+
+    def test_rejects_other_files_and_versions(self):
+        write_snapshot(self.store, self.path)
+        with open(self.path, "r+b") as snapshot_file:
+            header = bytearray(snapshot_file.read(HEADER.size))
+            header[8:10] = (99).to_bytes(2, "little")
+            snapshot_file.seek(0)
+            snapshot_file.write(header)
+        with self.assertRaisesRegex(ValueError, "version 99"):
+            load_snapshot(self.path)
+
+        with open(self.path, "wb") as snapshot_file:
+            snapshot_file.write(b"x" * HEADER.size)
+        with self.assertRaisesRegex(ValueError, "not an availability snapshot"):
+            load_snapshot(self.path)
+
+        with open(self.path, "wb") as snapshot_file:
+            snapshot_file.write(HEADER.pack(SNAPSHOT_MAGIC, 1, 15, 12, 0, 10, 10, FIRST_DAY.toordinal(), 0,
+                                            HEADER.size, 64))
+        with self.assertRaisesRegex(ValueError, "truncated"):
+            load_snapshot(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import json
+import sys
+import os
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from parsing_operations import parse_schedule_query_batch, NDJSON_MIMETYPE
+
+
+class MockHttpRequest:
+    def __init__(self, body=None):
+        self._body = body if body is not None else b''
+
+    def get_body(self):
+        return self._body
+
+
+class TestParseScheduleQueryBatch(unittest.TestCase):
+    def _execute_batch(self, request_body):
+        """Send a batch body and return the response with its decoded result lines"""
+        if isinstance(request_body, str):
+            request_body = request_body.encode('utf-8')
+        response = parse_schedule_query_batch(MockHttpRequest(request_body))
+        lines = response.get_body().decode('utf-8').splitlines()
+        return response, [json.loads(line) for line in lines]
+
+    def test_raw_text_lines(self):
+        """Each raw text line produces its own success record, in order"""
+        response, results = self._execute_batch(
+            "Schedule a meeting with John tomorrow at 2pm\nBook a room for project review on Friday\n"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, NDJSON_MIMETYPE)
+        self.assertEqual([r["line"] for r in results], [1, 2])
+        self.assertEqual(results[0]["status"], "success")
+        self.assertEqual(results[0]["UserQuery"], "Schedule a meeting with John tomorrow at 2pm")
+        self.assertEqual(results[1]["UserQuery"], "Book a room for project review on Friday")
+
+    def test_ndjson_objects_and_crlf(self):
+        """NDJSON object lines and CRLF line endings are accepted"""
+        body = '{"UserQuery": "Team lunch @ Caf\\u00e9 Noir"}\r\nStatus: \\"In Progress\\"\r\n'
+        _, results = self._execute_batch(body)
+        self.assertEqual(results[0]["UserQuery"], "Team lunch @ Café Noir")
+        self.assertEqual(results[1]["UserQuery"], 'Status: \\"In Progress\\"')
+
+    def test_bad_lines_do_not_fail_batch(self):
+        """Invalid lines produce per-line error records only"""
+        body = b'first\n\xff\xfe\xfd\n{"UserQuery": 42}\n{not json\nlast\n'
+        response, results = self._execute_batch(body)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r["status"] for r in results],
+                         ["success", "error", "error", "error", "success"])
+        self.assertEqual([r["line"] for r in results], [1, 2, 3, 4, 5])
+        for result in results[1:4]:
+            self.assertTrue(result["message"].startswith("Error processing line"))
+
+    def test_blank_lines_are_skipped(self):
+        """Blank lines are ignored but line numbers still refer to the original body"""
+        _, results = self._execute_batch("\nfirst\n   \nsecond")
+        self.assertEqual([(r["line"], r["UserQuery"]) for r in results],
+                         [(2, "first"), (4, "second")])
+
+    def test_empty_request_body(self):
+        """An empty batch is rejected as a whole"""
+        for body in (b'', None, b'\n\n'):
+            with self.subTest(body=body):
+                response = parse_schedule_query_batch(MockHttpRequest(body))
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(json.loads(response.get_body())["message"], "Empty request body")
+
+
+if __name__ == '__main__':
+    unittest.main()
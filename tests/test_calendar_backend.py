@@ -0,0 +1,237 @@
+import unittest
+import asyncio
+import http.client
+import json
+import sys
+import os
+import threading
+import time
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+import azure.functions as func
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from availability import AvailabilityStore
+from availability_operations import find_common_availability
+import availability_operations
+from calendar_backend import CalendarBackend, CalendarClient, FakeCalendarBackend, HttpCalendarBackend
+
+DAY = date(2026, 10, 19)
+
+
+def at(hour, minute=0):
+    return datetime(DAY.year, DAY.month, DAY.day, hour, minute)
+
+
+class SlowMemberBackend(FakeCalendarBackend):
+    """Fake backend that stalls for one member to exercise per-call timeouts."""
+
+    async def fetch_busy(self, member_id, start, end):
+        if member_id == "slow":
+            await asyncio.sleep(10)
+        return await super().fetch_busy(member_id, start, end)
+
+
+class BusyHandler(BaseHTTPRequestHandler):
+    """Keep-alive calendar service: every member but "nobody" is busy 9-10 UTC; records client ports."""
+    protocol_version = "HTTP/1.1"
+    ports = set()
+    malformed = {
+        "no-busy": b'{"items": []}',
+        "no-end": b'{"busy": [{"start": "2026-10-19T09:00:00"}]}',
+        "bad-time": b'{"busy": [{"start": "9am", "end": "10am"}]}',
+        "not-json": b"<html></html>",
+    }
+
+    def do_GET(self):
+        self.ports.add(self.client_address[1])
+        query = parse_qs(urlsplit(self.path).query)
+        if query["member_id"][0] == "nobody":
+            body, status = b"{}", 404
+        elif query["member_id"][0] in self.malformed:
+            body, status = self.malformed[query["member_id"][0]], 200
+        else:
+            body, status = json.dumps({"busy": [{"start": "2026-10-19T11:00:00+02:00",
+                                                 "end": "2026-10-19T10:00:00Z"}]}).encode(), 200
+        time.sleep(0.01)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestCalendarClient(unittest.TestCase):
+    def setUp(self):
+        self.busy = {f"member{index}": [(at(9), at(10))] for index in range(40)}
+
+    def test_fetches_concurrently_with_bounded_concurrency(self):
+        """Test that 40 calls of 50ms each overlap but never exceed the bound"""
+        backend = FakeCalendarBackend(self.busy, latency_seconds=0.05)
+        client = CalendarClient(backend, max_concurrency=10)
+
+        started = time.perf_counter()
+        busy_by_member, errors = asyncio.run(client.fetch_many(self.busy, at(0), at(23)))
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(busy_by_member), 40)
+        self.assertEqual(errors, {})
+        self.assertEqual(backend.peak_concurrency, 10)
+        self.assertLess(elapsed, 40 * 0.05 / 2)
+
+    def test_timeouts_and_unknown_members_are_per_member(self):
+        backend = SlowMemberBackend(dict(self.busy, slow=[]), latency_seconds=0)
+        client = CalendarClient(backend, timeout_seconds=0.05)
+        busy_by_member, errors = asyncio.run(
+            client.fetch_many(["member0", "slow", "nobody"], at(0), at(23))
+        )
+        self.assertEqual(busy_by_member, {"member0": [(at(9), at(10))]})
+        self.assertIsInstance(errors["slow"], asyncio.TimeoutError)
+        self.assertIsInstance(errors["nobody"], KeyError)
+
+    def test_load_into_store(self):
+        client = CalendarClient(FakeCalendarBackend(self.busy, latency_seconds=0))
+        store = AvailabilityStore()
+        asyncio.run(client.load_into(store, ["member0", "member1"], at(0), at(23)))
+        self.assertEqual(store.busy_slots("member1", DAY).sum(), 4)
+        asyncio.run(client.close())
+        self.assertTrue(client.backend.closed)
+
+    def test_backend_interface_is_abstract(self):
+        with self.assertRaises(TypeError):
+            CalendarBackend()
+
+        class NoFetch(CalendarBackend):
+            pass
+
+        with self.assertRaises(TypeError):
+            NoFetch()
+
+
+class TestHttpCalendarBackend(unittest.TestCase):
+    def setUp(self):
+        BusyHandler.ports = set()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), BusyHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/calendar"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_concurrent_fetches_share_pooled_connections(self):
+        """Test that 40 fetches through a client bounded at 4 open at most 4 connections"""
+        backend = HttpCalendarBackend(self.url, pool_size=4)
+        client = CalendarClient(backend, max_concurrency=4)
+
+        async def main():
+            members = [f"member{index}" for index in range(40)] + ["nobody"]
+            result = await client.fetch_many(members, at(0), at(23))
+            await client.close()
+            return result
+
+        busy_by_member, errors = asyncio.run(main())
+        self.assertEqual(len(busy_by_member), 40)
+        self.assertEqual(busy_by_member["member7"], [(at(9), at(10))])
+        self.assertIsInstance(errors["nobody"], KeyError)
+        self.assertLessEqual(backend.connections_opened, 4)
+        self.assertEqual(len(BusyHandler.ports), backend.connections_opened)
+
+    def test_malformed_payloads_are_failures_not_unknown_members(self):
+        """Test that bad data is a backend failure (503), while only HTTP 404 marks an unknown member"""
+        client = CalendarClient(HttpCalendarBackend(self.url, pool_size=2))
+        _, errors = asyncio.run(client.fetch_many(list(BusyHandler.malformed) + ["nobody"], at(0), at(23)))
+        for member_id in BusyHandler.malformed:
+            self.assertIsInstance(errors[member_id], http.client.HTTPException)
+            self.assertNotIsInstance(errors[member_id], KeyError)
+        self.assertIsInstance(errors["nobody"], KeyError)
+
+        body = json.dumps({"members": ["no-busy"], "start_date": DAY.isoformat()}).encode()
+        req = func.HttpRequest(method="POST", url="/api/process_availability_query", body=body)
+        response = asyncio.run(find_common_availability(req, store=AvailabilityStore(), calendar=client))
+        self.assertEqual(response.status_code, 503)
+
+    def test_default_client_comes_from_app_settings(self):
+        with mock.patch.dict(os.environ, {"CALENDAR_BACKEND_URL": self.url, "CALENDAR_MAX_CONCURRENCY": "3"}), \
+                mock.patch.object(availability_operations, "calendar_client", None), \
+                mock.patch.object(availability_operations, "_calendar_loaded", False):
+            client = availability_operations.get_calendar_client()
+            self.assertIs(availability_operations.get_calendar_client(), client)
+        self.assertIsInstance(client.backend, HttpCalendarBackend)
+        self.assertEqual((client.max_concurrency, client.backend.pool_size), (3, 3))
+        with self.assertRaises(ValueError):
+            HttpCalendarBackend("ftp://calendar.example.com")
+
+    def test_invalid_settings_give_503_without_retrying(self):
+        """Test that bad calendar app settings fail each request with 503 but are only read once"""
+        body = json.dumps({"members": ["alice"], "start_date": DAY.isoformat()}).encode()
+        settings = {"CALENDAR_BACKEND_URL": self.url, "CALENDAR_MAX_CONCURRENCY": "many"}
+        loads = []
+
+        def load(real=availability_operations.load_default_calendar_client):
+            loads.append(1)
+            return real()
+
+        with mock.patch.dict(os.environ, settings), \
+                mock.patch.object(availability_operations, "calendar_client", None), \
+                mock.patch.object(availability_operations, "_calendar_loaded", False), \
+                mock.patch.object(availability_operations, "_calendar_error", None), \
+                mock.patch.object(availability_operations, "load_default_calendar_client", load):
+            for handler in (find_common_availability, availability_operations.suggest_meeting_slots) * 2:
+                req = func.HttpRequest(method="POST", url="/api/availability", body=body)
+                response = asyncio.run(handler(req, store=AvailabilityStore()))
+                self.assertEqual(response.status_code, 503)
+                self.assertIn("Invalid calendar backend settings", json.loads(response.get_body())["message"])
+        self.assertEqual(len(loads), 1)
+
+    def test_first_store_load_runs_off_the_event_loop(self):
+        loaded_on = []
+
+        def load():
+            loaded_on.append(threading.current_thread())
+            return AvailabilityStore()
+
+        body = json.dumps({"members": ["alice"], "start_date": DAY.isoformat()}).encode()
+        req = func.HttpRequest(method="POST", url="/api/process_availability_query", body=body)
+        with mock.patch.object(availability_operations, "availability_store", None), \
+                mock.patch.object(availability_operations, "load_default_store", load):
+            calendar = CalendarClient(FakeCalendarBackend({"alice": []}, latency_seconds=0))
+            response = asyncio.run(find_common_availability(req, calendar=calendar))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(loaded_on), 1)
+        self.assertIsNot(loaded_on[0], threading.main_thread())
+
+
+class TestFindCommonAvailabilityWithCalendar(unittest.TestCase):
+    def _execute(self, members, backend):
+        body = json.dumps({"members": members, "start_date": DAY.isoformat()}).encode('utf-8')
+        req = func.HttpRequest(method="POST", url="/api/process_availability_query", body=body)
+        calendar = CalendarClient(backend, timeout_seconds=0.05)
+        response = asyncio.run(find_common_availability(req, store=AvailabilityStore(), calendar=calendar))
+        return response, json.loads(response.get_body())
+
+    def test_missing_members_loaded_from_calendar(self):
+        backend = FakeCalendarBackend({"alice": [(at(9), at(17))], "bob": []}, latency_seconds=0)
+        response, response_body = self._execute(["alice", "bob"], backend)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([window["start"] for window in response_body["windows"]],
+                         ["2026-10-19T00:00:00", "2026-10-19T17:00:00"])
+
+    def test_unknown_and_failed_members(self):
+        response, _ = self._execute(["alice", "nobody"], FakeCalendarBackend({"alice": []}, 0))
+        self.assertEqual(response.status_code, 404)
+        response, response_body = self._execute(["slow"], SlowMemberBackend({"slow": []}, 0))
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("slow", response_body["message"])
+
+
+if __name__ == '__main__':
+    unittest.main()
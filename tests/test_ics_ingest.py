@@ -0,0 +1,143 @@
+import unittest
+import io
+import json
+import sys
+import os
+import tempfile
+from contextlib import redirect_stdout
+from datetime import date, datetime
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from availability import AvailabilityStore
+from availability_snapshot import load_snapshot
+from ics_ingest import ingest_ics, iter_vevents, event_occurrences, main
+
+WINDOW_START = datetime(2026, 10, 19)
+WINDOW_END = datetime(2026, 11, 2)
+
+CALENDAR = """BEGIN:VCALENDAR\r
+VERSION:2.0\r
+BEGIN:VEVENT\r
+UID:standup\r
+DTSTART;TZID=Europe/Berlin:20261001T090000\r
+DURATION:PT15M\r
+RRULE:FREQ=WEEKLY;BYDAY=MO,WE,FR;UNTIL=20261031T235959Z\r
+EXDATE;TZID=Europe/Berlin:20261021T090000\r
+ORGANIZER;CN="Lead, Team":mailto:Alice@Example.com\r
+ATTENDEE;PARTSTAT=ACCEPTED:mailto:bob@example.com\r
+ATTENDEE;PARTSTAT=DECLINED:mailto:carol@example.com\r
+BEGIN:VALARM\r
+TRIGGER:-PT5M\r
+DTSTART:19700101T000000\r
+END:VALARM\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:review\r
+SUMMARY:A long summary that is folded onto a\r
+  second line\r
+DTSTART:20261020T130000Z\r
+DTEND:20261020T143000Z\r
+ORGANIZER:mailto:carol@example.com\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:cancelled\r
+STATUS:CANCELLED\r
+DTSTART:20261020T090000Z\r
+DTEND:20261020T100000Z\r
+ORGANIZER:mailto:carol@example.com\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:offsite\r
+DTSTART;VALUE=DATE:20261030\r
+ORGANIZER:mailto:bob@example.com\r
+END:VEVENT\r
+END:VCALENDAR\r
+"""
+
+
+class TestIcsIngest(unittest.TestCase):
+    def _lines(self):
+        return io.StringIO(CALENDAR, newline="")
+
+    def test_vevents_are_unfolded_and_alarms_skipped(self):
+        events = list(iter_vevents(self._lines()))
+        self.assertEqual([event["UID"][0][1] for event in events], ["standup", "review", "cancelled", "offsite"])
+        self.assertEqual(events[1]["SUMMARY"][0][1], "A long summary that is folded onto a second line")
+        self.assertEqual(events[0]["DTSTART"][0][1], "20261001T090000")
+        self.assertEqual(events[0]["ORGANIZER"][0][0]["CN"], "Lead, Team")
+
+    def test_weekly_rule_expanded_within_window(self):
+        """Test BYDAY expansion, EXDATE, UNTIL and TZID conversion to UTC"""
+        standup = next(iter_vevents(self._lines()))
+        starts = [start for start, _ in event_occurrences(standup, WINDOW_START, WINDOW_END)]
+        self.assertEqual(starts, [
+            datetime(2026, 10, 19, 7), datetime(2026, 10, 23, 7),
+            datetime(2026, 10, 26, 8), datetime(2026, 10, 28, 8), datetime(2026, 10, 30, 8),
+        ])
+
+    def test_monthly_and_yearly_by_rules(self):
+        """Test BYDAY ordinals, BYMONTHDAY, BYMONTH and BYSETPOS in monthly and yearly rules"""
+        def starts(rule):
+            event = {"DTSTART": [({}, "20260105T090000Z")], "DURATION": [({}, "PT30M")], "RRULE": [({}, rule)]}
+            return [start.date() for start, _ in event_occurrences(event, datetime(2026, 1, 1), datetime(2027, 1, 1))]
+
+        self.assertEqual(starts("FREQ=MONTHLY;BYDAY=2TU;COUNT=3"), [date(2026, 1, 13), date(2026, 2, 10), date(2026, 3, 10)])
+        self.assertEqual(starts("FREQ=MONTHLY;BYDAY=-1FR;COUNT=2"), [date(2026, 1, 30), date(2026, 2, 27)])
+        self.assertEqual(starts("FREQ=MONTHLY;BYMONTHDAY=-1;COUNT=2"), [date(2026, 1, 31), date(2026, 2, 28)])
+        self.assertEqual(starts("FREQ=MONTHLY;BYDAY=MO,TU,WE,TH,FR;BYSETPOS=-1;COUNT=2"),
+                         [date(2026, 1, 30), date(2026, 2, 27)])
+        self.assertEqual(starts("FREQ=YEARLY;BYMONTH=11;BYDAY=4TH"), [date(2026, 11, 26)])
+
+    def test_unsupported_rule_parts_are_skipped(self):
+        calendar = CALENDAR.replace("RRULE:FREQ=WEEKLY;BYDAY=MO,WE,FR;", "RRULE:FREQ=WEEKLY;BYHOUR=9,15;")
+        store = AvailabilityStore()
+        stats = ingest_ics(io.StringIO(calendar, newline=""), store, WINDOW_START, WINDOW_END)
+        self.assertEqual(stats, {"events": 4, "occurrences": 2, "skipped": 1})
+        self.assertNotIn("alice@example.com", store.members)
+
+    def test_unsupported_or_missing_frequency_is_skipped(self):
+        """Test that HOURLY and FREQ-less rules are counted as skipped instead of aborting the ingest"""
+        for rule in ("FREQ=HOURLY;COUNT=3", "COUNT=3"):
+            with self.subTest(rule=rule):
+                calendar = CALENDAR.replace("RRULE:FREQ=WEEKLY;BYDAY=MO,WE,FR;", f"RRULE:{rule};")
+                stats = ingest_ics(io.StringIO(calendar, newline=""), AvailabilityStore(), WINDOW_START, WINDOW_END)
+                self.assertEqual(stats, {"events": 4, "occurrences": 2, "skipped": 1})
+
+    def test_ingest_into_store(self):
+        store = AvailabilityStore()
+        stats = ingest_ics(self._lines(), store, WINDOW_START, WINDOW_END)
+        self.assertEqual(stats, {"events": 4, "occurrences": 7, "skipped": 0})
+        self.assertEqual(sorted(store.members), ["alice@example.com", "bob@example.com", "carol@example.com"])
+        self.assertEqual(store.busy_slots("carol@example.com", date(2026, 10, 20)).sum(), 6)
+        self.assertEqual(store.busy_slots("alice@example.com", date(2026, 10, 19)).sum(), 1)
+        self.assertEqual(store.busy_slots("bob@example.com", date(2026, 10, 30)).sum(), 96)
+
+    def test_single_member_export(self):
+        store = AvailabilityStore()
+        ingest_ics(self._lines(), store, WINDOW_START, WINDOW_END, member_id="dave")
+        self.assertEqual(store.members, ["dave"])
+
+    def test_command_line_entry_point(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "team.ics")
+            with open(path, "w", encoding="utf-8", newline="") as out:
+                out.write(CALENDAR)
+            snapshot_path = os.path.join(directory, "team.tavsnap")
+            output = io.StringIO()
+            with redirect_stdout(output):
+                exit_code = main([path, "--start", "2026-10-19", "--end", "2026-11-02",
+                                  "--snapshot", snapshot_path])
+            snapshot = load_snapshot(snapshot_path)
+            self.assertEqual(snapshot.stored_days()[0], date(2026, 10, 19))
+            self.assertEqual(snapshot.stored_days()[-1], date(2026, 11, 1))
+            self.assertEqual(snapshot.busy_slots("bob@example.com", date(2026, 10, 30)).sum(), 96)
+            del snapshot
+        self.assertEqual(exit_code, 0)
+        report = json.loads(output.getvalue())
+        self.assertEqual((report["events"], report["members"]), (4, 3))
+        self.assertIn("events_per_second", report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+import itertools
+import json
+import os
+import sys
+import threading
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.load import HttpTarget, InProcessTarget, drive, request_factory, run, summarize
+
+
+class AlternatingHandler(BaseHTTPRequestHandler):
+    """Answers 200 and 500 in turn, so half of all requests fail."""
+    counter = itertools.count()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        status = 500 if next(self.counter) % 2 else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+def samples(scheduled_ms, latency_ms, statuses, dropped=0, exceptions=None):
+    return {
+        "scheduled_ns": array("q", [int(value * 1e6) for value in scheduled_ms]).tobytes(),
+        "latency_ns": array("q", [int(value * 1e6) for value in latency_ms]).tobytes(),
+        "statuses": array("h", statuses).tobytes(),
+        "exceptions": exceptions or {},
+        "dropped": dropped,
+    }
+
+
+class TestLoadBenchmark(unittest.TestCase):
+    def test_request_factory_builds_route_bodies(self):
+        method, params, body = request_factory("http_trigger1")()
+        self.assertEqual((method, params, body), ("GET", {"name": "user0"}, b""))
+        _, _, body = request_factory("process_scheduling_query_batch")()
+        self.assertEqual(len(body.splitlines()), 100)
+        self.assertIn("UserQuery", json.loads(body.splitlines()[0]))
+        self.assertEqual(request_factory("anything", body=b"{}")(), ("POST", {}, b"{}"))
+
+    def test_summary_buckets_by_completion_time(self):
+        """Test that worker samples merge into per-interval throughput, latency and error counts"""
+        step = summarize([
+            samples([0, 100, 600], [10, 10, 10], [200, 200, 500]),
+            samples([200, 700], [1000, 20], [200, 0], dropped=1, exceptions={"TimeoutError": 1}),
+        ], rate=10, interval_seconds=0.5)
+        self.assertEqual(step["requests"], 5)
+        self.assertEqual(step["dropped"], 1)
+        self.assertEqual(step["errors"], 2)
+        self.assertEqual(step["status_counts"], {"0": 1, "200": 3, "500": 1})
+        self.assertEqual(step["exceptions"], {"TimeoutError": 1})
+        self.assertEqual([interval["requests"] for interval in step["intervals"]], [2, 2, 1])
+        self.assertEqual(step["intervals"][1]["errors"], 2)
+        self.assertTrue(step["saturated"])
+
+    def test_open_loop_latency_counts_from_the_schedule(self):
+        """Test that a target slower than the arrival rate shows queueing in latency"""
+        class SlowTarget:
+            def send(self, method, params, body):
+                threading.Event().wait(0.01)
+                return 200
+
+        result = summarize([drive(SlowTarget(), request_factory("http_trigger1"), rate=400, duration=0.5)], 400)
+        self.assertTrue(result["saturated"])
+        self.assertGreater(result["latency_ms"]["p99"], 50)
+        self.assertGreater(result["dropped"], 0)
+
+    def test_in_process_target_awaits_async_routes(self):
+        target = InProcessTarget("process_scheduling_query")
+        self.assertEqual(target.send(*request_factory("process_scheduling_query")()), 200)
+        self.assertEqual(InProcessTarget("http_trigger1").send(*request_factory("http_trigger1")()), 200)
+
+    def test_http_target_counts_server_errors(self):
+        """Test closed-loop HTTP load through the worker pool against a local server"""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), AlternatingHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}"
+            self.assertIn(HttpTarget("process_scheduling_query", url).send("POST", {}, b"x"), (200, 500))
+            result = run("process_scheduling_query", rates=(0,), duration=0.3, workers=1, connections=2,
+                         url=url, warmup=2)
+        finally:
+            server.shutdown()
+            server.server_close()
+        step = result["steps"][0]
+        self.assertEqual(result["mode"], "http")
+        self.assertGreater(step["requests"], 10)
+        self.assertAlmostEqual(step["error_rate"], 0.5, delta=0.1)
+        self.assertEqual(set(step["status_counts"]), {"200", "500"})
+        self.assertTrue(step["saturated"])
+
+    def test_in_process_pool_reports_each_rate_step(self):
+        result = run("process_scheduling_query", rates=(20, 40), duration=0.5, workers=2, warmup=2,
+                     interval_seconds=0.25)
+        self.assertEqual([step["rate"] for step in result["steps"]], [20, 40])
+        for step in result["steps"]:
+            self.assertEqual(step["errors"], 0)
+            self.assertGreater(step["requests"], 0)
+            self.assertTrue(step["intervals"])
+
+    def test_unknown_route_needs_a_body(self):
+        with self.assertRaises(ValueError):
+            run("process_availability_query")
+
+
+if __name__ == '__main__':
+    unittest.main()
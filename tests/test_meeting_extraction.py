@@ -0,0 +1,109 @@
+import unittest
+import json
+import sys
+import os
+from datetime import date
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import meeting_extraction
+from meeting_extraction import extract_details
+from parsing_operations import parse_schedule_query
+
+# Saturday, so weekday arithmetic crosses a week boundary.
+REFERENCE_DATE = date(2026, 10, 17)
+
+
+class MockHttpRequest:
+    def __init__(self, body=None):
+        self._body = body if body is not None else b''
+
+    def get_body(self):
+        return self._body
+
+
+class TestExtractDetails(unittest.TestCase):
+    def _extract(self, query):
+        return extract_details(query, reference_date=REFERENCE_DATE)
+
+    def test_participants_date_and_time(self):
+        """Test the canonical query from the parsing test suite"""
+        details = self._extract("Schedule a meeting with John tomorrow at 2pm")
+        self.assertEqual(details["participants"], ["John"])
+        self.assertEqual(details["date"], "2026-10-18")
+        self.assertEqual(details["date_text"], "tomorrow")
+        self.assertEqual(details["start_time"], "14:00")
+        self.assertIsNone(details["end_time"])
+        self.assertTrue(details["resolved"])
+
+    def test_relative_weekdays(self):
+        """Test weekday expressions resolved against the reference date"""
+        test_cases = {
+            "Book a room for project review on Friday": "2026-10-23",
+            "Planning next Tuesday": "2026-10-20",
+            "Retro this Saturday": "2026-10-17",
+            "Find available time slots for team meeting next week": "2026-10-19",
+            "Offsite on March 3rd": "2027-03-03",
+            "Review on 2026-11-03": "2026-11-03",
+        }
+        for query, expected_date in test_cases.items():
+            with self.subTest(query=query):
+                self.assertEqual(self._extract(query)["date"], expected_date)
+
+    def test_time_ranges(self):
+        """Test explicit and inferred time ranges"""
+        test_cases = {
+            "Sync between 3 and 5": ("15:00", "17:00", 120),
+            "Call 3-5pm": ("15:00", "17:00", 120),
+            "Lunch 11-1pm": ("11:00", "13:00", 120),
+            "1:1 from 9:30am to 10:15am": ("09:30", "10:15", 45),
+        }
+        for query, (start, end, duration) in test_cases.items():
+            with self.subTest(query=query):
+                details = self._extract(query)
+                self.assertEqual((details["start_time"], details["end_time"]), (start, end))
+                self.assertEqual(details["duration_minutes"], duration)
+
+    def test_duration_and_recurrence(self):
+        """Test duration phrases and recurrence rules"""
+        self.assertEqual(self._extract("Set up a 1-hour meeting with marketing team")["duration_minutes"], 60)
+        self.assertEqual(self._extract("Grab half an hour with Sam")["duration_minutes"], 30)
+        self.assertEqual(self._extract("Schedule daily standup at 10am starting next Monday")["recurrence"],
+                         {"frequency": "daily", "interval": 1})
+        self.assertEqual(self._extract("Demo every other Thursday")["recurrence"],
+                         {"frequency": "weekly", "interval": 2, "weekday": "thursday"})
+
+    def test_mentions_and_non_times(self):
+        """Test that mentions are participants and numbers that are not times are ignored"""
+        details = self._extract("Meeting with @john.doe & @jane.smith")
+        self.assertEqual(details["participants"], ["john.doe", "jane.smith"])
+        for query in ("Status update: 100% completion", "Project sync-up: Q1'24 planning"):
+            with self.subTest(query=query):
+                self.assertFalse(self._extract(query)["resolved"])
+
+    def test_fallback_only_for_unresolved_queries(self):
+        """Test that only unresolved queries reach the fallback extractor"""
+        calls = []
+
+        def fallback(query):
+            calls.append(query)
+            return {"participants": [], "resolved": True}
+
+        meeting_extraction.register_fallback_extractor(fallback)
+        try:
+            self.assertEqual(self._extract("Review meeting (high-priority!)")["source"], "fallback")
+            self.assertEqual(self._extract("Standup tomorrow at 9")["source"], "rules")
+        finally:
+            meeting_extraction.register_fallback_extractor(None)
+        self.assertEqual(calls, ["Review meeting (high-priority!)"])
+
+    def test_parse_schedule_query_includes_details(self):
+        """Test that the success response carries the extracted details"""
+        response = parse_schedule_query(MockHttpRequest(b"Schedule a meeting with John tomorrow at 2pm"))
+        response_body = json.loads(response.get_body())
+        self.assertEqual(response_body["MeetingDetails"]["participants"], ["John"])
+        self.assertEqual(response_body["MeetingDetails"]["start_time"], "14:00")
+
+
+if __name__ == '__main__':
+    unittest.main()
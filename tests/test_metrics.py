@@ -0,0 +1,132 @@
+import unittest
+import os
+import sys
+import tempfile
+import time
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import function_app
+from metrics import LatencyHistogram, MetricsRegistry, SlowRequestProfiler, metrics
+from parsing_operations import parse_schedule_query
+
+
+class MockHttpRequest:
+    def __init__(self, body=None):
+        self._body = body if body is not None else b''
+
+    def get_body(self):
+        return self._body
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_buckets_are_cumulative(self):
+        """Test that observations land in the first bucket whose bound they do not exceed"""
+        histogram = LatencyHistogram(buckets=(0.001, 0.01, 0.1))
+        for seconds in (0.0005, 0.001, 0.005, 0.05, 2.0):
+            histogram.observe(seconds)
+        cumulative, total, count = histogram.snapshot()
+        self.assertEqual(cumulative, [2, 3, 4, 5])
+        self.assertEqual(count, 5)
+        self.assertAlmostEqual(total, 2.0565)
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_render_prometheus(self):
+        """Test the text exposition of histograms, counters and gauges"""
+        registry = MetricsRegistry(stages=("decode",), buckets=(0.001, 0.01))
+        registry.observe("decode", 0.002)
+        with registry.timed("extraction"):
+            pass
+        registry.increment("slow_requests_total", 2)
+        registry.add_gauges(lambda: {"query_cache_size": 7})
+
+        text = registry.render_prometheus()
+        self.assertIn("# TYPE schedule_stage_duration_seconds histogram", text)
+        self.assertIn('schedule_stage_duration_seconds_bucket{stage="decode",le="0.001"} 0', text)
+        self.assertIn('schedule_stage_duration_seconds_bucket{stage="decode",le="0.01"} 1', text)
+        self.assertIn('schedule_stage_duration_seconds_bucket{stage="decode",le="+Inf"} 1', text)
+        self.assertIn('schedule_stage_duration_seconds_count{stage="extraction"} 1', text)
+        self.assertIn("schedule_slow_requests_total 2", text)
+        self.assertIn("schedule_query_cache_size 7", text)
+        self.assertTrue(text.endswith("\n"))
+
+    def test_request_stages_are_recorded(self):
+        """Test that a schedule query records decode, extraction and serialization timings"""
+        metrics.reset()
+        parse_schedule_query(MockHttpRequest(b"Metrics check with Dana on 2031-01-02 at 3pm"))
+        self.assertEqual(metrics.histogram("decode").snapshot()[2], 1)
+        self.assertEqual(metrics.histogram("extraction").snapshot()[2], 1)
+        self.assertGreaterEqual(metrics.histogram("serialization").snapshot()[2], 1)
+        self.assertEqual(metrics.histogram("error").snapshot()[2], 0)
+
+    def test_error_path_is_recorded(self):
+        """Test that a failing request records the error stage"""
+        metrics.reset()
+        response = parse_schedule_query(MockHttpRequest(b"\xff\xfe"))
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(metrics.histogram("error").snapshot()[2], 1)
+
+    def test_metrics_route(self):
+        """Test that the metrics route serves the Prometheus text format"""
+        handlers = function_app.route_handlers()
+        response = handlers["metrics_endpoint"](MockHttpRequest())
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["Content-Type"].startswith("text/plain; version=0.0.4"))
+        body = response.get_body().decode("utf-8")
+        self.assertIn("schedule_stage_duration_seconds_bucket", body)
+        self.assertIn("schedule_query_cache_hits", body)
+
+
+class TestSlowRequestProfiler(unittest.TestCase):
+    def test_disabled_by_default(self):
+        """Test that an unconfigured profiler calls through without profiling"""
+        profiler = SlowRequestProfiler()
+        self.assertFalse(profiler.enabled)
+        self.assertEqual(profiler.profiled(lambda: 42)(), 42)
+        self.assertEqual(profiler.captured, 0)
+
+    def test_slow_sampled_requests_are_captured(self):
+        """Test that only sampled requests over the threshold are written out"""
+        with tempfile.TemporaryDirectory() as output_dir:
+            profiler = SlowRequestProfiler(threshold_ms=5, sample_rate=1.0, output_dir=output_dir)
+
+            @profiler.profiled
+            def slow_handler():
+                time.sleep(0.01)
+                return "slow"
+
+            @profiler.profiled
+            def fast_handler():
+                return "fast"
+
+            self.assertEqual(fast_handler(), "fast")
+            self.assertEqual(slow_handler(), "slow")
+            files = os.listdir(output_dir)
+            self.assertEqual(profiler.captured, 1)
+            self.assertEqual(len(files), 1)
+            self.assertTrue(files[0].startswith("slow_handler-") and files[0].endswith(".prof"))
+
+    def test_async_handlers_are_rejected(self):
+        """Test that coroutine handlers cannot be profiled across their awaits"""
+        profiler = SlowRequestProfiler(threshold_ms=0, sample_rate=1.0)
+
+        async def handler():
+            return "done"
+
+        with self.assertRaises(TypeError):
+            profiler.profiled(handler)
+
+    def test_unwritable_output_does_not_fail_the_request(self):
+        """Test that a profile that cannot be written is logged and the response still returned"""
+        with tempfile.TemporaryDirectory() as directory:
+            blocker = os.path.join(directory, "file")
+            open(blocker, "w").close()
+            profiler = SlowRequestProfiler(threshold_ms=0, sample_rate=1.0, output_dir=os.path.join(blocker, "profiles"))
+            with self.assertLogs("schedule.profiler", "ERROR"):
+                self.assertEqual(profiler.profiled(lambda: 42)(), 42)
+        self.assertEqual(profiler.captured, 0)
+        self.assertEqual(profiler.profiled(lambda: 7)(), 7)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+from datetime import date, datetime
+from unittest import mock
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from availability import AvailabilityStore, BusyChange
+from persistence import SQLitePersistence
+from team_directory import Member, TeamDirectory
+
+DAY = date(2026, 10, 19)
+
+
+def at(hour, minute=0, day=DAY):
+    return datetime(day.year, day.month, day.day, hour, minute)
+
+
+class TestSQLitePersistence(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "app.db")
+        self.persistence = SQLitePersistence(self.path, history_batch_size=3)
+
+    def tearDown(self):
+        self.persistence.close()
+        self.directory.cleanup()
+
+    def test_availability_round_trip(self):
+        """Test that a saved store reloads with the same members and busy slots"""
+        store = AvailabilityStore(slot_minutes=30)
+        store.mark_busy("alice", at(9), at(10))
+        store.mark_busy("bob", at(23), at(1, day=date(2026, 10, 20)))
+        store.add_member("carol")
+        self.assertEqual(self.persistence.save_availability(store), 3)
+
+        reopened = SQLitePersistence(self.path)
+        loaded = reopened.load_availability()
+        reopened.close()
+        self.assertEqual(loaded.slot_minutes, 30)
+        self.assertEqual(loaded.members, ["alice", "bob", "carol"])
+        for member_id in loaded.members:
+            for day in (DAY, date(2026, 10, 20)):
+                self.assertEqual(list(loaded.busy_slots(member_id, day)), list(store.busy_slots(member_id, day)))
+        self.assertEqual(list(self.persistence.busy_days("bob", DAY, date(2026, 10, 31))), [DAY, date(2026, 10, 20)])
+
+    def test_changes_write_only_touched_member_days(self):
+        """Test that incremental changes upsert and delete single member-day rows"""
+        store = AvailabilityStore()
+        store.mark_busy("alice", at(9), at(10))
+        store.mark_busy("bob", at(9), at(10))
+        self.persistence.save_availability(store)
+
+        changes = [BusyChange("alice", at(9), at(10), False), BusyChange("dan", at(12), at(13), True)]
+        store = store.apply_changes(changes)
+        self.assertEqual(self.persistence.save_changes(store, changes), 2)
+        loaded = self.persistence.load_availability()
+        self.assertEqual(self.persistence.busy_days("alice", DAY, DAY), {})
+        self.assertEqual(loaded.busy_slots("bob", DAY).sum(), 4)
+        self.assertEqual(loaded.busy_slots("dan", DAY).sum(), 4)
+
+    def test_slot_size_mismatch_is_rejected(self):
+        self.persistence.save_availability(AvailabilityStore(slot_minutes=15))
+        with self.assertRaises(ValueError):
+            self.persistence.save_availability(AvailabilityStore(slot_minutes=30))
+
+    def test_directory_round_trip(self):
+        """Test that directory members, emails and aliases are saved and reloaded"""
+        self.assertIsNone(self.persistence.load_directory())
+        self.persistence.save_directory(TeamDirectory([
+            Member("u-john", "John Smith", "john@example.com", ("Johnny",)),
+            Member("u-zoe", "Zoë Brooks", None, ()),
+        ]))
+        directory = self.persistence.load_directory()
+        self.assertEqual(len(directory), 2)
+        self.assertEqual(directory.resolve_one("johnny")[0], "u-john")
+        self.assertIsNone(directory.get("u-zoe").email)
+
+    def test_query_history_is_written_in_batches(self):
+        """Test that history rows are buffered until a batch fills and are readable after a flush"""
+        for index in range(4):
+            self.persistence.record_query(f"query {index}", json.dumps({"index": index}).encode(), "UTC")
+        reader = SQLitePersistence(self.path)
+        self.assertEqual(len(reader.pool.connection().execute("SELECT * FROM query_history").fetchall()), 3)
+        recent = self.persistence.recent_queries(limit=2)
+        self.assertEqual([row["user_query"] for row in recent], ["query 3", "query 2"])
+        self.assertEqual(recent[0]["details"], {"index": 3})
+        reader.close()
+
+    def test_failed_history_write_keeps_the_batch(self):
+        """Test that a locked database leaves history rows buffered for the next write"""
+        locked = sqlite3.OperationalError("database is locked")
+        with mock.patch.object(self.persistence.pool, "connection", side_effect=locked):
+            for index in range(2):
+                self.persistence.record_query(f"query {index}", b"{}")
+            with self.assertRaises(sqlite3.OperationalError):
+                self.persistence.record_query("query 2", b"{}")
+        self.assertEqual(len(self.persistence._history), 3)
+        self.persistence.flush_history()
+        rows = self.persistence.pool.connection().execute("SELECT user_query FROM query_history").fetchall()
+        self.assertEqual([row[0] for row in rows], ["query 0", "query 1", "query 2"])
+
+    def test_history_write_error_does_not_fail_the_query(self):
+        """Test that the query route still answers when the history write fails"""
+        import parsing_operations
+        locked = sqlite3.OperationalError("database is locked")
+        with mock.patch.object(parsing_operations, "query_history", self.persistence), \
+                mock.patch.object(self.persistence, "_write_history", side_effect=locked), \
+                self.assertLogs("schedule", "ERROR"):
+            for index in range(3):
+                body = json.loads(parsing_operations.build_query_response(f"Lunch with Ana at {index + 1}pm"))
+                self.assertEqual(body["status"], "success")
+
+    def test_each_thread_uses_its_own_connection(self):
+        """Test that the pool hands every thread a separate connection"""
+        connections = []
+        thread = threading.Thread(target=lambda: connections.append(self.persistence.pool.connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(connections[0], self.persistence.pool.connection())
+        self.assertIs(self.persistence.pool.connection(), self.persistence.pool.connection())
+        mode = self.persistence.pool.connection().execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+
+class TestSQLiteIngestBenchmark(unittest.TestCase):
+    def test_benchmark_reports_throughput(self):
+        from benchmarks.sqlite_ingest import run
+        result = run(events=300, members=20, changes=100, change_batch=20)
+        self.assertGreater(result["rows"], 0)
+        self.assertGreater(result["bulk_rows_per_second"], 0)
+        self.assertGreater(result["changes_per_second"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
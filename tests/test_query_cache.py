@@ -0,0 +1,117 @@
+import unittest
+import json
+import sys
+import os
+from datetime import date, timedelta
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import parsing_operations
+from parsing_operations import parse_schedule_query, extract_meeting_details
+from query_cache import QueryResultCache, normalize_text
+
+
+class MockHttpRequest:
+    def __init__(self, body=None):
+        self._body = body if body is not None else b''
+
+    def get_body(self):
+        return self._body
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.today = date(2026, 10, 17)
+
+    def __call__(self):
+        return self.now
+
+
+class TestNormalizeText(unittest.TestCase):
+    def test_whitespace_case_and_relative_dates(self):
+        """Test that equivalent phrasings on the same day share a key"""
+        reference_date = date(2026, 10, 17)
+        key = normalize_text("Set up standup tomorrow at 9", reference_date)
+        self.assertEqual(key, normalize_text("  set up\tSTANDUP   Tomorrow at 9 ", reference_date))
+        self.assertEqual(key, normalize_text("set up standup 2026-10-18 at 9", reference_date))
+        self.assertNotEqual(key, normalize_text("Set up standup tomorrow at 9", date(2026, 10, 18)))
+
+    def test_date_is_replaced_where_it_matched(self):
+        """Test that the date phrase is replaced at its match, not at an earlier equal substring"""
+        reference_date = date(2026, 10, 17)
+        self.assertEqual(normalize_text("Lunch with Simon on Mon.", reference_date),
+                         "lunch with simon on 2026-10-19.")
+
+
+class TestQueryResultCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = QueryResultCache(max_entries=2, ttl_seconds=10, clock=self.clock,
+                                      today=lambda: self.clock.today)
+
+    def test_lru_eviction(self):
+        self.cache.put("a", b"1")
+        self.cache.put("b", b"2")
+        self.assertEqual(self.cache.get("a"), b"1")
+        self.cache.put("c", b"3")
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), b"1")
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_ttl_expiry(self):
+        self.cache.put("a", b"1")
+        self.clock.now = 9.9
+        self.assertEqual(self.cache.get("a"), b"1")
+        self.clock.now = 10.0
+        self.assertIsNone(self.cache.get("a"))
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["expirations"]), (1, 1, 1))
+
+    def test_never_served_across_date_boundary(self):
+        self.cache.put("a", b"1")
+        self.clock.today = date(2026, 10, 18)
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.stats()["size"], 0)
+
+    def test_disabled(self):
+        cache = QueryResultCache(max_entries=0)
+        cache.put("a", b"1")
+        self.assertIsNone(cache.get("a"))
+
+
+class TestParseScheduleQueryCache(unittest.TestCase):
+    def setUp(self):
+        parsing_operations.query_cache.clear()
+
+    def test_cached_response_matches_uncached_serialization(self):
+        """Test that responses built from cache hits equal a fresh json.dumps of the result"""
+        before = parsing_operations.query_cache.stats()["hits"]
+        tomorrow = (date.today() + timedelta(days=1)).isoformat()
+        queries = ("Standup tomorrow at 9 with JOHN",
+                   "standup  tomorrow at 9 with JOHN",
+                   "STANDUP TOMORROW AT 9 WITH John",
+                   f"standup {tomorrow} at 9 with john")
+        for query in queries:
+            response = parse_schedule_query(MockHttpRequest(query.encode('utf-8')))
+            expected = json.dumps({
+                "status": "success",
+                "UserQuery": query,
+                "MeetingDetails": extract_meeting_details(query, date.today())
+            })
+            self.assertEqual(response.get_body().decode('utf-8'), expected)
+        self.assertEqual(parsing_operations.query_cache.stats()["hits"], before + len(queries) - 1)
+
+        details = json.loads(response.get_body())["MeetingDetails"]
+        self.assertEqual(details["date_text"], tomorrow)
+        self.assertEqual(details["participants"], ["john"])
+
+    def test_recurring_queries_keep_their_own_key(self):
+        """Test that 'every monday' does not share a key with the date it starts on"""
+        reference_date = date(2026, 10, 17)
+        self.assertNotEqual(normalize_text("standup every monday", reference_date),
+                            normalize_text("standup 2026-10-19", reference_date))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import io
+import json
+import sys
+import os
+import tempfile
+from contextlib import redirect_stdout
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.replay import generate_corpus, read_corpus, replay, compare_to_baseline, main
+
+
+class TestReplayBenchmark(unittest.TestCase):
+    def test_synthetic_corpus_is_lazy_and_deterministic(self):
+        corpus = generate_corpus(10 ** 9)
+        self.assertFalse(isinstance(corpus, list))
+        first = [next(corpus) for _ in range(5)]
+        self.assertEqual(first, list(generate_corpus(5)))
+        self.assertEqual(len(set(generate_corpus(50, distinct=3))), 3)
+
+    def test_read_corpus_accepts_text_and_ndjson(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "corpus.txt")
+            with open(path, "wb") as corpus:
+                corpus.write(b'standup tomorrow at 9\n\n{"UserQuery": "retro on Friday"}\n\xff\xfe\n')
+            self.assertEqual(list(read_corpus(path)), ["standup tomorrow at 9", "retro on Friday"])
+
+    def test_replay_reports_latency_and_allocations(self):
+        for target, expected_calls in (("parse_schedule_query", 250), ("process_scheduling_query_batch", 2)):
+            with self.subTest(target=target):
+                result = replay(generate_corpus(300), target, allocation_sample=20, warmup=50)
+                self.assertEqual(result["calls"], expected_calls)
+                self.assertGreater(result["queries_per_second"], 0)
+                latency = result["latency_ms"]
+                self.assertLessEqual(latency["p50"], latency["p95"])
+                self.assertLessEqual(latency["p95"], latency["p99"])
+                self.assertGreater(result["alloc_peak_bytes_per_call"], 0)
+
+    def test_baseline_comparison_and_regression_exit_code(self):
+        result = {"queries_per_second": 900, "latency_ms": {"p50": 1.0, "p99": 3.0}, "alloc_peak_bytes_per_call": 100}
+        baseline = {"queries_per_second": 1000, "latency_ms": {"p50": 1.0, "p99": 2.0}, "alloc_peak_bytes_per_call": 100}
+        self.assertEqual(compare_to_baseline(result, baseline), {
+            "queries_per_second_pct": -10.0, "p50_pct": 0.0, "p99_pct": 50.0, "alloc_peak_pct": 0.0
+        })
+
+        with tempfile.TemporaryDirectory() as directory:
+            output_path = os.path.join(directory, "run.json")
+            baseline_path = os.path.join(directory, "baseline.json")
+            with open(baseline_path, "w", encoding="utf-8") as baseline_file:
+                json.dump({"queries_per_second": 1e12, "latency_ms": {"p50": 1e-9, "p99": 1e-9},
+                           "alloc_peak_bytes_per_call": 1}, baseline_file)
+            with redirect_stdout(io.StringIO()):
+                exit_code = main(["--synthetic", "200", "--allocation-sample", "10", "--output", output_path,
+                                  "--baseline", baseline_path, "--max-regression-pct", "20"])
+            with open(output_path, encoding="utf-8") as output_file:
+                saved = json.load(output_file)
+        self.assertEqual(exit_code, 1)
+        self.assertEqual(saved["corpus"], "synthetic:200:seed=42:distinct=None")
+        self.assertIn("baseline", saved)
+
+
+if __name__ == '__main__':
+    unittest.main()
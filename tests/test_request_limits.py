@@ -0,0 +1,116 @@
+import unittest
+import asyncio
+import json
+import os
+import sys
+
+import azure.functions as func
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from availability import AvailabilityStore
+from availability_operations import find_common_availability
+from parsing_operations import (
+    MAX_BATCH_BYTES, MAX_BATCH_LINES, MAX_QUERY_BYTES, count_lines, iter_batch_results, iter_body_lines,
+    parse_schedule_query, parse_schedule_query_batch
+)
+
+
+class MockHttpRequest:
+    def __init__(self, body=None, headers=None):
+        self._body = body if body is not None else b''
+        self.headers = headers or {}
+
+    def get_body(self):
+        return self._body
+
+
+class UnreadableRequest(MockHttpRequest):
+    def get_body(self):
+        raise AssertionError("body should not be read")
+
+
+class TestBodySizeLimits(unittest.TestCase):
+    def test_oversize_query_is_rejected(self):
+        """Test that a query body over MAX_QUERY_BYTES gets a 413 without being parsed"""
+        response = parse_schedule_query(MockHttpRequest(b"x" * (MAX_QUERY_BYTES + 1)))
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(json.loads(response.get_body())["message"],
+                         f"Request body exceeds {MAX_QUERY_BYTES} bytes")
+
+    def test_query_at_limit_is_accepted(self):
+        """Test that a body of exactly MAX_QUERY_BYTES is processed"""
+        response = parse_schedule_query(MockHttpRequest(b"Meet Ana tomorrow ".ljust(MAX_QUERY_BYTES, b" ")))
+        self.assertEqual(response.status_code, 200)
+
+    def test_declared_length_is_checked_first(self):
+        """Test that an oversize Content-Length is rejected before the body is read"""
+        request = UnreadableRequest(headers={"content-length": str(MAX_BATCH_BYTES + 1)})
+        self.assertEqual(parse_schedule_query_batch(request).status_code, 413)
+        request = UnreadableRequest(headers={"content-length": str(MAX_QUERY_BYTES + 1)})
+        self.assertEqual(parse_schedule_query(request).status_code, 413)
+
+    def test_oversize_availability_request(self):
+        """Test that the availability endpoint enforces the same limit"""
+        body = json.dumps({"members": ["a"] * MAX_QUERY_BYTES, "start_date": "2026-10-19"}).encode()
+        request = func.HttpRequest(method="POST", url="/api/process_availability_query", body=body)
+        response = asyncio.run(find_common_availability(request, store=AvailabilityStore()))
+        self.assertEqual(response.status_code, 413)
+
+    def test_oversize_batch_line_gets_error_record(self):
+        """Test that a batch line over the per-query limit fails alone, without being decoded"""
+        body = b"Lunch with Ana tomorrow\n" + b"\xff" * (MAX_QUERY_BYTES + 1) + b"\nStandup daily at 9am\n"
+        response = parse_schedule_query_batch(MockHttpRequest(body))
+        results = [json.loads(line) for line in response.get_body().splitlines()]
+        self.assertEqual([result["line"] for result in results], [1, 2, 3])
+        self.assertEqual([result["status"] for result in results], ["success", "error", "success"])
+        self.assertIn(f"query exceeds {MAX_QUERY_BYTES} bytes", results[1]["message"])
+
+    def test_batch_over_line_limit_is_rejected(self):
+        """Test that a batch of many short lines gets a 413 before any line is parsed"""
+        response = parse_schedule_query_batch(MockHttpRequest(b"Standup at 9am\n" * (MAX_BATCH_LINES + 1)))
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(json.loads(response.get_body())["message"], f"Batch exceeds {MAX_BATCH_LINES} lines")
+
+    def test_single_query_has_no_line_limit(self):
+        """Test that a multi-line single query is bounded by MAX_QUERY_BYTES only"""
+        body = b"Standup at 9am" + b"\n" * MAX_BATCH_LINES + b"with Ana"
+        self.assertLessEqual(len(body), MAX_QUERY_BYTES)
+        self.assertEqual(parse_schedule_query(MockHttpRequest(body)).status_code, 200)
+
+    def test_batch_at_line_limit_is_accepted(self):
+        body = b"\n".join([b"Standup at 9am"] * MAX_BATCH_LINES)
+        self.assertEqual(count_lines(body), MAX_BATCH_LINES)
+        self.assertEqual(count_lines(body + b"\n"), MAX_BATCH_LINES)
+        response = parse_schedule_query_batch(MockHttpRequest(body + b"\n"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.get_body().splitlines()), MAX_BATCH_LINES)
+
+
+class TestIncrementalDecoding(unittest.TestCase):
+    BODY = "Sync with Zoë tomorrow at 2pm\r\n\n{\"UserQuery\": \"Café review on Friday\"}\n\xa0 \nbad \udcff\n".encode(
+        "utf-8", "surrogateescape")
+
+    def test_bytes_lines_are_memoryviews(self):
+        """Test that lines of an in-memory body are zero-copy slices"""
+        lines = list(iter_body_lines(b"a\nbc\n", max_line_bytes=10))
+        self.assertEqual([number for number, _ in lines], [1, 2, 3])
+        self.assertTrue(all(isinstance(line, memoryview) for _, line in lines))
+        self.assertEqual([bytes(line) for _, line in lines], [b"a", b"bc", b""])
+
+    def test_chunked_stream_matches_whole_body(self):
+        """Test that any chunking of a body, including mid-character splits, gives the same results"""
+        expected = list(iter_batch_results(self.BODY))
+        for chunk_size in (1, 2, 3, 7, 64):
+            with self.subTest(chunk_size=chunk_size):
+                chunks = (self.BODY[i:i + chunk_size] for i in range(0, len(self.BODY), chunk_size))
+                self.assertEqual(list(iter_batch_results(chunks)), expected)
+
+    def test_chunked_oversize_line_is_not_buffered(self):
+        """Test that an oversize line spanning chunks is reported as None"""
+        chunks = [b"ok\n", b"y" * 6, b"y" * 6, b"\nfine"]
+        self.assertEqual(list(iter_body_lines(chunks, max_line_bytes=10)), [(1, b"ok"), (2, None), (3, b"fine")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+import unittest
+import json
+import logging
+import os
+import sys
+import threading
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import request_logging
+from parsing_operations import parse_schedule_query
+from request_logging import (
+    JsonFormatter, SamplingFilter, bind_request_id, parse_type_settings,
+    start_logging_pipeline, stop_logging_pipeline
+)
+
+
+class MockHttpRequest:
+    def __init__(self, body=None, headers=None):
+        self._body = body if body is not None else b''
+        self.headers = headers or {}
+
+    def get_body(self):
+        return self._body
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CapturingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.setFormatter(JsonFormatter())
+        self.lines = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.threads.add(threading.current_thread())
+        self.lines.append(json.loads(self.format(record)))
+
+
+def _record(message_type, msg):
+    record = logging.LogRecord("schedule.test", logging.ERROR, __file__, 1, msg, None, None)
+    record.message_type = message_type
+    return record
+
+
+class TestSamplingFilter(unittest.TestCase):
+    def test_rate_limit_per_message_type(self):
+        """Test that each message type has its own token bucket and reports suppressed records"""
+        clock = FakeClock()
+        sampling = SamplingFilter(rate_limits={"request_failed": 2}, default_rate_limit=None, clock=clock)
+
+        kept = [sampling.filter(_record("request_failed", "boom")) for _ in range(5)]
+        self.assertEqual(kept, [True, True, False, False, False])
+        self.assertTrue(all(sampling.filter(_record("query_received", "hi")) for _ in range(5)))
+
+        clock.now = 0.5
+        record = _record("request_failed", "boom")
+        self.assertTrue(sampling.filter(record))
+        self.assertEqual(record.suppressed, 3)
+
+    def test_sample_rates(self):
+        """Test that a zero sample rate drops every record of that type"""
+        sampling = SamplingFilter(sample_rates={"query_received": 0.0}, default_rate_limit=None)
+        self.assertFalse(sampling.filter(_record("query_received", "hi")))
+        self.assertTrue(sampling.filter(_record("empty_body", "empty")))
+
+    def test_parse_type_settings(self):
+        """Test parsing of the LOG_SAMPLE_RATES / LOG_RATE_LIMITS format"""
+        self.assertEqual(parse_type_settings("query_received=0.1, request_failed=50"),
+                         {"query_received": 0.1, "request_failed": 50.0})
+        self.assertEqual(parse_type_settings(None), {})
+
+
+class TestLoggingPipeline(unittest.TestCase):
+    def setUp(self):
+        stop_logging_pipeline()
+        self.handler = CapturingHandler()
+
+    def tearDown(self):
+        stop_logging_pipeline()
+
+    def test_records_are_formatted_on_the_listener_thread(self):
+        """Test that queued records become JSON lines with request IDs and tracebacks"""
+        start_logging_pipeline(handlers=[self.handler])
+        request_id = bind_request_id(MockHttpRequest(headers={"x-request-id": "abc-123"}))
+        self.assertEqual(request_id, "abc-123")
+        try:
+            raise RuntimeError("kaput")
+        except RuntimeError:
+            logging.getLogger("schedule.test").exception("Failed %s", "hard", extra={"message_type": "test_failure"})
+        stop_logging_pipeline()
+
+        self.assertEqual(len(self.handler.lines), 1)
+        line = self.handler.lines[0]
+        self.assertEqual(line["message"], "Failed hard")
+        self.assertEqual(line["request_id"], "abc-123")
+        self.assertEqual(line["message_type"], "test_failure")
+        self.assertIn("RuntimeError: kaput", line["exception"])
+        self.assertNotIn(threading.current_thread(), self.handler.threads)
+
+    def test_error_storm_is_rate_limited(self):
+        """Test that repeated invalid UTF-8 requests produce a bounded number of log lines"""
+        start_logging_pipeline(handlers=[self.handler], default_rate_limit=10)
+        for _ in range(500):
+            response = parse_schedule_query(MockHttpRequest(b"\xff\xfe"))
+            self.assertEqual(response.status_code, 500)
+        stop_logging_pipeline()
+
+        failures = [line for line in self.handler.lines if line["message_type"] == "request_failed"]
+        self.assertGreaterEqual(len(failures), 1)
+        self.assertLessEqual(len(failures), 20)
+        self.assertTrue(all(line["request_id"] for line in failures))
+
+    def test_stop_restores_propagation(self):
+        """Test that stopping the pipeline returns request loggers to synchronous logging"""
+        start_logging_pipeline(handlers=[self.handler])
+        self.assertFalse(logging.getLogger(request_logging.REQUEST_LOGGER).propagate)
+        stop_logging_pipeline()
+        self.assertTrue(logging.getLogger(request_logging.REQUEST_LOGGER).propagate)
+
+
+if __name__ == '__main__':
+    unittest.main()
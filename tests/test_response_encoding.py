@@ -0,0 +1,74 @@
+import unittest
+import json
+import os
+import sys
+from datetime import date
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import parsing_operations
+from benchmarks.replay import generate_corpus
+from parsing_operations import build_query_response, create_error_response, extract_meeting_details
+from response_encoding import (
+    StdlibJsonBackend, encode_string, error_body, select_backend, success_body
+)
+
+AWKWARD_STRINGS = [
+    "",
+    "plain ascii",
+    'quotes " and \\ backslashes / slashes',
+    "control \x00\x01\x1f chars \b\f\n\r\t",
+    "café naïve 日本語",
+    "emoji \U0001F600 and lone surrogate \ud800",
+    "  line separators   and \x7f delete",
+]
+
+
+class TestByteEquivalence(unittest.TestCase):
+    def test_encode_string_matches_json_dumps(self):
+        """Test that string escaping matches json.dumps for awkward input"""
+        for value in AWKWARD_STRINGS:
+            with self.subTest(value=value):
+                self.assertEqual(encode_string(value), json.dumps(value).encode("utf-8"))
+
+    def test_error_body_matches_json_dumps(self):
+        """Test that static and dynamic error envelopes match the dict-based encoding"""
+        for message in AWKWARD_STRINGS + ["Empty request body"]:
+            with self.subTest(message=message):
+                expected = json.dumps({"status": "error", "message": message}).encode("utf-8")
+                self.assertEqual(error_body(message), expected)
+                self.assertEqual(create_error_response(message, status_code=400).get_body(), expected)
+
+    def test_success_body_matches_json_dumps(self):
+        """Test that the spliced success envelope matches json.dumps over a query corpus"""
+        parsing_operations.query_cache.clear()
+        queries = list(generate_corpus(300, seed=7)) + AWKWARD_STRINGS[1:]
+        for query in queries:
+            with self.subTest(query=query):
+                details = extract_meeting_details(query, date.today())
+                expected = json.dumps({"status": "success", "UserQuery": query, "MeetingDetails": details})
+                self.assertEqual(build_query_response(query), expected.encode("utf-8"))
+                self.assertEqual(success_body(query, StdlibJsonBackend.dumps(details)), expected.encode("utf-8"))
+
+
+class TestJsonBackends(unittest.TestCase):
+    def test_select_backend(self):
+        """Test backend selection by JSON_BACKEND name"""
+        self.assertEqual(select_backend("json").name, "json")
+        self.assertIn(select_backend("auto").name, ("json", "orjson"))
+        with self.assertRaises(ValueError):
+            select_backend("yaml")
+
+    def test_orjson_backend_is_equivalent(self):
+        """Test that the orjson backend produces the same JSON values when it is installed"""
+        try:
+            backend = select_backend("orjson")
+        except ImportError:
+            self.skipTest("orjson is not installed")
+        for query in generate_corpus(100, seed=11):
+            details = extract_meeting_details(query, date(2026, 10, 17))
+            self.assertEqual(json.loads(backend.dumps(details)), details)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+import csv
+import io
+import os
+import sys
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+from unittest import mock
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tests import result_report
+from tests.result_report import ReportWriter, ResultRecorder
+
+COLUMNS = ("Request Input", "Response Output")
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+def rows(count):
+    for index in range(count):
+        yield {"Request Input": f"query {index}", "Response Output": f'{{"status": "success"}}\nrow {index}'}
+
+
+class TestReportWriter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_excel_report_is_styled_as_a_table(self):
+        """Test that streamed Excel rows keep the header, cell, height, width and table formatting"""
+        import openpyxl
+
+        count = result_report.WIDTH_SAMPLE_ROWS + 50
+        with ReportWriter(self.path("report.xlsx"), COLUMNS) as writer:
+            for row in rows(count):
+                writer.write(row)
+            writer.write(["bad \x00 character", "x" * 40000])
+
+        sheet = openpyxl.load_workbook(self.path("report.xlsx"))["Test Results"]
+        self.assertEqual([cell.value for cell in sheet[1]], list(COLUMNS))
+        self.assertEqual(sheet["A1"].style, "report_header")
+        self.assertTrue(sheet["A1"].font.bold)
+        self.assertEqual(sheet["B2"].style, "report_cell")
+        self.assertEqual(sheet["B2"].value, '{"status": "success"}\nrow 0')
+        self.assertEqual(sheet.row_dimensions[2].height, 30)
+        self.assertEqual(sheet.column_dimensions["B"].width, 31)
+        self.assertEqual(sheet.max_row, count + 2)
+        self.assertEqual(sheet.cell(row=count + 2, column=1).value, "bad  character")
+        self.assertEqual(len(sheet.cell(row=count + 2, column=2).value), result_report.EXCEL_CELL_LIMIT)
+        self.assertEqual(sheet.tables["TestResults"].ref, f"A1:B{count + 2}")
+
+    def test_csv_report(self):
+        with ReportWriter(self.path("report.csv"), COLUMNS) as writer:
+            for row in rows(3):
+                writer.write(row)
+            writer.write(("sequence row", None))
+        with open(self.path("report.csv"), encoding="utf-8", newline="") as report:
+            self.assertEqual(list(csv.reader(report))[1:], [
+                ["query 0", '{"status": "success"}\nrow 0'],
+                ["query 1", '{"status": "success"}\nrow 1'],
+                ["query 2", '{"status": "success"}\nrow 2'],
+                ["sequence row", ""],
+            ])
+
+    @unittest.skipUnless(pyarrow, "pyarrow is not installed")
+    def test_parquet_report(self):
+        import pyarrow.parquet as pq
+
+        with mock.patch.object(result_report, "PARQUET_ROW_GROUP_SIZE", 2):
+            with ReportWriter(self.path("report.parquet"), COLUMNS) as writer:
+                for row in rows(5):
+                    writer.write(row)
+        report = pq.ParquetFile(self.path("report.parquet"))
+        self.assertEqual(report.metadata.num_rows, 5)
+        self.assertEqual(report.metadata.num_row_groups, 3)
+        self.assertEqual(report.read().column("Request Input").to_pylist()[4], "query 4")
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            ReportWriter(self.path("report.txt"), COLUMNS)
+
+    def test_memory_does_not_grow_with_row_count(self):
+        """Test that peak traced memory is about the same for 1,000 and 5,000 Excel rows"""
+        ReportWriter(self.path("warm.xlsx"), COLUMNS).close()
+        peaks = []
+        for count in (1000, 5000):
+            tracemalloc.start()
+            with ReportWriter(self.path(f"report-{count}.xlsx"), COLUMNS) as writer:
+                for row in rows(count):
+                    writer.write(row)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        self.assertLess(peaks[1], peaks[0] * 1.5)
+
+
+class TestResultRecorder(unittest.TestCase):
+    def test_recorder_streams_every_format_and_bounds_the_console_table(self):
+        with tempfile.TemporaryDirectory() as directory:
+            recorder = ResultRecorder("results", formats=("xlsx", "csv"), output_dir=directory)
+            with mock.patch.object(result_report, "PRINT_ROWS", 2):
+                for row in rows(5):
+                    recorder.record_result(row["Request Input"], row["Response Output"])
+            output = io.StringIO()
+            with redirect_stdout(output):
+                recorder.print_results_table()
+                recorder.save()
+            self.assertEqual(sorted(os.listdir(directory)), ["results.csv", "results.xlsx"])
+            with open(os.path.join(directory, "results.csv"), encoding="utf-8", newline="") as report:
+                self.assertEqual(len(list(csv.reader(report))), 6)
+        self.assertEqual(len(recorder.results), 2)
+        self.assertIn("3 more results", output.getvalue())
+
+    def test_report_formats_come_from_the_environment(self):
+        with mock.patch.dict(os.environ, {"TEST_REPORT_FORMATS": "csv, parquet"}):
+            self.assertEqual(result_report.report_formats(), ["csv", "parquet"])
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(result_report.report_formats(), ["xlsx"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import unittest
+import asyncio
+import threading
+import sys
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import azure.functions as func
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from single_flight import SingleFlight
+
+
+class TestSingleFlightThreads(unittest.TestCase):
+    def test_concurrent_callers_share_one_computation(self):
+        """Test that callers arriving during a computation wait for it"""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return "result"
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(flight.do, "key", compute) for _ in range(8)]
+            while flight.in_flight() == 0:
+                pass
+            # Give the followers time to join before the leader finishes.
+            threading.Event().wait(0.05)
+            release.set()
+            results = [future.result(5) for future in futures]
+
+        self.assertEqual(results, ["result"] * 8)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_exception_is_shared_and_key_released(self):
+        """Test that a raising computation wakes every waiter and frees the key"""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def fail():
+            started.set()
+            release.wait(5)
+            raise ValueError("boom")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(flight.do, "key", fail)
+            started.wait(5)
+            follower = pool.submit(flight.do, "key", lambda: "unused")
+            threading.Event().wait(0.05)
+            release.set()
+            for future in (leader, follower):
+                with self.assertRaises(ValueError):
+                    future.result(5)
+
+        self.assertEqual(flight.do("key", lambda: "fresh"), "fresh")
+
+    def test_reentrant_call_does_not_deadlock(self):
+        flight = SingleFlight()
+        self.assertEqual(flight.do("key", lambda: flight.do("key", lambda: 42)), 42)
+
+
+class TestSingleFlightAsync(unittest.TestCase):
+    def test_concurrent_tasks_share_one_computation(self):
+        flight = SingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def main():
+            return await asyncio.gather(*(flight.do_async("key", compute) for _ in range(10)))
+
+        self.assertEqual(asyncio.run(main()), ["result"] * 10)
+        self.assertEqual(len(calls), 1)
+
+    def test_async_exception_and_cancelled_waiter(self):
+        """Test that errors propagate and a cancelled waiter does not cancel the leader"""
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.02)
+            raise ValueError("boom")
+
+        async def main():
+            leader = asyncio.ensure_future(flight.do_async("key", fail))
+            await asyncio.sleep(0)
+            waiter = asyncio.ensure_future(flight.do_async("key", fail))
+            cancelled = asyncio.ensure_future(flight.do_async("key", fail))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            return await asyncio.gather(leader, waiter, cancelled, return_exceptions=True)
+
+        leader, waiter, cancelled = asyncio.run(main())
+        self.assertIsInstance(leader, ValueError)
+        self.assertIsInstance(waiter, ValueError)
+        self.assertIsInstance(cancelled, asyncio.CancelledError)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_sync_callable_from_async(self):
+        flight = SingleFlight()
+        self.assertEqual(asyncio.run(flight.do_async("key", lambda: 7)), 7)
+
+
+class TestParseRoutes(unittest.TestCase):
+    def test_async_route_parses_off_the_event_loop(self):
+        """Test that identical concurrent queries share one extraction while the loop keeps running"""
+        import function_app
+        import parsing_operations
+
+        handler = function_app.route_handlers()["process_scheduling_query"]
+        real_extract = parsing_operations.extract_meeting_details
+        calls = []
+
+        def slow_extract(*args, **kwargs):
+            calls.append(1)
+            threading.Event().wait(0.2)
+            return real_extract(*args, **kwargs)
+
+        def request():
+            body = json.dumps({"UserQuery": "Sync with john tomorrow at 3pm"}).encode()
+            return func.HttpRequest(method="POST", url="/api/process_scheduling_query", body=body)
+
+        async def main():
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticker = asyncio.create_task(tick())
+            responses = await asyncio.gather(*(handler(request()) for _ in range(4)))
+            ticker.cancel()
+            return responses, ticks
+
+        parsing_operations.query_cache.clear()
+        with mock.patch.object(parsing_operations, "extract_meeting_details", slow_extract):
+            responses, ticks = asyncio.run(main())
+        self.assertEqual([response.status_code for response in responses], [200] * 4)
+        self.assertEqual(len({response.get_body() for response in responses}), 1)
+        self.assertEqual(len(calls), 1)
+        self.assertGreater(ticks, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import unittest
+import asyncio
+import json
+import sys
+import os
+from datetime import date, datetime, timedelta, timezone
+
+import azure.functions as func
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from availability import AvailabilityStore
+from availability_operations import suggest_meeting_slots
+from slot_suggestions import suggest_slots
+
+DAY = date(2026, 10, 19)  # a Monday
+
+
+def at(hour, minute=0, day=DAY):
+    return datetime(day.year, day.month, day.day, hour, minute)
+
+
+class TestSuggestSlots(unittest.TestCase):
+    def setUp(self):
+        self.store = AvailabilityStore(slot_minutes=15)
+        for member in ("alice", "bob", "carol", "dan"):
+            self.store.add_member(member)
+        # Everyone is busy outside 08:00-18:00 UTC, so suggestions stay in the working day.
+        for member in self.store.members:
+            self.store.mark_busy(member, at(0), at(8))
+            self.store.mark_busy(member, at(18), at(23, 59))
+        self.store.mark_busy("alice", at(9), at(12))
+
+    def test_required_members_are_free(self):
+        """Test that no suggestion overlaps a required member's busy time"""
+        suggestions = suggest_slots(self.store, ["alice", "bob"], DAY, DAY, 60, limit=10)
+        self.assertTrue(suggestions)
+        for suggestion in suggestions:
+            self.assertTrue(suggestion["end"] <= at(9) or suggestion["start"] >= at(12))
+            self.assertGreaterEqual(suggestion["start"], at(8))
+            self.assertLessEqual(suggestion["end"], at(18))
+
+    def test_suggestions_do_not_overlap(self):
+        """Test that suggestions on a day are disjoint and sorted by score"""
+        suggestions = suggest_slots(self.store, ["bob"], DAY, DAY, 60, limit=10)
+        spans = sorted((suggestion["start"], suggestion["end"]) for suggestion in suggestions)
+        for (_, previous_end), (next_start, _) in zip(spans, spans[1:]):
+            self.assertLessEqual(previous_end, next_start)
+        scores = [suggestion["score"] for suggestion in suggestions]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_optional_coverage_and_preferred_time(self):
+        """Test that slots free for optional members and near the preferred start rank first"""
+        self.store.mark_busy("carol", at(13), at(18))
+        suggestions = suggest_slots(self.store, ["bob"], DAY, DAY, 30, optional=["alice", "carol"],
+                                    preferred_start=at(14), limit=3)
+        self.assertEqual(suggestions[0]["start"], at(12, 30))
+        self.assertEqual(suggestions[0]["optional_available"], ["alice", "carol"])
+        self.assertEqual(suggestions[1]["start"], at(12))
+        self.assertEqual(suggestions[2]["optional_available"], ["alice"])
+
+        suggestions = suggest_slots(self.store, ["bob"], DAY, DAY, 30, optional=["alice", "carol"], limit=1)
+        self.assertEqual(suggestions[0]["optional_available"], ["alice", "carol"])
+        self.assertEqual(suggestions[0]["coverage"], 1.0)
+        self.assertEqual(suggestions[0]["start"], at(12))
+
+    def test_working_hours_across_time_zones(self):
+        """Test that slots inside everyone's local working hours score higher"""
+        time_zones = {"bob": "Asia/Kolkata", "dan": "America/New_York"}
+        # 09:00-17:00 in Kolkata is 03:30-11:30 UTC and in New York 13:00-21:00 UTC,
+        # so only the 10:00-11:30 UTC overlap is in hours for bob and the UTC member...
+        suggestions = suggest_slots(self.store, ["bob", "carol"], DAY, DAY, 60, time_zones=time_zones, limit=1)
+        self.assertEqual(suggestions[0]["start"], at(9))
+        self.assertEqual(suggestions[0]["working_hours_fit"], 1.0)
+        # ...while New York and Kolkata share no working hours at all.
+        suggestions = suggest_slots(self.store, ["bob", "dan"], DAY, DAY, 60, time_zones=time_zones, limit=1)
+        self.assertLess(suggestions[0]["working_hours_fit"], 1.0)
+
+    def test_month_horizon_with_many_attendees(self):
+        """Test a month-long search over hundreds of attendees returns only the top k"""
+        store = AvailabilityStore(slot_minutes=15)
+        members = [f"member{index}" for index in range(300)]
+        for index, member in enumerate(members):
+            for offset in range(31):
+                day_start = at(0, day=DAY + timedelta(days=offset))
+                store.mark_busy(member, day_start + timedelta(hours=index % 10), day_start + timedelta(hours=index % 10 + 1))
+        suggestions = suggest_slots(store, members[:3], DAY, DAY + timedelta(days=30), 45,
+                                    optional=members[3:], preferred_start=datetime(2026, 11, 2, 14, tzinfo=timezone.utc),
+                                    limit=5)
+        self.assertEqual(len(suggestions), 5)
+        self.assertEqual(suggestions[0]["start"].date(), date(2026, 11, 2))
+
+    def test_invalid_arguments(self):
+        """Test argument validation and unknown members"""
+        with self.assertRaises(ValueError):
+            suggest_slots(self.store, [], DAY, DAY, 30)
+        with self.assertRaises(KeyError):
+            suggest_slots(self.store, ["nobody"], DAY, DAY, 30)
+
+
+class TestSuggestMeetingSlotsHandler(unittest.TestCase):
+    def setUp(self):
+        self.store = AvailabilityStore()
+        self.store.mark_busy("alice", at(0), at(15))
+        self.store.add_member("bob")
+
+    def _execute(self, request_data):
+        body = json.dumps(request_data).encode('utf-8')
+        req = func.HttpRequest(method="POST", url="/api/suggest_meeting_slots", body=body)
+        response = asyncio.run(suggest_meeting_slots(req, store=self.store))
+        return response, json.loads(response.get_body())
+
+    def test_success(self):
+        """Test a suggestion request end to end"""
+        response, body = self._execute({
+            "required": ["alice"], "optional": ["bob"], "start_date": "2026-10-19",
+            "duration_minutes": 60, "limit": 2, "preferred_start": "2026-10-19T16:00:00+00:00",
+            "working_hours": {"start": "08:00", "end": "18:00"}
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(body["suggestions"]), 2)
+        self.assertEqual(body["suggestions"][0]["start"], "2026-10-19T16:00:00")
+        self.assertEqual(body["suggestions"][0]["optional_available"], ["bob"])
+
+    def test_far_future_dates_in_another_zone(self):
+        """Test that a date centuries away is converted without widening the offset tables to it"""
+        response, body = self._execute({
+            "required": ["alice"], "start_date": "4000-01-04", "duration_minutes": 60, "limit": 1,
+            "time_zones": {"alice": "Europe/Paris"}, "working_hours": {"start": "08:00", "end": "18:00"}
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body["suggestions"][0]["start"], "4000-01-04T07:00:00")
+
+    def test_validation_errors(self):
+        """Test 400 for malformed requests and 404 for unknown members"""
+        base = {"required": ["alice"], "start_date": "2026-10-19", "duration_minutes": 30}
+        for override in ({"required": []}, {"duration_minutes": 0}, {"limit": 500},
+                         {"time_zones": {"alice": "Mars/Olympus"}}, {"preferred_start": "soon"},
+                         {"start_date": "9999-12-31"}, {"start_date": "0001-01-01"}):
+            with self.subTest(override=override):
+                response, body = self._execute(dict(base, **override))
+                self.assertEqual(response.status_code, 400)
+        response, body = self._execute(dict(base, optional=["nobody"]))
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
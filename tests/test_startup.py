@@ -0,0 +1,34 @@
+import unittest
+import json
+import sys
+import os
+
+import azure.functions as func
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.startup import measure_startup, DEFAULT_BUDGET_MS
+
+
+class TestColdStart(unittest.TestCase):
+    def test_first_response_within_budget(self):
+        """Import-to-first-response time must stay within STARTUP_BUDGET_MS"""
+        result = measure_startup(runs=3)
+        self.assertEqual(result["status_codes"], [200])
+        self.assertEqual(result["loaded_at_import"], [],
+                         "heavy modules should load on first use, not when function_app is imported")
+        self.assertLessEqual(result["first_response_ms"], DEFAULT_BUDGET_MS,
+                             f"cold start took {result['first_response_ms']}ms")
+
+    def test_warm_up_route_loads_deferred_modules(self):
+        import function_app
+        handlers = function_app.route_handlers()
+        response = handlers["warmup"](func.HttpRequest(method="GET", url="/api/warmup", body=b""))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.get_body())["status"], "success")
+        self.assertIn("meeting_extraction", sys.modules)
+        self.assertIn("availability", sys.modules)
+
+
+if __name__ == '__main__':
+    unittest.main()
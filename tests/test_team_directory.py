@@ -0,0 +1,131 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+from datetime import date
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from parsing_operations import parse_schedule_query, set_team_directory
+from team_directory import Member, TeamDirectory, load_directory, normalize_name
+
+
+class MockHttpRequest:
+    def __init__(self, body=None):
+        self._body = body if body is not None else b''
+
+    def get_body(self):
+        return self._body
+
+
+MEMBERS = [
+    Member("u-john", "John Smith", "john.smith@example.com", ("Johnny",)),
+    Member("u-jane", "Jane Smith", "jane.smith@example.com", ()),
+    Member("u-zoe", "Zoë Brooks", "zoe@example.com", ()),
+    Member("u-johnson", "Alex Johnson", "alex.johnson@example.com", ("AJ",)),
+    Member("u-priya", "Priya Raman", "priya.raman@example.com", ("PR",)),
+]
+
+
+class TestTeamDirectory(unittest.TestCase):
+    def setUp(self):
+        self.directory = TeamDirectory(MEMBERS)
+
+    def test_normalize_name(self):
+        """Test case, accent, mention and whitespace folding"""
+        self.assertEqual(normalize_name("  @Zoë   BROOKS "), "zoe brooks")
+
+    def test_exact_names_aliases_and_emails(self):
+        """Test that first names, aliases, emails and email local parts resolve to one member"""
+        for name in ("John", "johnny", "john.smith@example.com", "@john.smith", "Zoe", "zoë brooks", "AJ"):
+            with self.subTest(name=name):
+                member_id, candidates = self.directory.resolve_one(name)
+                self.assertIsNotNone(member_id)
+                self.assertEqual(member_id, candidates[0].member_id)
+        self.assertEqual(self.directory.resolve_one("John")[0], "u-john")
+
+    def test_ambiguous_names_return_ranked_candidates(self):
+        """Test that a shared surname resolves to no member but lists both candidates"""
+        member_id, candidates = self.directory.resolve_one("Smith")
+        self.assertIsNone(member_id)
+        self.assertEqual([candidate.member_id for candidate in candidates], ["u-jane", "u-john"])
+
+    def test_prefix_and_fuzzy_matches(self):
+        """Test that partial and misspelled names produce candidates below the resolve threshold"""
+        candidates = self.directory.resolve("Pri")
+        self.assertEqual(candidates[0].member_id, "u-priya")
+        self.assertLess(candidates[0].score, 0.85)
+
+        candidates = self.directory.resolve("Jonh")
+        self.assertIn("u-john", [candidate.member_id for candidate in candidates])
+        self.assertEqual(self.directory.resolve("Qwxyz"), [])
+
+    def test_prefix_matches_rank_across_the_whole_range(self):
+        """Test that thousands of keys sorting before "john" do not push the best prefix match out"""
+        fillers = [Member(f"u-filler{index}", f"Joanna-Marie Longfellow{index:04d}", None, ())
+                   for index in range(2000)]
+        directory = TeamDirectory(fillers + MEMBERS)
+        self.assertEqual(directory.resolve("jo", limit=3)[0].member_id, "u-john")
+        self.assertEqual(directory.resolve("jo", limit=40)[0].member_id, "u-john")
+
+        directory.add(Member("u-jo", "Jo March", None, ("Jojo",)))
+        self.assertEqual(directory.resolve("joj")[0].member_id, "u-jo")
+
+    def test_duplicate_member_ids_are_rejected(self):
+        """Test that a member id can only be indexed once"""
+        with self.assertRaises(ValueError):
+            self.directory.add(Member("u-john", "Other John", None, ()))
+
+
+class TestDirectoryLoading(unittest.TestCase):
+    def test_csv_and_json_exports(self):
+        """Test that CSV and JSON exports load the same members"""
+        with tempfile.TemporaryDirectory() as export_dir:
+            csv_path = os.path.join(export_dir, "members.csv")
+            with open(csv_path, "w", encoding="utf-8") as export:
+                export.write("member_id,display_name,email,aliases\n")
+                export.write("u-john,John Smith,john.smith@example.com,Johnny;JS\n")
+                export.write("u-zoe,Zoë Brooks,zoe@example.com,\n")
+            json_path = os.path.join(export_dir, "members.json")
+            with open(json_path, "w", encoding="utf-8") as export:
+                json.dump({"members": [
+                    {"id": "u-john", "name": "John Smith", "email": "john.smith@example.com", "aliases": ["Johnny", "JS"]},
+                    {"id": "u-zoe", "name": "Zoë Brooks", "email": "zoe@example.com"},
+                ]}, export)
+
+            for path in (csv_path, json_path):
+                with self.subTest(path=os.path.basename(path)):
+                    directory = load_directory(path)
+                    self.assertEqual(len(directory), 2)
+                    self.assertEqual(directory.get("u-john").aliases, ("Johnny", "JS"))
+                    self.assertEqual(directory.resolve_one("js")[0], "u-john")
+                    self.assertEqual(directory.resolve_one("Zoe")[0], "u-zoe")
+
+
+class TestParticipantResolution(unittest.TestCase):
+    def setUp(self):
+        set_team_directory(TeamDirectory(MEMBERS))
+
+    def tearDown(self):
+        set_team_directory(None)
+
+    def test_query_participants_resolve_to_member_ids(self):
+        """Test that parsed participants carry member ids and candidates"""
+        response = parse_schedule_query(MockHttpRequest(b"Schedule a meeting with John and Smith tomorrow at 2pm"))
+        details = json.loads(response.get_body())["MeetingDetails"]
+        self.assertEqual(details["participants"], ["John", "Smith"])
+        john, smith = details["participant_matches"]
+        self.assertEqual(john["member_id"], "u-john")
+        self.assertIsNone(smith["member_id"])
+        self.assertEqual({candidate["member_id"] for candidate in smith["candidates"]}, {"u-john", "u-jane"})
+
+    def test_matches_are_omitted_without_a_directory(self):
+        """Test that details are unchanged when no directory is registered"""
+        set_team_directory(None)
+        from meeting_extraction import extract_details
+        self.assertNotIn("participant_matches", extract_details("Lunch with John", date(2026, 10, 17)))
+
+
+if __name__ == '__main__':
+    unittest.main()
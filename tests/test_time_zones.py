@@ -0,0 +1,134 @@
+import unittest
+import json
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+# Add parent directory to Python path for imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from parsing_operations import parse_schedule_query
+from time_zones import TimeZoneService, to_minutes
+
+
+class MockHttpRequest:
+    def __init__(self, body=None, headers=None):
+        self._body = body if body is not None else b''
+        self.headers = headers or {}
+
+    def get_body(self):
+        return self._body
+
+
+ZONES = ("Europe/London", "America/New_York", "Asia/Kolkata", "Australia/Lord_Howe", "Asia/Kathmandu", "UTC")
+
+
+class TestTimeZoneService(unittest.TestCase):
+    def setUp(self):
+        self.service = TimeZoneService(window_days=60, today=lambda: date(2026, 10, 17))
+
+    def test_conversions_match_zoneinfo(self):
+        """Test table conversions against zoneinfo, including skipped and repeated wall-clock times"""
+        rng = random.Random(5)
+        samples = [datetime(2026, 3, 29, 1, 30), datetime(2026, 10, 25, 1, 30), datetime(2026, 11, 1, 1, 30),
+                   datetime(2026, 3, 8, 2, 30)]
+        samples += [datetime(2026, 1, 1) + timedelta(minutes=rng.randrange(2 * 365 * 1440)) for _ in range(200)]
+        for zone_name in ZONES:
+            zone = ZoneInfo(zone_name)
+            for moment in samples:
+                with self.subTest(zone=zone_name, moment=moment):
+                    expected_utc = moment.replace(tzinfo=zone).astimezone(timezone.utc).replace(tzinfo=None)
+                    self.assertEqual(self.service.to_utc(zone_name, moment), expected_utc)
+                    expected_local = moment.replace(tzinfo=timezone.utc).astimezone(zone).replace(tzinfo=None)
+                    self.assertEqual(self.service.to_local(zone_name, moment), expected_local)
+
+    def test_tables_widen_on_demand(self):
+        """Test that conversions outside the active window rebuild a wider table"""
+        first_minute = self.service.table("Europe/London").first_minute
+        self.assertEqual(self.service.to_utc("Europe/London", datetime(2024, 7, 1, 12)), datetime(2024, 7, 1, 11))
+        self.assertLess(self.service.table("Europe/London").first_minute, first_minute)
+
+    def test_unknown_zone(self):
+        with self.assertRaises(ValueError):
+            self.service.to_utc("Mars/Olympus", datetime(2026, 10, 17))
+
+    def test_shift_slot_arrays_across_a_dst_change(self):
+        """Test that local-grid arrays land on the right UTC slots on the day clocks go back"""
+        day = date(2026, 11, 1)  # New York falls back from UTC-4 to UTC-5 at 02:00 local
+        local = np.zeros(24, dtype=np.uint8)
+        local[[0, 1, 9]] = 1  # 00:00, the repeated 01:00 hour and 09:00 local
+        first_day, shifted = self.service.shift_to_utc("America/New_York", day, local, 60)
+        self.assertEqual(first_day, date(2026, 10, 31))
+        busy_utc = [datetime.combine(first_day, datetime.min.time()) + timedelta(hours=int(hour))
+                    for hour in np.flatnonzero(shifted)]
+        self.assertEqual(busy_utc, [datetime(2026, 11, 1, 4), datetime(2026, 11, 1, 5),
+                                    datetime(2026, 11, 1, 6), datetime(2026, 11, 1, 14)])
+
+        first_day, back = self.service.shift_to_local("America/New_York", day, shifted[..., 24:48], 60)
+        self.assertEqual(first_day, date(2026, 10, 31))
+        self.assertEqual(list(np.flatnonzero(back[24:48])), [0, 1, 9])
+
+    def test_far_dates_do_not_widen_tables_past_the_cap(self):
+        """Test that far-future and far-past conversions use zoneinfo directly and leave the table capped"""
+        for zone_name in ("Europe/Paris", "America/New_York"):
+            zone = ZoneInfo(zone_name)
+            for moment in (datetime(9999, 12, 30, 12), datetime(4000, 1, 4, 9), datetime(1, 1, 3, 9)):
+                with self.subTest(zone=zone_name, moment=moment):
+                    expected = moment.replace(tzinfo=zone).astimezone(timezone.utc).replace(tzinfo=None)
+                    # Offsets are whole minutes; local mean time before standard zones has seconds.
+                    self.assertLessEqual(abs(self.service.to_utc(zone_name, moment) - expected),
+                                         timedelta(minutes=1))
+            table = self.service.table(zone_name)
+            limit = self.service.max_window_days * 24 * 60
+            center = to_minutes(datetime(2026, 10, 17))
+            self.assertGreaterEqual(table.first_minute, center - limit)
+            self.assertLessEqual(table.last_minute, center + limit)
+
+    def test_conversions_past_the_datetime_range(self):
+        with self.assertRaises(ValueError):
+            self.service.to_utc("America/New_York", datetime(9999, 12, 31, 23))
+        with self.assertRaises(ValueError):
+            self.service.to_utc("Asia/Kolkata", datetime(1, 1, 1, 1))
+        self.assertEqual(self.service.to_local("UTC", datetime(9999, 12, 31, 23)), datetime(9999, 12, 31, 23))
+
+    def test_vectorized_offsets(self):
+        """Test that offsets for a whole array of instants come from one table lookup"""
+        instants = np.array([to_minutes(datetime(2026, 10, 25, 0, 59)), to_minutes(datetime(2026, 10, 25, 1, 0))])
+        self.assertEqual(list(self.service.utc_offsets("Europe/London", instants)), [60, 0])
+
+
+class TestRequesterTimeZone(unittest.TestCase):
+    def test_times_resolve_in_the_requester_zone(self):
+        """Test that '2pm' is read in the zone named by the request header"""
+        req = MockHttpRequest(b"Meet with John on 2026-10-19 at 2pm for an hour",
+                              headers={"x-time-zone": "Asia/Kolkata"})
+        details = json.loads(parse_schedule_query(req).get_body())["MeetingDetails"]
+        self.assertEqual(details["time_zone"], "Asia/Kolkata")
+        self.assertEqual(details["start_utc"], "2026-10-19T08:30:00")
+        self.assertEqual(details["end_utc"], "2026-10-19T09:30:00")
+
+        details = json.loads(parse_schedule_query(MockHttpRequest(req.get_body())).get_body())["MeetingDetails"]
+        self.assertNotIn("start_utc", details)
+
+    def test_far_dates_in_queries(self):
+        """Test that dates at the ends of the calendar answer quickly, without UTC times they cannot have"""
+        for query, zone_name, start_utc in (("meet on 9999-12-31 at 11pm", "Europe/Paris", "9999-12-31T22:00:00"),
+                                            ("meet on 9999-12-31 at 11pm", "America/New_York", None),
+                                            ("meet on 0001-01-01 at 1am", "Asia/Kolkata", None)):
+            with self.subTest(query=query, zone=zone_name):
+                response = parse_schedule_query(MockHttpRequest(query.encode(), headers={"x-time-zone": zone_name}))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(json.loads(response.get_body())["MeetingDetails"]["start_utc"], start_utc)
+
+    def test_unknown_zone_is_rejected(self):
+        req = MockHttpRequest(b"Meet at 2pm", headers={"x-time-zone": "Mars/Olympus"})
+        response = parse_schedule_query(req)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Mars/Olympus", json.loads(response.get_body())["message"])
+
+
+if __name__ == '__main__':
+    unittest.main()
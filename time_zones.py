@@ -0,0 +1,269 @@
+"""Cached UTC offset transition tables for converting times and slot grids between time zones.
+
+Converting each slot with zoneinfo costs a Python call per slot. Instead every zone
+gets a table of the instants its UTC offset changes over an active window (a year
+either side of today by default, widened on demand up to MAX_WINDOW_DAYS), built
+once with zoneinfo and then searched with NumPy:
+
+    utc_offsets(zone, utc_minutes)       offset in effect at each UTC instant
+    local_offsets(zone, local_minutes)   offset to subtract from each wall-clock time
+    shift_to_utc / shift_to_local        move whole slot arrays between local and UTC grids
+
+Times are counted in minutes since 1970-01-01 00:00. Wall-clock times that do not
+exist (clocks going forward) or occur twice (clocks going back) resolve like
+zoneinfo's fold=0: with the offset in effect before the transition. Instants
+outside the widest window are converted with zoneinfo directly, one call each.
+"""
+
+import threading
+from collections import namedtuple
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+
+EPOCH = datetime(1970, 1, 1)
+MINUTES_PER_DAY = 24 * 60
+# 1970-01-01 was a Thursday.
+EPOCH_WEEKDAY = 3
+
+# Transitions are found by probing the offset once per PROBE_HOURS and bisecting
+# each change to the minute; zones do not change offset twice within that span.
+PROBE_HOURS = 24
+
+# Tables never grow past this many days either side of today, so a far-off date in
+# a request cannot make a table build probe zoneinfo for centuries under the lock.
+MAX_WINDOW_DAYS = 5 * 366
+
+# Instants are clamped into this range before zoneinfo sees them; a day of slack
+# either way keeps astimezone and offset arithmetic inside datetime's range.
+MIN_MINUTE = (datetime.min - datetime(1970, 1, 1)) // timedelta(minutes=1) + 2 * 24 * 60
+MAX_MINUTE = (datetime.max - datetime(1970, 1, 1)) // timedelta(minutes=1) - 2 * 24 * 60
+
+OffsetTable = namedtuple("OffsetTable", "first_minute last_minute transitions local_boundaries offsets")
+
+
+def to_minutes(value: datetime) -> int:
+    """Minutes since the epoch of a naive datetime (or an aware one, taken in UTC)."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH) // timedelta(minutes=1)
+
+
+def from_minutes(minutes: int) -> datetime:
+    """Naive datetime for a count of minutes since the epoch."""
+    return EPOCH + timedelta(minutes=int(minutes))
+
+
+def local_weekdays(local_minutes: np.ndarray) -> np.ndarray:
+    """Weekday (Monday 0) of each wall-clock minute since the epoch."""
+    return (local_minutes // MINUTES_PER_DAY + EPOCH_WEEKDAY) % 7
+
+
+class TimeZoneService:
+    """
+    Per-zone offset transition tables over an active window, built on first use.
+
+    Tables cover window_days either side of today and are rebuilt wider when a
+    conversion falls outside them, up to max_window_days. Instances are safe to
+    share between threads.
+    """
+
+    def __init__(self, window_days: int = 366, today=date.today, max_window_days: int = MAX_WINDOW_DAYS):
+        self.window_days = window_days
+        self.max_window_days = max(window_days, max_window_days)
+        self._today = today
+        self._zones = {}
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def zone(self, zone_name: str) -> ZoneInfo:
+        """Return the ZoneInfo for an IANA name; raises ValueError for unknown names."""
+        zone = self._zones.get(zone_name)
+        if zone is None:
+            try:
+                zone = ZoneInfo(str(zone_name))
+            except (ZoneInfoNotFoundError, ValueError):
+                raise ValueError(f"Unknown time zone: {zone_name}") from None
+            self._zones[zone_name] = zone
+        return zone
+
+    def today(self, zone_name: str) -> date:
+        """Return the current date in a zone."""
+        return datetime.now(self.zone(zone_name)).date()
+
+    def table(self, zone_name: str, first_minute: int = None, last_minute: int = None) -> OffsetTable:
+        """
+        Return the zone's OffsetTable, widened to cover [first_minute, last_minute] if given.
+
+        The table never extends past max_window_days either side of today, so it may
+        not cover the whole range asked for.
+        """
+        table = self._tables.get(zone_name)
+        if table is not None and (first_minute is None or first_minute >= table.first_minute) \
+                and (last_minute is None or last_minute <= table.last_minute):
+            return table
+        with self._lock:
+            table = self._tables.get(zone_name)
+            center = to_minutes(datetime.combine(self._today(), datetime.min.time()))
+            window = self.window_days * MINUTES_PER_DAY
+            limit = self.max_window_days * MINUTES_PER_DAY
+            if first_minute is not None:
+                first_minute = min(max(first_minute, center - limit), center + limit)
+            if last_minute is not None:
+                last_minute = min(max(last_minute, center - limit), center + limit)
+            first = min(x for x in (center - window, first_minute, table and table.first_minute) if x is not None)
+            last = max(x for x in (center + window, last_minute, table and table.last_minute) if x is not None)
+            if table is None or first < table.first_minute or last > table.last_minute:
+                table = _build_table(self.zone(zone_name), first, last)
+                self._tables[zone_name] = table
+            return table
+
+    def utc_offsets(self, zone_name: str, utc_minutes) -> np.ndarray:
+        """Return the UTC offset in minutes in effect at each UTC instant."""
+        utc_minutes = np.asarray(utc_minutes, dtype=np.int64)
+        table = self._covering(zone_name, utc_minutes)
+        offsets = np.array(table.offsets[np.searchsorted(table.transitions, utc_minutes, side="right")])
+        outside = (utc_minutes < table.first_minute) | (utc_minutes > table.last_minute)
+        if outside.any():
+            zone = self.zone(zone_name)
+            offsets[outside] = [_offset_minutes(zone, minute) for minute in utc_minutes[outside].tolist()]
+        return offsets
+
+    def local_offsets(self, zone_name: str, local_minutes) -> np.ndarray:
+        """Return the UTC offset in minutes that applies to each wall-clock time (fold=0)."""
+        local_minutes = np.asarray(local_minutes, dtype=np.int64)
+        table = self._covering(zone_name, local_minutes)
+        offsets = np.array(table.offsets[np.searchsorted(table.local_boundaries, local_minutes, side="right")])
+        # Wall-clock times within a day of the table's ends may belong to instants outside it.
+        outside = (local_minutes < table.first_minute + MINUTES_PER_DAY) \
+            | (local_minutes > table.last_minute - MINUTES_PER_DAY)
+        if outside.any():
+            zone = self.zone(zone_name)
+            offsets[outside] = [_local_offset_minutes(zone, minute) for minute in local_minutes[outside].tolist()]
+        return offsets
+
+    def to_utc(self, zone_name: str, local: datetime) -> datetime:
+        """
+        Convert a naive wall-clock time in a zone to a naive UTC datetime.
+
+        Raises ValueError when the result falls outside datetime's range.
+        """
+        local_minutes = to_minutes(local)
+        offset = int(self.local_offsets(zone_name, local_minutes))
+        try:
+            return local - timedelta(minutes=offset)
+        except OverflowError:
+            raise ValueError(f"{local.isoformat()} in {zone_name} has no UTC time in the supported range") from None
+
+    def to_local(self, zone_name: str, utc: datetime) -> datetime:
+        """
+        Convert a UTC datetime (naive UTC or aware) to a naive wall-clock time in a zone.
+
+        Raises ValueError when the result falls outside datetime's range.
+        """
+        if utc.tzinfo is not None:
+            utc = utc.astimezone(timezone.utc).replace(tzinfo=None)
+        try:
+            return utc + timedelta(minutes=int(self.utc_offsets(zone_name, to_minutes(utc))))
+        except OverflowError:
+            raise ValueError(f"{utc.isoformat()} UTC has no time in {zone_name} in the supported range") from None
+
+    def local_slot_minutes(self, zone_name: str, utc_day: date, slot_minutes: int) -> np.ndarray:
+        """Return the local wall-clock minute (since the epoch) at the start of each UTC slot of utc_day."""
+        starts = to_minutes(datetime.combine(utc_day, datetime.min.time())) \
+            + np.arange(0, MINUTES_PER_DAY, slot_minutes, dtype=np.int64)
+        return starts + self.utc_offsets(zone_name, starts)
+
+    def shift_to_utc(self, zone_name: str, local_day: date, values: np.ndarray, slot_minutes: int):
+        """
+        Move a (..., slots per day) array on the local grid of local_day onto the UTC grid.
+
+        Returns (first UTC day, array of shape (..., 3 x slots per day)) covering the
+        UTC day before, of and after local_day; UTC slots outside the local day are
+        zero. Each UTC slot takes the value of the local slot its start falls in, so
+        on a day the clocks go back the repeated local hour fills both UTC hours.
+        """
+        slots_per_day = MINUTES_PER_DAY // slot_minutes
+        first_day = local_day - timedelta(days=1)
+        utc_starts = to_minutes(datetime.combine(first_day, datetime.min.time())) \
+            + np.arange(0, 3 * MINUTES_PER_DAY, slot_minutes, dtype=np.int64)
+        local_starts = utc_starts + self.utc_offsets(zone_name, utc_starts)
+        index = (local_starts - to_minutes(datetime.combine(local_day, datetime.min.time()))) // slot_minutes
+        inside = (index >= 0) & (index < slots_per_day)
+        shifted = np.zeros(values.shape[:-1] + (3 * slots_per_day,), dtype=values.dtype)
+        shifted[..., inside] = values[..., index[inside]]
+        return first_day, shifted
+
+    def shift_to_local(self, zone_name: str, utc_day: date, values: np.ndarray, slot_minutes: int):
+        """
+        Move a (..., slots per day) array on the UTC grid of utc_day onto the local grid.
+
+        Returns (first local day, array of shape (..., 3 x slots per day)) covering
+        the local day before, of and after utc_day. Local slots that do not exist
+        take the value of the UTC slot just after the gap; of a repeated local hour
+        only the first occurrence is represented.
+        """
+        slots_per_day = MINUTES_PER_DAY // slot_minutes
+        first_day = utc_day - timedelta(days=1)
+        local_starts = to_minutes(datetime.combine(first_day, datetime.min.time())) \
+            + np.arange(0, 3 * MINUTES_PER_DAY, slot_minutes, dtype=np.int64)
+        utc_starts = local_starts - self.local_offsets(zone_name, local_starts)
+        index = (utc_starts - to_minutes(datetime.combine(utc_day, datetime.min.time()))) // slot_minutes
+        inside = (index >= 0) & (index < slots_per_day)
+        shifted = np.zeros(values.shape[:-1] + (3 * slots_per_day,), dtype=values.dtype)
+        shifted[..., inside] = values[..., index[inside]]
+        return first_day, shifted
+
+    def clear(self) -> None:
+        """Drop every cached table."""
+        with self._lock:
+            self._tables.clear()
+
+    def _covering(self, zone_name: str, minutes: np.ndarray) -> OffsetTable:
+        if not minutes.size:
+            return self.table(zone_name)
+        # A day of slack either way also covers the local-time boundaries.
+        return self.table(zone_name, int(minutes.min()) - MINUTES_PER_DAY, int(minutes.max()) + MINUTES_PER_DAY)
+
+
+def _offset_minutes(zone: ZoneInfo, utc_minutes: int) -> int:
+    utc = datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=min(max(utc_minutes, MIN_MINUTE), MAX_MINUTE))
+    return int(utc.astimezone(zone).utcoffset() // timedelta(minutes=1))
+
+
+def _local_offset_minutes(zone: ZoneInfo, local_minutes: int) -> int:
+    local = EPOCH + timedelta(minutes=min(max(local_minutes, MIN_MINUTE), MAX_MINUTE))
+    return int(local.replace(tzinfo=zone).utcoffset() // timedelta(minutes=1))
+
+
+def _build_table(zone: ZoneInfo, first_minute: int, last_minute: int) -> OffsetTable:
+    """Probe zone's offset over [first_minute, last_minute] and bisect every change to the minute."""
+    step = PROBE_HOURS * 60
+    offsets = [_offset_minutes(zone, first_minute)]
+    transitions = []
+    probe = first_minute
+    while probe < last_minute:
+        next_probe = min(probe + step, last_minute)
+        next_offset = _offset_minutes(zone, next_probe)
+        if next_offset != offsets[-1]:
+            low, high = probe, next_probe
+            while high - low > 1:
+                middle = (low + high) // 2
+                if _offset_minutes(zone, middle) == offsets[-1]:
+                    low = middle
+                else:
+                    high = middle
+            transitions.append(high)
+            offsets.append(next_offset)
+        probe = next_probe
+
+    transitions = np.array(transitions, dtype=np.int64)
+    offsets = np.array(offsets, dtype=np.int64)
+    # Wall-clock times before transition + the larger of the two offsets still use
+    # the earlier offset: they are either skipped or the first of a repeated hour.
+    local_boundaries = transitions + np.maximum(offsets[:-1], offsets[1:])
+    return OffsetTable(first_minute, last_minute, transitions, local_boundaries, offsets)
+
+
+time_zone_service = TimeZoneService()